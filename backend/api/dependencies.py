@@ -2,27 +2,61 @@
 Зависимости для API (dependencies)
 '''
 import uuid
+from typing import Optional
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.security import get_user_id_from_token
+from core.security import decode_access_token, get_user_id_from_payload
+from crud.pipeline import pipeline_crud
 from crud.user import user_crud
 from database.base import get_async_session
-from models.user import User
+from models.user import User, UserRole
+from services.owner_index import pipeline_owner_index
+from services.token_revocation import token_revocation_list
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl='/api/v1/auth/login')
 
 
-async def get_current_user_id(
+async def get_token_payload(
     token: str = Depends(oauth2_scheme)
+) -> dict:
+    '''
+    Декодировать JWT токен и проверить, что он не отозван
+    
+    Args:
+        token: JWT токен из заголовка Authorization
+    
+    Returns:
+        Данные токена
+    
+    Raises:
+        HTTPException: Если токен недействителен или отозван
+    '''
+    payload = decode_access_token(token)
+    jti = payload.get('jti') if payload is not None else None
+
+    if payload is None or (
+        jti is not None and await token_revocation_list.is_revoked(jti)
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Недействительный токен доступа",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    return payload
+
+
+async def get_current_user_id(
+    payload: dict = Depends(get_token_payload)
 ) -> uuid.UUID:
     '''
     Получить ID текущего пользователя из JWT токена
     
     Args:
-        token: JWT токен из заголовка Authorization
+        payload: Данные JWT токена из заголовка Authorization
     
     Returns:
         UUID пользователя
@@ -30,7 +64,7 @@ async def get_current_user_id(
     Raises:
         HTTPException: Если токен недействителен или пользователь не найден
     '''
-    user_id = get_user_id_from_token(token)
+    user_id = get_user_id_from_payload(payload)
     
     if user_id is None:
         raise HTTPException(
@@ -59,7 +93,7 @@ async def get_current_user(
     Raises:
         HTTPException: Если пользователь не найден или неактивен
     '''
-    user = await user_crud.get_current_user(session, user_id)
+    user = await user_crud.get_for_auth(session, user_id)
     
     if not user:
         raise HTTPException(
@@ -74,3 +108,85 @@ async def get_current_user(
         )
     
     return user
+
+
+async def require_admin(
+    current_user: User = Depends(get_current_user),
+) -> User:
+    '''
+    Проверить, что текущий пользователь - администратор
+    
+    Raises:
+        HTTPException: Если пользователь не администратор
+    '''
+    if current_user.role is not UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Недостаточно прав: требуется роль администратора"
+        )
+    return current_user
+
+
+async def can_access_pipeline(
+    pipeline_id: uuid.UUID,
+    user: User,
+    session: AsyncSession,
+) -> bool:
+    '''
+    Есть ли у пользователя доступ к пайплайну
+
+    Доступ есть у владельцев пайплайна и администраторов. Владение
+    проверяется по индексу владельцев в памяти, а отрицательный ответ
+    индекса перепроверяется одним запросом к pipeline_owners: индекс
+    процесса мог еще не получить изменение, зафиксированное в другом
+    '''
+    if user.role is UserRole.ADMIN:
+        return True
+    await pipeline_owner_index.ensure_fresh()
+    if pipeline_owner_index.is_owner(pipeline_id, user.id):
+        return True
+    return await pipeline_crud.is_owner(session, pipeline_id, user.id)
+
+
+async def authorize_pipeline(
+    pipeline_id: uuid.UUID,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session),
+) -> User:
+    '''
+    Проверить доступ текущего пользователя к пайплайну
+    (владельцы и администраторы, см. can_access_pipeline)
+    
+    Args:
+        pipeline_id: ID пайплайна из пути запроса
+        current_user: Текущий пользователь
+        session: Сессия базы данных
+    
+    Returns:
+        Объект пользователя
+    
+    Raises:
+        HTTPException: Если пользователь не владелец и не администратор
+    '''
+    if not await can_access_pipeline(pipeline_id, current_user, session):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='Pipeline not found or access denied'
+        )
+    return current_user
+
+
+async def get_visible_pipeline_ids(
+    current_user: User = Depends(get_current_user),
+) -> Optional[list[uuid.UUID]]:
+    '''
+    Получить ID пайплайнов, доступных текущему пользователю
+    
+    Returns:
+        None для администратора (доступны все), иначе ID пайплайнов,
+        которыми пользователь владеет (по индексу владельцев)
+    '''
+    if current_user.role is UserRole.ADMIN:
+        return None
+    await pipeline_owner_index.ensure_fresh()
+    return pipeline_owner_index.pipelines_of(current_user.id)
@@ -3,7 +3,10 @@
 '''
 from fastapi import APIRouter
 
-from api.v1.endpoints import auth, pipeline_version, pipelines, user, tag
+from api.v1.endpoints import (auth, changes, executor_callbacks,
+                              pipeline_run, pipeline_schedule,
+                              pipeline_version, pipelines, schema_search,
+                              tag, user)
 
 api_router = APIRouter()
 
@@ -20,6 +23,25 @@ api_router.include_router(
 api_router.include_router(
     pipeline_version.router, prefix='/pipeline-versions', tags=['pipeline-versions']
 )
+api_router.include_router(
+    pipeline_run.router, prefix='/pipeline-runs', tags=['pipeline-runs']
+)
+api_router.include_router(
+    executor_callbacks.router,
+    prefix='/executor-callbacks',
+    tags=['executor-callbacks']
+)
+api_router.include_router(
+    pipeline_schedule.router,
+    prefix='/pipeline-schedules',
+    tags=['pipeline-schedules']
+)
+api_router.include_router(
+    schema_search.router, prefix='/schema-search', tags=['schema-search']
+)
 api_router.include_router(
     tag.router, prefix='/tags', tags=['tags']
 )
+api_router.include_router(
+    changes.router, prefix='/changes', tags=['changes']
+)
@@ -1,22 +1,24 @@
 '''
 Эндпоинты для аутентификации
 '''
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from api.dependencies import get_current_user
+from api.dependencies import get_current_user, get_token_payload
 from core.config import settings
 from core.security import create_access_token
+from crud.loaders import LoaderProfile
 from crud.user import user_crud
 from database.base import get_async_session
 from models.user import User
 from schemas.auth import LogoutResponse
 from schemas.user import Token, UserLogin
-from validators.user import (validate_is_active, validate_password,
-                             validate_user_email)
+from services.token_revocation import token_revocation_list
+from validators.user import (validate_is_active, validate_login_rate,
+                             validate_password, validate_user_email)
 
 router = APIRouter()
 
@@ -29,6 +31,7 @@ router = APIRouter()
     description='Получить JWT токен для аутентификации. Используйте этот эндпоинт для входа через Swagger UI (форма) или JSON body.',
 )
 async def login(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
     session: AsyncSession = Depends(get_async_session)
 ):
@@ -42,7 +45,10 @@ async def login(
     Для JSON запросов используйте /login/json
     '''
 
-    user = await validate_user_email(form_data.username, session)
+    await validate_login_rate(request, form_data.username)
+    user = await validate_user_email(
+        form_data.username, session, LoaderProfile.BARE
+    )
     await validate_is_active(user)
     await validate_password(form_data.password, user)
 
@@ -63,13 +69,17 @@ async def login(
     description='Получить JWT токен для аутентификации используя JSON body',
 )
 async def login_json(
+    request: Request,
     login_data: UserLogin,
     session: AsyncSession = Depends(get_async_session)
 ):
     '''
     Войти в систему и получить JWT токен (используя JSON body)
     '''
-    user = await validate_user_email(login_data.email, session)
+    await validate_login_rate(request, login_data.email)
+    user = await validate_user_email(
+        login_data.email, session, LoaderProfile.BARE
+    )
     await validate_is_active(user)
     await validate_password(login_data.password, user)
 
@@ -87,18 +97,26 @@ async def login_json(
     status_code=status.HTTP_200_OK,
     response_model=LogoutResponse,
     summary='Выйти из системы',
-    description='Выйти из системы (требуется JWT токен). Клиент должен удалить токен после этого запроса.',
+    description='Выйти из системы (требуется JWT токен). Токен отзывается и больше не принимается.',
 )
 async def logout(
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    payload: dict = Depends(get_token_payload),
 ):
     '''
     Выйти из системы
     
-    Примечание: JWT токены являются stateless, поэтому сервер не может их отозвать.
-    Клиент должен удалить токен после успешного выхода.
-    В будущем можно реализовать blacklist токенов для более безопасного logout.
+    Токен отзывается по его jti до истечения срока действия.
+    Токены, выданные до появления jti, отозвать нельзя - они
+    действуют до истечения срока.
     '''
+    jti = payload.get('jti')
+    if jti is not None:
+        await token_revocation_list.revoke(
+            jti,
+            current_user.id,
+            datetime.fromtimestamp(payload['exp'], timezone.utc),
+        )
     return LogoutResponse(
         message=f'Успешный выход из системы для пользователя {current_user.email}'
     )
@@ -0,0 +1,54 @@
+'''
+Эндпоинты для ленты изменений
+'''
+import uuid
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.dependencies import get_visible_pipeline_ids
+from crud.change import change_crud
+from database.base import get_async_session
+from models.enums.change import ChangeEntityType
+from schemas.change import ChangeFeedRead, ChangeRead
+from validators.change import encode_change_cursor, validate_change_cursor
+
+router = APIRouter()
+
+
+@router.get(
+    '/',
+    status_code=status.HTTP_200_OK,
+    response_model=ChangeFeedRead,
+    summary='Получить ленту изменений',
+    description='Получить вставки, обновления и удаления пайплайнов, версий и запусков после курсора since (только доступных пайплайнов)',
+)
+async def get_changes(
+    since: Optional[str] = None,
+    types: Optional[list[ChangeEntityType]] = Query(None),
+    limit: int = Query(100, ge=1, le=1000),
+    visible_ids: Optional[list[uuid.UUID]] = Depends(get_visible_pipeline_ids),
+    session: AsyncSession = Depends(get_async_session),
+):
+    '''Получить ленту изменений'''
+
+    changes = await change_crud.get_since(
+        session, validate_change_cursor(since), types, limit, visible_ids
+    )
+    return ChangeFeedRead(
+        changes=[
+            ChangeRead(
+                cursor=encode_change_cursor(change.xact_id, change.id),
+                entity_type=change.entity_type,
+                entity_id=change.entity_id,
+                operation=change.operation,
+                created_at=change.created_at,
+            )
+            for change in changes
+        ],
+        next_cursor=(
+            encode_change_cursor(changes[-1].xact_id, changes[-1].id)
+            if changes else since
+        ),
+    )
@@ -0,0 +1,46 @@
+'''
+Эндпоинты для уведомлений исполнителей о статусах запусков
+'''
+from fastapi import APIRouter, Header, HTTPException, Request, status
+
+from services.callback_buffer import run_callback_buffer
+from validators.executor import (validate_callback_body,
+                                 validate_executor_signature)
+
+router = APIRouter()
+
+
+@router.post(
+    '/{executor_type}',
+    status_code=status.HTTP_202_ACCEPTED,
+    summary='Уведомление исполнителя о статусе запуска',
+    description=(
+        'Принять уведомление исполнителя о статусе запуска по executor_run_id. '
+        'Строка "<X-Signature-Timestamp>." + тело подписывается HMAC-SHA256 '
+        'секретом типа исполнителя (заголовок X-Signature: sha256=<hex>, '
+        'X-Signature-Timestamp - время отправки в секундах Unix). '
+        'Уведомления применяются пачками; ответ отдается после фиксации'
+    ),
+)
+async def receive_executor_callback(
+    executor_type: str,
+    request: Request,
+    x_signature: str = Header(...),
+    x_signature_timestamp: str = Header(...),
+):
+    '''Принять уведомление исполнителя'''
+
+    body = await request.body()
+    validate_executor_signature(
+        executor_type, body, x_signature, x_signature_timestamp
+    )
+    callback = validate_callback_body(body)
+    if not await run_callback_buffer.submit(executor_type, callback):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=(
+                f'Запуск с executor_run_id = {callback.executor_run_id} не найден '
+                f'или переход в статус {callback.status.value} недопустим'
+            )
+        )
+    return True
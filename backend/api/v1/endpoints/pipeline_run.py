@@ -0,0 +1,312 @@
+'''
+Эндпоинты для работы с PipelineRun
+'''
+import uuid
+from typing import Optional
+
+from fastapi import (APIRouter, Depends, Header, HTTPException, Query,
+                     Request, Response, status)
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.dependencies import (authorize_pipeline, get_current_user,
+                              get_visible_pipeline_ids)
+from core.config import settings
+from crud.pipeline_run import pipeline_run_crud
+from database.base import AsyncSessionLocal, get_async_session
+from models.enums.pipeline_run import RunPriority
+from models.enums.tag import TagFilterMode
+from models.pipeline_run import (FINISHED_PIPELINE_RUN_STATUSES,
+                                 PipelineRunStatus)
+from models.user import User
+from crud.run_param_value import run_param_value_crud
+from schemas.pipeline_run import (PipelineRunCreate, PipelineRunRead,
+                                  PipelineRunUpdate, RunLogAppendRead)
+from schemas.run_param_value import RunParamValueRead
+from schemas.tag import TagFacetRead
+from services.run_dispatcher import run_dispatcher
+from services.run_logs import run_log_store
+from validators.executor import validate_executor_signature
+from validators.pipeline_run import (validate_failure_reason,
+                                     validate_log_chunk,
+                                     validate_manual_status,
+                                     validate_param_filters,
+                                     validate_pipeline_run_access,
+                                     validate_status_transition)
+from validators.pipeline_version import validate_pipeline_version_id
+from validators.tag import validate_tag_filter
+
+router = APIRouter()
+
+
+@router.get(
+    '/',
+    status_code=status.HTTP_200_OK,
+    response_model=list[PipelineRunRead],
+    summary='Получить список запусков',
+    description=(
+        'Получить список запусков доступных пайплайнов с фильтрами по пайплайну, версии, статусу, '
+        'приоритету, родительскому запуску (повторы) и параметрам запуска '
+        '(param.<имя>=<значение>, несколько фильтров объединяются через И) '
+        'и тегам (tags=a,b, tag_mode=all|any)'
+    ),
+)
+async def get_all_pipeline_runs(
+    request: Request,
+    offset: int = 0,
+    limit: int = 100,
+    pipeline_id: Optional[uuid.UUID] = None,
+    pipeline_version_id: Optional[uuid.UUID] = None,
+    status: Optional[PipelineRunStatus] = None,
+    priority: Optional[RunPriority] = None,
+    parent_run_id: Optional[uuid.UUID] = None,
+    tags: Optional[str] = None,
+    tag_mode: TagFilterMode = TagFilterMode.ALL,
+    visible_ids: Optional[list[uuid.UUID]] = Depends(get_visible_pipeline_ids),
+    session: AsyncSession = Depends(get_async_session),
+):
+    '''Получить список запусков'''
+
+    return await pipeline_run_crud.get_all(
+        session,
+        offset,
+        limit,
+        pipeline_id=pipeline_id,
+        pipeline_version_id=pipeline_version_id,
+        status=status,
+        priority=priority,
+        parent_run_id=parent_run_id,
+        params=validate_param_filters(request.query_params),
+        tags=validate_tag_filter(tags, tag_mode),
+        pipeline_ids=visible_ids,
+    )
+
+
+@router.get(
+    '/tag-facets',
+    status_code=status.HTTP_200_OK,
+    response_model=list[TagFacetRead],
+    summary='Получить фасеты тегов запусков',
+    description='Получить число запусков доступных пайплайнов по каждому тегу с учетом тех же фильтров, что и у списка',
+)
+async def get_pipeline_run_tag_facets(
+    request: Request,
+    pipeline_id: Optional[uuid.UUID] = None,
+    pipeline_version_id: Optional[uuid.UUID] = None,
+    status: Optional[PipelineRunStatus] = None,
+    priority: Optional[RunPriority] = None,
+    parent_run_id: Optional[uuid.UUID] = None,
+    tags: Optional[str] = None,
+    tag_mode: TagFilterMode = TagFilterMode.ALL,
+    limit: int = Query(50, ge=1, le=settings.TAG_FACETS_MAX_LIMIT),
+    visible_ids: Optional[list[uuid.UUID]] = Depends(get_visible_pipeline_ids),
+    session: AsyncSession = Depends(get_async_session),
+):
+    '''Получить фасеты тегов запусков'''
+
+    return ORJSONResponse(
+        await pipeline_run_crud.get_tag_facets(
+            session,
+            limit,
+            pipeline_id=pipeline_id,
+            pipeline_version_id=pipeline_version_id,
+            status=status,
+            priority=priority,
+            parent_run_id=parent_run_id,
+            params=validate_param_filters(request.query_params) or None,
+            tags=validate_tag_filter(tags, tag_mode),
+            pipeline_ids=visible_ids,
+        )
+    )
+
+
+@router.get(
+    '/{pipeline_run_id}',
+    status_code=status.HTTP_200_OK,
+    response_model=PipelineRunRead,
+    summary='Получить запуск по ID',
+    description='Получить запуск по ID',
+)
+async def get_pipeline_run(
+    pipeline_run_id: uuid.UUID,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    '''Получить запуск по ID (владельцы пайплайна и администраторы)'''
+
+    return await validate_pipeline_run_access(
+        pipeline_run_id, current_user, session
+    )
+
+
+@router.post(
+    '/',
+    status_code=status.HTTP_201_CREATED,
+    response_model=PipelineRunRead,
+    summary='Создать запуск',
+    description='Создать запуск версии пайплайна (владельцы пайплайна и администраторы). Запуск ожидает в PENDING, пока диспетчер не допустит его с учетом лимитов параллельности и приоритета',
+)
+async def create_pipeline_run(
+    create_schema: PipelineRunCreate,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    '''Создать запуск (владельцы пайплайна и администраторы)'''
+
+    pipeline_version = await validate_pipeline_version_id(
+        create_schema.pipeline_version_id, session
+    )
+    await authorize_pipeline(pipeline_version.pipeline_id, current_user, session)
+    return await pipeline_run_crud.create_for_version(
+        session,
+        pipeline_version,
+        current_user.id,
+        create_schema.priority,
+        create_schema.params,
+    )
+
+
+@router.patch(
+    '/{pipeline_run_id}',
+    status_code=status.HTTP_200_OK,
+    response_model=PipelineRunRead,
+    summary='Обновить запуск',
+    description='Обновить запуск (в том числе статус с проверкой допустимости перехода; в RUNNING запуск переводит только диспетчер). При переходе в FAILED с повторяемой причиной создается отложенный повтор по политике пайплайна. Выполняющийся запуск, переведенный в FAILED, отменяется на стороне исполнителя',
+)
+async def update_pipeline_run(
+    pipeline_run_id: uuid.UUID,
+    update_schema: PipelineRunUpdate,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    '''Обновить запуск (владельцы пайплайна и администраторы)'''
+
+    validate_failure_reason(update_schema)
+    db_run = await validate_pipeline_run_access(
+        pipeline_run_id, current_user, session
+    )
+    if update_schema.status is not None:
+        validate_status_transition(db_run, update_schema.status)
+        validate_manual_status(db_run, update_schema.status)
+    executor_run_id = (
+        db_run.executor_run_id
+        if db_run.status is PipelineRunStatus.RUNNING
+        and update_schema.status is PipelineRunStatus.FAILED
+        else None
+    )
+    db_run = await pipeline_run_crud.update(session, db_run, update_schema)
+    if executor_run_id is not None:
+        executor_type = await pipeline_run_crud.get_executor_type(
+            session, pipeline_run_id
+        )
+        await run_dispatcher.cancel(executor_type, executor_run_id)
+    return db_run
+
+
+@router.get(
+    '/{pipeline_run_id}/params',
+    status_code=status.HTTP_200_OK,
+    response_model=list[RunParamValueRead],
+    summary='Получить параметры запуска',
+    description='Получить параметры запуска',
+)
+async def get_pipeline_run_params(
+    pipeline_run_id: uuid.UUID,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    '''Получить параметры запуска (владельцы пайплайна и администраторы)'''
+
+    await validate_pipeline_run_access(pipeline_run_id, current_user, session)
+    return await run_param_value_crud.get_by_run(session, pipeline_run_id)
+
+
+@router.get(
+    '/{pipeline_run_id}/logs',
+    status_code=status.HTTP_200_OK,
+    summary='Получить лог запуска',
+    description=(
+        'Получить кусок лога запуска начиная с offset (отрицательный offset - '
+        'от конца лога). Смещения возвращаются в заголовках X-Log-Offset, '
+        'X-Log-Next-Offset и X-Log-Size. При follow=true лог отдается потоком '
+        'по мере записи, пока запуск не завершится. Доступно владельцам '
+        'пайплайна и администраторам'
+    ),
+)
+async def get_pipeline_run_logs(
+    pipeline_run_id: uuid.UUID,
+    offset: int = 0,
+    limit: int = Query(
+        settings.RUN_LOG_READ_CHUNK_BYTES, ge=1, le=settings.RUN_LOG_SEGMENT_BYTES
+    ),
+    follow: bool = False,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    '''Получить лог запуска'''
+
+    await validate_pipeline_run_access(pipeline_run_id, current_user, session)
+    if follow:
+        # Сессия запроса закрывается только после конца потока: без этого
+        # каждый подписчик держал бы соединение пула (idle in transaction)
+        await session.close()
+
+        async def is_finished() -> bool:
+            '''Завершен ли запуск (сессия на проверку, а не на весь поток)'''
+            async with AsyncSessionLocal() as status_session:
+                run_status = await pipeline_run_crud.get_status(
+                    status_session, pipeline_run_id
+                )
+            return run_status is None or run_status in FINISHED_PIPELINE_RUN_STATUSES
+
+        return StreamingResponse(
+            run_log_store.follow(pipeline_run_id, offset, is_finished),
+            media_type='text/plain; charset=utf-8',
+        )
+    data, start, size = await run_log_store.read(pipeline_run_id, offset, limit)
+    return Response(
+        content=data,
+        media_type='text/plain; charset=utf-8',
+        headers={
+            'X-Log-Offset': str(start),
+            'X-Log-Next-Offset': str(start + len(data)),
+            'X-Log-Size': str(size),
+        },
+    )
+
+
+@router.post(
+    '/{pipeline_run_id}/logs',
+    status_code=status.HTTP_201_CREATED,
+    response_model=RunLogAppendRead,
+    summary='Дописать в лог запуска',
+    description=(
+        'Дописать тело запроса в конец лога запуска (записи фиксируются '
+        'пачками). Запрос подписывается исполнителем запуска так же, как '
+        'уведомления о статусе (X-Signature, X-Signature-Timestamp)'
+    ),
+)
+async def append_pipeline_run_logs(
+    pipeline_run_id: uuid.UUID,
+    request: Request,
+    x_signature: str = Header(...),
+    x_signature_timestamp: str = Header(...),
+    session: AsyncSession = Depends(get_async_session),
+):
+    '''Дописать в лог запуска (только исполнитель запуска)'''
+
+    executor_type = await pipeline_run_crud.get_executor_type(
+        session, pipeline_run_id
+    )
+    if executor_type is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f'PipelineRun с ID = {pipeline_run_id} не найден'
+        )
+    data = await request.body()
+    validate_executor_signature(
+        executor_type, data, x_signature, x_signature_timestamp
+    )
+    validate_log_chunk(data)
+    offset, next_offset = await run_log_store.append(pipeline_run_id, data)
+    return RunLogAppendRead(offset=offset, next_offset=next_offset)
@@ -0,0 +1,148 @@
+'''
+Эндпоинты для работы с расписаниями запусков
+'''
+import uuid
+from typing import Optional
+
+from fastapi import APIRouter, Depends, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.dependencies import (authorize_pipeline, get_current_user,
+                              get_visible_pipeline_ids)
+from crud.pipeline_schedule import pipeline_schedule_crud
+from database.base import get_async_session
+from models.user import User
+from schemas.pipeline_schedule import (PipelineScheduleCreate,
+                                       PipelineScheduleRead,
+                                       PipelineScheduleUpdate)
+from services.scheduler import run_scheduler
+from validators.pipeline import validate_pipeline_id
+from validators.pipeline_schedule import (validate_cron,
+                                          validate_pipeline_schedule_access,
+                                          validate_schedule_version)
+from validators.pipeline_version import validate_pipeline_version_id
+
+router = APIRouter()
+
+
+@router.get(
+    '/',
+    status_code=status.HTTP_200_OK,
+    response_model=list[PipelineScheduleRead],
+    summary='Получить список расписаний',
+    description='Получить список расписаний доступных пайплайнов с фильтром по пайплайну',
+)
+async def get_all_pipeline_schedules(
+    offset: int = 0,
+    limit: int = 100,
+    pipeline_id: Optional[uuid.UUID] = None,
+    visible_ids: Optional[list[uuid.UUID]] = Depends(get_visible_pipeline_ids),
+    session: AsyncSession = Depends(get_async_session),
+):
+    '''Получить список расписаний'''
+
+    return await pipeline_schedule_crud.get_all(
+        session,
+        offset,
+        limit,
+        pipeline_id=pipeline_id,
+        pipeline_ids=visible_ids,
+    )
+
+
+@router.get(
+    '/{pipeline_schedule_id}',
+    status_code=status.HTTP_200_OK,
+    response_model=PipelineScheduleRead,
+    summary='Получить расписание по ID',
+    description='Получить расписание по ID',
+)
+async def get_pipeline_schedule(
+    pipeline_schedule_id: uuid.UUID,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    '''Получить расписание по ID'''
+
+    return await validate_pipeline_schedule_access(
+        pipeline_schedule_id, current_user, session
+    )
+
+
+@router.post(
+    '/',
+    status_code=status.HTTP_201_CREATED,
+    response_model=PipelineScheduleRead,
+    summary='Создать расписание',
+    description='Создать cron-расписание запусков пайплайна (время в UTC)',
+)
+async def create_pipeline_schedule(
+    create_schema: PipelineScheduleCreate,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    '''Создать расписание (владельцы пайплайна и администраторы)'''
+
+    validate_cron(create_schema.cron)
+    await authorize_pipeline(create_schema.pipeline_id, current_user, session)
+    await validate_pipeline_id(create_schema.pipeline_id, session)
+    if create_schema.pipeline_version_id is not None:
+        pipeline_version = await validate_pipeline_version_id(
+            create_schema.pipeline_version_id, session
+        )
+        validate_schedule_version(pipeline_version, create_schema.pipeline_id)
+    db_schedule = await pipeline_schedule_crud.create(session, create_schema)
+    run_scheduler.notify()
+    return db_schedule
+
+
+@router.patch(
+    '/{pipeline_schedule_id}',
+    status_code=status.HTTP_200_OK,
+    response_model=PipelineScheduleRead,
+    summary='Обновить расписание',
+    description='Обновить расписание',
+)
+async def update_pipeline_schedule(
+    pipeline_schedule_id: uuid.UUID,
+    update_schema: PipelineScheduleUpdate,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    '''Обновить расписание (владельцы пайплайна и администраторы)'''
+
+    db_schedule = await validate_pipeline_schedule_access(
+        pipeline_schedule_id, current_user, session
+    )
+    if update_schema.cron is not None:
+        validate_cron(update_schema.cron)
+    if update_schema.pipeline_version_id is not None:
+        pipeline_version = await validate_pipeline_version_id(
+            update_schema.pipeline_version_id, session
+        )
+        validate_schedule_version(pipeline_version, db_schedule.pipeline_id)
+    db_schedule = await pipeline_schedule_crud.update(
+        session, db_schedule, update_schema
+    )
+    run_scheduler.notify()
+    return db_schedule
+
+
+@router.delete(
+    '/{pipeline_schedule_id}',
+    status_code=status.HTTP_200_OK,
+    summary='Удалить расписание',
+    description='Удалить расписание',
+)
+async def delete_pipeline_schedule(
+    pipeline_schedule_id: uuid.UUID,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    '''Удалить расписание (владельцы пайплайна и администраторы)'''
+
+    db_schedule = await validate_pipeline_schedule_access(
+        pipeline_schedule_id, current_user, session
+    )
+    await pipeline_schedule_crud.delete(session, db_schedule)
+    return True
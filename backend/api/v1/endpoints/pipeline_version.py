@@ -1,35 +1,146 @@
 import uuid
+from typing import Optional
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, status
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from api.dependencies import get_async_session
+from api.dependencies import (authorize_pipeline, get_async_session,
+                              get_current_user, get_visible_pipeline_ids)
+from core.config import settings
 from crud.pipeline_version import pipeline_version_crud
+from models.enums.tag import TagFilterMode
+from models.pipeline_version import PipelineVersion
+from models.user import User
+from schemas.batch import BatchReadItem, BatchReadRequest, to_batch_items
 from schemas.pipeline_version import (PipelineVersionCreate,
                                       PipelineVersionRead,
                                       PipelineVersionUpdate)
+from schemas.tag import TagFacetRead
+from validators.batch import validate_batch_ids
 from validators.pipeline import validate_pipeline_id
-from validators.pipeline_version import validate_pipeline_version_id
+from validators.pipeline_version import (validate_pipeline_version_access,
+                                         validate_pipeline_version_id,
+                                         validate_pipeline_version_visible)
+from validators.tag import validate_tag_filter
 
 
 router = APIRouter()
 
 
+def visible_only(
+    versions: list[Optional[PipelineVersion]],
+    visible_ids: Optional[list[uuid.UUID]],
+) -> list[Optional[PipelineVersion]]:
+    '''Заменить версии недоступных пайплайнов на None (found = false)'''
+    if visible_ids is None:
+        return versions
+    visible = set(visible_ids)
+    return [
+        version if version is not None and version.pipeline_id in visible else None
+        for version in versions
+    ]
+
+
 @router.get(
     '/',
     status_code=status.HTTP_200_OK,
     response_model=list[PipelineVersionRead],
     summary='Получить все PipelineVersion',
-    description='Получить все PipelineVersion',
+    description='Получить PipelineVersion доступных пайплайнов (tags=a,b - фильтр по тегам, tag_mode=all|any)',
 )
 async def get_all_pipeline_versions(
     session: AsyncSession = Depends(get_async_session),
     offset: int = 0,
     limit: int = 100,
-) -> list[PipelineVersionRead]:
+    tags: Optional[str] = None,
+    tag_mode: TagFilterMode = TagFilterMode.ALL,
+    visible_ids: Optional[list[uuid.UUID]] = Depends(get_visible_pipeline_ids),
+) -> ORJSONResponse:
     '''Получить все PipelineVersion'''
 
-    return await pipeline_version_crud.get_all(session, offset, limit)
+    return ORJSONResponse(
+        await pipeline_version_crud.get_all_mappings(
+            session,
+            offset=offset,
+            limit=limit,
+            tags=validate_tag_filter(tags, tag_mode),
+            pipeline_ids=visible_ids,
+        )
+    )
+
+
+@router.get(
+    '/tag-facets',
+    status_code=status.HTTP_200_OK,
+    response_model=list[TagFacetRead],
+    summary='Получить фасеты тегов PipelineVersion',
+    description='Получить число PipelineVersion доступных пайплайнов по каждому тегу с учетом фильтра по тегам',
+)
+async def get_pipeline_version_tag_facets(
+    session: AsyncSession = Depends(get_async_session),
+    tags: Optional[str] = None,
+    tag_mode: TagFilterMode = TagFilterMode.ALL,
+    limit: int = Query(50, ge=1, le=settings.TAG_FACETS_MAX_LIMIT),
+    visible_ids: Optional[list[uuid.UUID]] = Depends(get_visible_pipeline_ids),
+) -> ORJSONResponse:
+    '''Получить фасеты тегов PipelineVersion'''
+
+    return ORJSONResponse(
+        await pipeline_version_crud.get_tag_facets(
+            session,
+            limit,
+            tags=validate_tag_filter(tags, tag_mode),
+            pipeline_ids=visible_ids,
+        )
+    )
+
+@router.get(
+    '/batch',
+    status_code=status.HTTP_200_OK,
+    response_model=list[BatchReadItem[PipelineVersionRead]],
+    summary='Получить PipelineVersion по списку ID',
+    description='Получить PipelineVersion по списку ID одним запросом (в порядке запроса, found = false для ненайденных)',
+)
+async def get_pipeline_versions_batch(
+    ids: list[uuid.UUID] = Query(...),
+    visible_ids: Optional[list[uuid.UUID]] = Depends(get_visible_pipeline_ids),
+    session: AsyncSession = Depends(get_async_session),
+):
+    '''Получить PipelineVersion по списку ID'''
+
+    validate_batch_ids(ids)
+    return to_batch_items(
+        ids,
+        visible_only(
+            await pipeline_version_crud.get_by_ids(session, ids), visible_ids
+        ),
+    )
+
+
+@router.post(
+    '/batch',
+    status_code=status.HTTP_200_OK,
+    response_model=list[BatchReadItem[PipelineVersionRead]],
+    summary='Получить PipelineVersion по списку ID (POST)',
+    description='Вариант пакетного чтения для длинных списков ID',
+)
+async def post_pipeline_versions_batch(
+    batch_data: BatchReadRequest,
+    visible_ids: Optional[list[uuid.UUID]] = Depends(get_visible_pipeline_ids),
+    session: AsyncSession = Depends(get_async_session),
+):
+    '''Получить PipelineVersion по списку ID (POST)'''
+
+    validate_batch_ids(batch_data.ids)
+    return to_batch_items(
+        batch_data.ids,
+        visible_only(
+            await pipeline_version_crud.get_by_ids(session, batch_data.ids),
+            visible_ids,
+        ),
+    )
+
 
 @router.get(
     '/{pipeline_version_id}',
@@ -40,11 +151,15 @@ async def get_all_pipeline_versions(
 )
 async def get_pipeline_version_by_id(
     pipeline_version_id: uuid.UUID,
+    visible_ids: Optional[list[uuid.UUID]] = Depends(get_visible_pipeline_ids),
     session: AsyncSession = Depends(get_async_session),
 ) -> PipelineVersionRead:
     '''Получить PipelineVersion по ID'''
 
-    return await validate_pipeline_version_id(pipeline_version_id, session)
+    return validate_pipeline_version_visible(
+        await validate_pipeline_version_id(pipeline_version_id, session),
+        visible_ids,
+    )
 
 
 @router.post(
@@ -52,14 +167,16 @@ async def get_pipeline_version_by_id(
     status_code=status.HTTP_200_OK,
     response_model=PipelineVersionRead,
     summary='Создать новую версию пайплайна',
-    description='Создает версию пайплайна',
+    description='Создает версию пайплайна (владельцы пайплайна и администраторы)',
 )
 async def create_pipeline_version(
     create_schema: PipelineVersionCreate,
+    current_user: User = Depends(get_current_user),
     session: AsyncSession = Depends(get_async_session)
 ):
     '''Создать новую версию пайплайна'''
 
+    await authorize_pipeline(create_schema.pipeline_id, current_user, session)
     await validate_pipeline_id(create_schema.pipeline_id, session)
     new_pipeline_version = await pipeline_version_crud.create(session, create_schema)
     return await pipeline_version_crud.get_by_id(session, new_pipeline_version.id)
@@ -70,16 +187,19 @@ async def create_pipeline_version(
     status_code=status.HTTP_200_OK,
     response_model=PipelineVersionRead,
     summary='Обновление версии пайплайна',
-    description='Обновление версии пайплайна'
+    description='Обновление версии пайплайна (владельцы пайплайна и администраторы)'
 )
 async def update_pipeline_version(
     update_schema: PipelineVersionUpdate,
     pipeline_version_id: uuid.UUID,
+    current_user: User = Depends(get_current_user),
     session: AsyncSession = Depends(get_async_session),
 ):
     '''Обновление версии пайплайна'''
 
-    current_pipeline_version = await validate_pipeline_version_id(pipeline_version_id, session)
+    current_pipeline_version = await validate_pipeline_version_access(
+        pipeline_version_id, current_user, session
+    )
     pipeline_version_id = current_pipeline_version.id
     await pipeline_version_crud.update(
         session,
@@ -94,16 +214,17 @@ async def update_pipeline_version(
 @router.delete(
     '/{pipeline_version_id}',
     summary='Удаление версии пайплайна',
-    description='Удаление версии пайплайна'
+    description='Удаление версии пайплайна (владельцы пайплайна и администраторы)'
 )
 async def delete_pipeline_version(
     pipeline_version_id: uuid.UUID,
+    current_user: User = Depends(get_current_user),
     session: AsyncSession = Depends(get_async_session)
 ):
     '''Удаление версии пайплайна'''
 
-    db_pipeline_version = await validate_pipeline_version_id(
-        pipeline_version_id, session
+    db_pipeline_version = await validate_pipeline_version_access(
+        pipeline_version_id, current_user, session
     )
     return await pipeline_version_crud.delete(session, db_pipeline_version)
 
@@ -117,11 +238,15 @@ async def delete_pipeline_version(
 )
 async def get_active_pipeline_version(
     pipeline_version_id: uuid.UUID,
+    visible_ids: Optional[list[uuid.UUID]] = Depends(get_visible_pipeline_ids),
     session: AsyncSession = Depends(get_async_session)
 ):
     '''Получить активную версию пайплайна'''
 
-    await validate_pipeline_version_id(pipeline_version_id, session)
+    validate_pipeline_version_visible(
+        await validate_pipeline_version_id(pipeline_version_id, session),
+        visible_ids,
+    )
     return await pipeline_version_crud.get_active_by_pipeline_id(
         session,
         pipeline_version_id
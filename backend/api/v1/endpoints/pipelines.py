@@ -2,41 +2,139 @@
 Эндпоинты для работы с Pipeline
 '''
 import uuid
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
+from api.dependencies import (authorize_pipeline, get_current_user,
+                              get_visible_pipeline_ids)
+from core.config import settings
 from crud.pipeline import pipeline_crud
 from crud.pipeline_version import pipeline_version_crud
 from database.base import get_async_session
-from models.pipeline import Pipeline
+from models.enums.tag import TagFilterMode
+from models.user import User
+from schemas.batch import BatchReadItem, BatchReadRequest, to_batch_items
 from schemas.pipeline import PipelineCreate, PipelineRead, PipelineUpdate
 from schemas.pipeline_version import PipelineVersionRead
+from schemas.tag import TagFacetRead
+from validators.batch import validate_batch_ids
 from validators.pipeline import (validate_pipeline_code, validate_pipeline_id,
                                  validate_pipeline_name)
-from validators.user import validate_user_id
+from services.owner_index import pipeline_owner_index
+from validators.tag import validate_tag_filter
 
 router = APIRouter()
 
 
+def visible_only(
+    ids: list[uuid.UUID], visible_ids: Optional[list[uuid.UUID]]
+) -> list[uuid.UUID]:
+    '''Заменить недоступные ID на None (в ответе они будут found = false)'''
+    if visible_ids is None:
+        return ids
+    visible = set(visible_ids)
+    return [id if id in visible else None for id in ids]
+
+
 @router.get(
     '/',
     status_code=status.HTTP_200_OK,
     response_model=list[PipelineRead],
     summary='Получить список всех пайплайнов',
-    description='Получить список всех пайплайнов',
+    description='Получить список доступных пайплайнов: администратору - всех, остальным - своих (tags=a,b - фильтр по тегам, tag_mode=all|any)',
 )
 async def get_all_pipelines(
     offset: int = 0,
     limit: int = 100,
     is_active: bool = True,
+    tags: Optional[str] = None,
+    tag_mode: TagFilterMode = TagFilterMode.ALL,
+    visible_ids: Optional[list[uuid.UUID]] = Depends(get_visible_pipeline_ids),
     session: AsyncSession = Depends(get_async_session)
 ):
     '''Получить список всех пайплайнов'''
-    return await pipeline_crud.get_all_pipelines(session, offset, limit, is_active)
+    return ORJSONResponse(
+        await pipeline_crud.get_all_mappings(
+            session,
+            offset=offset,
+            limit=limit,
+            is_active=is_active,
+            tags=validate_tag_filter(tags, tag_mode),
+            ids=visible_ids,
+        )
+    )
+
+
+@router.get(
+    '/tag-facets',
+    status_code=status.HTTP_200_OK,
+    response_model=list[TagFacetRead],
+    summary='Получить фасеты тегов пайплайнов',
+    description='Получить число доступных пайплайнов по каждому тегу с учетом тех же фильтров, что и у списка',
+)
+async def get_pipeline_tag_facets(
+    is_active: Optional[bool] = None,
+    tags: Optional[str] = None,
+    tag_mode: TagFilterMode = TagFilterMode.ALL,
+    limit: int = Query(50, ge=1, le=settings.TAG_FACETS_MAX_LIMIT),
+    visible_ids: Optional[list[uuid.UUID]] = Depends(get_visible_pipeline_ids),
+    session: AsyncSession = Depends(get_async_session)
+):
+    '''Получить фасеты тегов пайплайнов'''
+    return ORJSONResponse(
+        await pipeline_crud.get_tag_facets(
+            session,
+            limit,
+            is_active=is_active,
+            tags=validate_tag_filter(tags, tag_mode),
+            ids=visible_ids,
+        )
+    )
+
+
+@router.get(
+    '/batch',
+    status_code=status.HTTP_200_OK,
+    response_model=list[BatchReadItem[PipelineRead]],
+    summary='Получить пайплайны по списку ID',
+    description='Получить пайплайны по списку ID одним запросом (в порядке запроса, found = false для ненайденных)',
+)
+async def get_pipelines_batch(
+    ids: list[uuid.UUID] = Query(...),
+    visible_ids: Optional[list[uuid.UUID]] = Depends(get_visible_pipeline_ids),
+    session: AsyncSession = Depends(get_async_session)
+):
+    '''Получить пайплайны по списку ID'''
+    validate_batch_ids(ids)
+    return to_batch_items(
+        ids,
+        await pipeline_crud.get_by_ids(session, visible_only(ids, visible_ids)),
+    )
+
+
+@router.post(
+    '/batch',
+    status_code=status.HTTP_200_OK,
+    response_model=list[BatchReadItem[PipelineRead]],
+    summary='Получить пайплайны по списку ID (POST)',
+    description='Вариант пакетного чтения для длинных списков ID',
+)
+async def post_pipelines_batch(
+    batch_data: BatchReadRequest,
+    visible_ids: Optional[list[uuid.UUID]] = Depends(get_visible_pipeline_ids),
+    session: AsyncSession = Depends(get_async_session)
+):
+    '''Получить пайплайны по списку ID (POST)'''
+    validate_batch_ids(batch_data.ids)
+    return to_batch_items(
+        batch_data.ids,
+        await pipeline_crud.get_by_ids(
+            session, visible_only(batch_data.ids, visible_ids)
+        )
+    )
 
 
 @router.get(
@@ -47,20 +145,21 @@ async def get_all_pipelines(
     description='Получить список пайплайнов текущего пользователя',
 )
 async def get_users_pipelines(
-    user_id: uuid.UUID,  # TODO: Получать из токена/сессии
     offset: int = 0,
     limit: int = 100,
+    current_user: User = Depends(get_current_user),
     session: AsyncSession = Depends(get_async_session)
 ):
     '''Получить список пайплайнов пользователя'''
-    pipelines_list = await pipeline_crud.get_by_user(
-        session,
-        user_id=user_id,
-        offset=offset,
-        limit=limit
+    await pipeline_owner_index.ensure_fresh()
+    return ORJSONResponse(
+        await pipeline_crud.get_all_mappings(
+            session,
+            offset=offset,
+            limit=limit,
+            ids=pipeline_owner_index.pipelines_of(current_user.id),
+        )
     )
-    
-    return pipelines_list
 
 
 @router.get(
@@ -72,6 +171,7 @@ async def get_users_pipelines(
 )
 async def get_pipeline(
     pipeline_id: uuid.UUID,
+    current_user: User = Depends(authorize_pipeline),
     session: AsyncSession = Depends(get_async_session)
 ):
     '''Получить пайплайн по ID'''
@@ -84,13 +184,7 @@ async def get_pipeline(
             status_code=status.HTTP_404_NOT_FOUND,
             detail='Pipeline not found or access denied'
         )
-    return (
-        await session.execute(
-            select(Pipeline)
-            .where(Pipeline.id == pipeline_id)
-            .options(selectinload(Pipeline.owners))
-        )
-    ).scalar_one_or_none()
+    return db_pipeline
 
 
 @router.post(
@@ -102,28 +196,21 @@ async def get_pipeline(
 )
 async def create_pipeline(
     pipeline_data: PipelineCreate,
-    user_id: uuid.UUID,  # TODO: Получать из токена/сессии
+    current_user: User = Depends(get_current_user),
     session: AsyncSession = Depends(get_async_session)
 ):
     '''Создать новый пайплайн'''
 
     # Вызов валидоторов
-    await validate_user_id(user_id, session)
     await validate_pipeline_code(pipeline_data.code, session)
     await validate_pipeline_name(pipeline_data.name, session)
 
     db_pipeline = await pipeline_crud.create_for_user(
         session,
         create_schema=pipeline_data,
-        user_id=user_id
+        user_id=current_user.id
     )
-    return (
-        await session.execute(
-            select(Pipeline)
-            .where(Pipeline.id == db_pipeline.id)
-            .options(selectinload(Pipeline.owners))
-        )
-    ).scalar_one_or_none()
+    return await pipeline_crud.get_by_id(session, db_pipeline.id)
 
 
 @router.patch(
@@ -136,6 +223,7 @@ async def create_pipeline(
 async def update_pipeline(
     pipeline_id: uuid.UUID,
     pipeline_data: PipelineUpdate,
+    current_user: User = Depends(authorize_pipeline),
     session: AsyncSession = Depends(get_async_session)
 ):
     '''Частично обновить пайплайн'''
@@ -161,6 +249,7 @@ async def update_pipeline(
 )
 async def delete_pipeline(
     pipeline_id: uuid.UUID,
+    current_user: User = Depends(authorize_pipeline),
     session: AsyncSession = Depends(get_async_session)
 ):
     '''Удалить пайплайн'''
@@ -180,6 +269,7 @@ async def delete_pipeline(
 )
 async def get_pipeline_versions(
     pipeline_id: uuid.UUID,
+    current_user: User = Depends(authorize_pipeline),
     session: AsyncSession = Depends(get_async_session)
 ):
     '''Получить список версий пайплайна'''
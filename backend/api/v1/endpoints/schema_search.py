@@ -0,0 +1,74 @@
+'''
+Эндпоинты для поиска по JSONB schema
+'''
+import uuid
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.dependencies import get_visible_pipeline_ids
+from crud.schema_search import restrict_to_pipelines, schema_search_query
+from database.base import get_async_session
+from models.pipeline_version import PipelineVersion
+from models.run_artifact import RunArtifact
+from schemas.pipeline_version import PipelineVersionInDB
+from schemas.run_artifact import RunArtifactRead
+from schemas.schema_search import SchemaSearchRequest, SchemaSearchTarget
+from validators.schema_search import (validate_schema_search_plan,
+                                      validate_schema_search_request)
+
+router = APIRouter()
+
+SEARCH_TARGETS = {
+    SchemaSearchTarget.PIPELINE_VERSIONS: (PipelineVersion, PipelineVersionInDB),
+    SchemaSearchTarget.RUN_ARTIFACTS: (RunArtifact, RunArtifactRead),
+}
+
+
+@router.post(
+    '/{target}',
+    status_code=status.HTTP_200_OK,
+    response_model=list[PipelineVersionInDB] | list[RunArtifactRead],
+    summary='Поиск по содержимому schema',
+    description=(
+        'Найти версии пайплайнов или артефакты запусков по содержимому JSONB '
+        'schema: contains (schema @> contains) или ограниченный JSONPath '
+        '(schema @? path). Фильтры, которые не могут использовать GIN индекс '
+        'на большой таблице, отклоняются по плану запроса. Ищется только '
+        'среди доступных пайплайнов'
+    ),
+)
+async def search_by_schema(
+    target: SchemaSearchTarget,
+    search_data: SchemaSearchRequest,
+    visible_ids: Optional[list[uuid.UUID]] = Depends(get_visible_pipeline_ids),
+    session: AsyncSession = Depends(get_async_session),
+):
+    '''Поиск по содержимому schema'''
+
+    validate_schema_search_request(search_data)
+    model, read_schema = SEARCH_TARGETS[target]
+    query = schema_search_query(model, search_data.contains, search_data.path)
+    try:
+        # План проверяется для фильтра по schema без ORDER BY и LIMIT:
+        # ограничение по пайплайнам не должно маскировать фильтр,
+        # который не может использовать GIN индекс
+        await validate_schema_search_plan(session, query, model)
+        result = await session.execute(
+            restrict_to_pipelines(query, model, visible_ids)
+            .order_by(model.id)
+            .offset(search_data.offset)
+            .limit(search_data.limit)
+        )
+    except DBAPIError as error:
+        await session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f'Некорректный фильтр: {error.orig}'
+        )
+    return [
+        read_schema.model_validate(db_object)
+        for db_object in result.scalars().all()
+    ]
@@ -1,10 +1,21 @@
-from fastapi import APIRouter, Depends, status
+import uuid
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query, status
+from fastapi.responses import ORJSONResponse
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from database.base import get_async_session
-from crud.tag import tag_crud
-from validators.tag import validate_tag_id
-from schemas.tag import TagRead
+from crud.tag import tag_crud, tag_link_crud
+from core.config import settings
+from models.enums.tag import TagEntityType, TagType
+from services.tag_suggest import tag_suggest_index
+from validators.tag import (validate_tag_id, validate_tag_link,
+                            validate_tag_link_unique,
+                            validate_tag_links_bulk_request,
+                            validate_tagged_entity)
+from schemas.tag import (TagLinkCreate, TagLinkRead, TagLinksBulkRequest,
+                         TagLinksBulkResult, TagRead, TagSuggestion)
 
 router = APIRouter()
 
@@ -23,6 +34,28 @@ async def get_all_tags(
     return await tag_crud.get_all(session)
 
 
+@router.get(
+    '/suggest',
+    response_model=list[TagSuggestion],
+    status_code=status.HTTP_200_OK,
+    summary='Подсказки тегов по префиксу',
+    description=(
+        'Теги, имя которых начинается с prefix (без учета регистра), '
+        'опционально только одного типа, по убыванию числа использований. '
+        'Отдается из индекса в памяти'
+    ),
+)
+async def suggest_tags(
+    prefix: str = Query('', max_length=255),
+    type: Optional[TagType] = None,
+    limit: int = Query(10, ge=1, le=settings.TAG_SUGGEST_MAX_LIMIT),
+):
+    '''Подсказки тегов по префиксу'''
+
+    await tag_suggest_index.ensure_fresh()
+    return ORJSONResponse(tag_suggest_index.suggest(prefix, type, limit))
+
+
 @router.get(
     '/tags/{tag_id}',
     response_model=TagRead,
@@ -37,3 +70,117 @@ async def get_tag_by_id(
     '''Получить тег по ID'''
 
     return await validate_tag_id(tag_id, session)
+
+
+@router.get(
+    '/{tag_id}/links',
+    response_model=list[TagLinkRead],
+    status_code=status.HTTP_200_OK,
+    summary='Получить связи тега',
+    description='Получить сущности, к которым привязан тег (опционально только одного типа)',
+)
+async def get_tag_links(
+    tag_id: int,
+    entity_type: Optional[TagEntityType] = None,
+    offset: int = 0,
+    limit: int = 100,
+    session: AsyncSession = Depends(get_async_session),
+) -> list[TagLinkRead]:
+    '''Получить связи тега'''
+
+    await validate_tag_id(tag_id, session)
+    return await tag_link_crud.get_by_tag(
+        session, tag_id, entity_type, offset, limit
+    )
+
+
+@router.post(
+    '/{tag_id}/links',
+    response_model=TagLinkRead,
+    status_code=status.HTTP_201_CREATED,
+    summary='Привязать тег к сущности',
+    description='Привязать тег к пайплайну, версии пайплайна или запуску',
+)
+async def create_tag_link(
+    tag_id: int,
+    create_schema: TagLinkCreate,
+    session: AsyncSession = Depends(get_async_session),
+) -> TagLinkRead:
+    '''Привязать тег к сущности'''
+
+    await validate_tag_id(tag_id, session)
+    await validate_tagged_entity(
+        create_schema.entity_type, create_schema.entity_id, session
+    )
+    await validate_tag_link_unique(
+        tag_id, create_schema.entity_type, create_schema.entity_id, session
+    )
+    return await tag_link_crud.create_for_tag(session, tag_id, create_schema)
+
+
+@router.post(
+    '/{tag_id}/links:bulk',
+    response_model=TagLinksBulkResult,
+    status_code=status.HTTP_200_OK,
+    summary='Пакетно привязать тег',
+    description=(
+        'Привязать тег к списку сущностей (entity_ids) или ко всем версиям '
+        '(запускам) пайплайна (pipeline_id). Обработка идет пачками, каждая '
+        'пачка - отдельная транзакция. Возвращает число созданных связей, '
+        'уже существовавших и ненайденных сущностей'
+    ),
+)
+async def bulk_create_tag_links(
+    tag_id: int,
+    bulk_request: TagLinksBulkRequest,
+    session: AsyncSession = Depends(get_async_session),
+) -> TagLinksBulkResult:
+    '''Пакетно привязать тег'''
+
+    await validate_tag_id(tag_id, session)
+    await validate_tag_links_bulk_request(bulk_request, session)
+    return await tag_link_crud.bulk_link(session, tag_id, bulk_request)
+
+
+@router.delete(
+    '/{tag_id}/links:bulk',
+    response_model=TagLinksBulkResult,
+    status_code=status.HTTP_200_OK,
+    summary='Пакетно отвязать тег',
+    description=(
+        'Отвязать тег от списка сущностей (entity_ids) или от всех версий '
+        '(запусков) пайплайна (pipeline_id) пачками. Возвращает число '
+        'удаленных связей'
+    ),
+)
+async def bulk_delete_tag_links(
+    tag_id: int,
+    bulk_request: TagLinksBulkRequest,
+    session: AsyncSession = Depends(get_async_session),
+) -> TagLinksBulkResult:
+    '''Пакетно отвязать тег'''
+
+    await validate_tag_id(tag_id, session)
+    await validate_tag_links_bulk_request(bulk_request, session)
+    return await tag_link_crud.bulk_link(
+        session, tag_id, bulk_request, remove=True
+    )
+
+
+@router.delete(
+    '/{tag_id}/links/{entity_type}/{entity_id}',
+    status_code=status.HTTP_200_OK,
+    summary='Отвязать тег от сущности',
+    description='Отвязать тег от сущности',
+)
+async def delete_tag_link(
+    tag_id: int,
+    entity_type: TagEntityType,
+    entity_id: uuid.UUID,
+    session: AsyncSession = Depends(get_async_session),
+):
+    '''Отвязать тег от сущности'''
+
+    db_link = await validate_tag_link(tag_id, entity_type, entity_id, session)
+    await tag_link_crud.delete(session, db_link)
+    return True
@@ -1,16 +1,27 @@
 import uuid
+from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from fastapi import (APIRouter, Depends, File, HTTPException, Query,
+                     UploadFile, status)
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from api.dependencies import get_current_user as get_current_user_dependency
+from api.dependencies import require_admin
+from core.config import settings
 from crud.user import user_crud
 from database.base import get_async_session
-from models.user import User
-from schemas.user import UserCreate, UserRead, UserUpdate
-from validators.user import validate_user_email, validate_user_id
+from models.enums.user import UserExpand
+from models.user import User, UserRole
+from schemas.batch import BatchReadItem, BatchReadRequest, to_batch_items
+from schemas.user import (UserCreate, UserImportResult, UserListRead, UserPage,
+                          UserRead, UserUpdate)
+from services.user_import import import_users
+from validators.batch import validate_batch_ids
+from validators.user import (encode_user_cursor, validate_user_cursor,
+                             validate_user_email, validate_user_id,
+                             validate_user_import_file,
+                             validate_user_search_query)
 
 router = APIRouter()
 
@@ -34,17 +45,96 @@ async def get_current_user(
 @router.get(
     '/',
     status_code=status.HTTP_200_OK,
-    response_model=list[UserRead],
+    response_model=UserPage,
     summary='Получить всех пользователей',
-    description='Получить всех пользователей',
+    description='Получить страницу пользователей по возрастанию email (cursor - next_cursor предыдущей страницы). Вместо списков пайплайнов отдается pipelines_count, списки - при expand=pipelines',
 )
 async def get_all_users(
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    role: Optional[UserRole] = None,
+    is_active: Optional[bool] = None,
+    email_prefix: Optional[str] = None,
+    expand: list[UserExpand] = Query([]),
     current_user: User = Depends(get_current_user_dependency),
     session: AsyncSession = Depends(get_async_session),
 ):
     '''Получить всех пользователей'''
 
-    return await user_crud.get_all(session)
+    users = await user_crud.get_page_mappings(
+        session,
+        cursor=validate_user_cursor(cursor),
+        limit=limit,
+        email_prefix=email_prefix,
+        expand_pipelines=UserExpand.PIPELINES in expand,
+        role=role,
+        is_active=is_active,
+    )
+    return ORJSONResponse({
+        'users': users,
+        'next_cursor': (
+            encode_user_cursor(users[-1]['email']) if len(users) == limit else None
+        ),
+    })
+
+
+@router.get(
+    '/search',
+    status_code=status.HTTP_200_OK,
+    response_model=list[UserListRead],
+    summary='Найти пользователей по email',
+    description='Найти пользователей, email которых содержит q (без учета регистра, не короче 3 символов), по убыванию сходства',
+)
+async def search_users(
+    q: str,
+    limit: int = Query(20, ge=1, le=settings.USER_SEARCH_MAX_LIMIT),
+    current_user: User = Depends(get_current_user_dependency),
+    session: AsyncSession = Depends(get_async_session),
+):
+    '''Найти пользователей по подстроке email'''
+
+    return ORJSONResponse(
+        await user_crud.search_mappings(session, validate_user_search_query(q), limit)
+    )
+
+
+@router.get(
+    '/batch',
+    status_code=status.HTTP_200_OK,
+    response_model=list[BatchReadItem[UserRead]],
+    summary='Получить пользователей по списку ID',
+    description='Получить пользователей по списку ID одним запросом (в порядке запроса, found = false для ненайденных)',
+)
+async def get_users_batch(
+    ids: list[uuid.UUID] = Query(...),
+    current_user: User = Depends(get_current_user_dependency),
+    session: AsyncSession = Depends(get_async_session),
+):
+    '''Получить пользователей по списку ID'''
+
+    validate_batch_ids(ids)
+    return to_batch_items(ids, await user_crud.get_by_ids(session, ids))
+
+
+@router.post(
+    '/batch',
+    status_code=status.HTTP_200_OK,
+    response_model=list[BatchReadItem[UserRead]],
+    summary='Получить пользователей по списку ID (POST)',
+    description='Вариант пакетного чтения для длинных списков ID',
+)
+async def post_users_batch(
+    batch_data: BatchReadRequest,
+    current_user: User = Depends(get_current_user_dependency),
+    session: AsyncSession = Depends(get_async_session),
+):
+    '''Получить пользователей по списку ID (POST)'''
+
+    validate_batch_ids(batch_data.ids)
+    return to_batch_items(
+        batch_data.ids,
+        await user_crud.get_by_ids(session, batch_data.ids)
+    )
 
 
 @router.get(
@@ -96,6 +186,24 @@ async def create_user(
     return await user_crud.create(session, user)
 
 
+@router.post(
+    '/import',
+    status_code=status.HTTP_200_OK,
+    response_model=UserImportResult,
+    summary='Импортировать пользователей',
+    description='Создать пользователей из CSV (email,password[,role][,is_active]) или JSON файла. Ошибки возвращаются по строкам, остальные строки создаются (требуется роль администратора)',
+)
+async def import_users_file(
+    file: UploadFile = File(...),
+    current_user: User = Depends(require_admin),
+    session: AsyncSession = Depends(get_async_session),
+):
+    '''Импортировать пользователей из файла'''
+
+    rows = await validate_user_import_file(file)
+    return await import_users(session, rows)
+
+
 @router.patch(
     '/{user_id}',
     status_code=status.HTTP_200_OK,
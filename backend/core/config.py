@@ -2,6 +2,9 @@
 Конфигурация приложения
 '''
 
+from typing import Literal, Optional
+
+from pydantic import PositiveFloat, PositiveInt
 from pydantic_settings import BaseSettings
 
 
@@ -37,6 +40,145 @@ class Settings(BaseSettings):
     FIRST_SUPERUSER_PASSWORD: str | None = None
     
     SQL_ECHO: bool = False
+
+    # Максимальное количество ID в пакетном чтении (GET/POST .../batch)
+    BATCH_READ_MAX_IDS: int = 1000
+
+    # Фоновый диспетчер outbox-событий
+    OUTBOX_DISPATCHER_ENABLED: bool = True
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_POLL_INTERVAL_SECONDS: float = 1.0
+    OUTBOX_HANDLER_TIMEOUT_SECONDS: float = 30.0
+    OUTBOX_MAX_ATTEMPTS: int = 10
+    OUTBOX_RETRY_BASE_DELAY_SECONDS: float = 1.0
+    OUTBOX_RETRY_MAX_DELAY_SECONDS: float = 300.0
+    OUTBOX_RETENTION_HOURS: int = 24
+    # Отброшенные события хранятся дольше, чтобы их успели разобрать
+    OUTBOX_FAILED_RETENTION_HOURS: int = 24 * 7
+
+    # Диспетчер запусков и лимиты параллельности по типу исполнителя
+    # (например, {"airflow": 50}; типы без лимита не ограничены)
+    RUN_DISPATCHER_ENABLED: bool = True
+    RUN_DISPATCH_BATCH_SIZE: int = 100
+    RUN_DISPATCH_INTERVAL_SECONDS: float = 1.0
+    EXECUTOR_CONCURRENCY_LIMITS: dict[str, int] = {}
+    # Допущенный запуск, не переданный исполнителю за это время (процесс
+    # упал между допуском и передачей), завершается с освобождением слотов
+    RUN_SUBMIT_TIMEOUT_SECONDS: float = 300.0
+    RUN_REAP_INTERVAL_SECONDS: float = 60.0
+    # Веса полос приоритетов для справедливой выборки ожидающих запусков
+    RUN_PRIORITY_WEIGHTS: dict[str, int] = {'high': 16, 'normal': 4, 'low': 1}
+
+    # Адаптеры исполнителей: executor_type -> базовый URL HTTP API
+    # (например, {"airflow": "http://airflow-gateway:8080"}); запуски типов
+    # без адаптера ведет внешняя система через API запусков
+    EXECUTOR_URLS: dict[str, str] = {}
+    EXECUTOR_MAX_CONNECTIONS: int = 100
+    EXECUTOR_MAX_CONCURRENT_REQUESTS: int = 500
+    EXECUTOR_TIMEOUT_SECONDS: float = 10.0
+    EXECUTOR_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    EXECUTOR_CIRCUIT_RESET_SECONDS: float = 30.0
+
+    # Уведомления исполнителей: executor_type -> секрет HMAC подписи,
+    # допустимое расхождение метки времени подписи с часами сервера,
+    # окно накопления и максимальный размер пачки
+    EXECUTOR_CALLBACK_SECRETS: dict[str, str] = {}
+    EXECUTOR_CALLBACK_MAX_SKEW_SECONDS: int = 300
+    EXECUTOR_CALLBACK_FLUSH_INTERVAL_MS: float = 5.0
+    EXECUTOR_CALLBACK_MAX_BATCH: int = 1000
+
+    # Логи запусков: каталог, размер сегмента, окно group commit,
+    # размер куска чтения и период опроса при follow
+    RUN_LOGS_DIR: str = 'data/run_logs'
+    RUN_LOG_SEGMENT_BYTES: int = 8 * 1024 * 1024
+    RUN_LOG_FLUSH_INTERVAL_MS: float = 10.0
+    RUN_LOG_READ_CHUNK_BYTES: int = 64 * 1024
+    RUN_LOG_MAX_APPEND_BYTES: int = 1024 * 1024
+    RUN_LOG_FOLLOW_POLL_SECONDS: float = 1.0
+
+    # Параметры запуска: максимальное число параметров запуска
+    # и фильтров param.<имя> в запросе списка
+    RUN_PARAMS_MAX_COUNT: int = 100
+
+    # Поиск по JSONB schema: максимальная длина JSONPath и размер таблицы,
+    # начиная с которого фильтр без индекса (Seq Scan) отклоняется
+    SCHEMA_SEARCH_MAX_PATH_LENGTH: int = 500
+    SCHEMA_SEARCH_SEQ_SCAN_MAX_ROWS: int = 10000
+
+    # Теги: максимальное число тегов в фильтре tags и фасетов в ответе
+    TAG_FILTER_MAX_TAGS: int = 20
+    TAG_FACETS_MAX_LIMIT: int = 500
+
+    # Пакетная привязка тегов: максимум ID в запросе и размер пачки
+    # (каждая пачка - отдельная транзакция)
+    TAG_BULK_MAX_IDS: int = 100000
+    TAG_BULK_CHUNK_SIZE: int = 5000
+
+    # Подсказки тегов по префиксу: период перестроения индекса в памяти
+    # (подхватывает счетчики использования и записи других процессов)
+    TAG_SUGGEST_REFRESH_SECONDS: float = 60.0
+    TAG_SUGGEST_MAX_LIMIT: int = 50
+
+    # Индекс владельцев пайплайнов в памяти: период полной перезагрузки
+    # (страховка, если уведомление об изменении из другого процесса потеряно)
+    OWNER_INDEX_REFRESH_SECONDS: float = 30.0
+
+    # Канал NOTIFY, по которому процессы сообщают друг другу об изменениях,
+    # затрагивающих индексы в памяти, и период проверки соединения LISTEN
+    INVALIDATION_CHANNEL: str = 'index_invalidation'
+    INVALIDATION_RETRY_SECONDS: float = 5.0
+
+    # Отзыв токенов: фильтр Блума отозванных jti (емкость и доля ложных
+    # срабатываний), период перестроения и очистки, канал NOTIFY
+    TOKEN_REVOCATION_BLOOM_CAPACITY: int = 100000
+    TOKEN_REVOCATION_BLOOM_ERROR_RATE: float = 0.001
+    TOKEN_REVOCATION_REBUILD_SECONDS: float = 300.0
+    TOKEN_REVOCATION_RETRY_SECONDS: float = 5.0
+    TOKEN_REVOCATION_CHANNEL: str = 'token_revoked'
+
+    # Ограничение попыток входа: скользящее окно по email и по IP.
+    # Backend 'memory' считает попытки в процессе, 'postgres' - общие
+    # для всех воркеров счетчики (с проверкой в памяти перед запросом к БД).
+    # Окно и лимиты положительные: на них делится оценка Retry-After
+    LOGIN_THROTTLE_ENABLED: bool = True
+    LOGIN_THROTTLE_BACKEND: Literal['memory', 'postgres'] = 'memory'
+    LOGIN_THROTTLE_WINDOW_SECONDS: PositiveFloat = 60.0
+    LOGIN_THROTTLE_MAX_PER_EMAIL: PositiveInt = 10
+    LOGIN_THROTTLE_MAX_PER_IP: PositiveInt = 100
+    LOGIN_THROTTLE_MAX_KEYS: int = 200000
+    LOGIN_THROTTLE_EVICT_SECONDS: float = 60.0
+    # Доверенные прокси (адреса или сети, например ["10.0.0.0/8"]): для
+    # запросов от них IP клиента берется из X-Forwarded-For - первый
+    # справа адрес, не принадлежащий доверенным прокси
+    TRUSTED_PROXIES: list[str] = []
+
+    # Импорт пользователей: максимум строк в файле, размер пачки вставки
+    # (каждая пачка - отдельная транзакция) и число процессов хеширования
+    # паролей (None - по числу CPU)
+    USER_IMPORT_MAX_ROWS: int = 50000
+    USER_IMPORT_CHUNK_SIZE: int = 1000
+    USER_IMPORT_HASH_WORKERS: Optional[int] = None
+
+    # Поиск пользователей по подстроке email: минимальная длина строки
+    # (короче трех символов триграммный индекс не используется)
+    USER_SEARCH_MIN_LENGTH: int = 3
+    USER_SEARCH_MAX_LIMIT: int = 100
+
+    # Строгая загрузка связей ORM: любое неявное обращение к незагруженной
+    # связи падает, даже если объект уже есть в identity map (для тестов)
+    ORM_STRICT_LOADING: bool = False
+
+    # Счетчик SQL запросов каждого HTTP запроса (заголовок Server-Timing и
+    # лог). Запрос, повторенный не меньше порога раз, считается N+1
+    QUERY_STATS_ENABLED: bool = True
+    QUERY_N_PLUS_ONE_THRESHOLD: int = 10
+
+    # Планировщик запусков по расписанию (работает только на узле-лидере)
+    SCHEDULER_ENABLED: bool = True
+    SCHEDULER_LEADER_RETRY_SECONDS: float = 10.0
+    SCHEDULER_SYNC_INTERVAL_SECONDS: float = 10.0
+    SCHEDULER_FIRE_BATCH_SIZE: int = 500
+    SCHEDULER_MAX_CATCHUP_RUNS: int = 100
     
     class Config:
         env_file = '.env'
@@ -0,0 +1,52 @@
+'''
+Импорт пользователей из CSV/JSON файла (командная строка)
+
+Использование:
+    python -m core.import_users users.csv
+    python -m core.import_users users.json --format json
+'''
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+import models  # noqa: F401 (регистрация всех моделей для relationship)
+from database.base import AsyncSessionLocal, async_engine
+from models.enums.user import UserImportFormat
+from services.user_import import import_users, parse_user_rows, password_hasher
+
+
+async def run_import(path: Path, file_format: UserImportFormat) -> int:
+    '''Импортировать файл и вывести итог с ошибками по строкам'''
+    rows = parse_user_rows(path.read_bytes(), file_format)
+    try:
+        async with AsyncSessionLocal() as session:
+            result = await import_users(session, rows)
+    finally:
+        password_hasher.close()
+        await async_engine.dispose()
+    for failure in result.failed:
+        print(f'строка {failure.row}: {failure.email or "-"}: {failure.error}', file=sys.stderr)
+    print(
+        f'Строк: {result.requested}, создано: {result.created}, '
+        f'ошибок: {len(result.failed)}'
+    )
+    return 1 if result.failed else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Импорт пользователей из CSV/JSON')
+    parser.add_argument('path', type=Path, help='Файл импорта')
+    parser.add_argument(
+        '--format',
+        type=UserImportFormat,
+        choices=list(UserImportFormat),
+        help='Формат файла (по умолчанию - по расширению)',
+    )
+    args = parser.parse_args()
+    file_format = args.format or UserImportFormat(args.path.suffix.lstrip('.').lower())
+    return asyncio.run(run_import(args.path, file_format))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
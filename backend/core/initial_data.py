@@ -8,6 +8,7 @@ from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.config import settings
+from crud.loaders import LoaderProfile
 from crud.user import user_crud
 from database.base import get_async_session
 from models.user import UserRole
@@ -37,7 +38,7 @@ async def create_user(
         session: Опциональная сессия БД (если не указана, создается новая)
     '''
     if session:
-        existing_user = await user_crud.get_by_email(session, email)
+        existing_user = await user_crud.get_by_email(session, email, LoaderProfile.BARE)
         if existing_user:
             raise UserAlreadyExists(f'Пользователь с  email {email} уже есть')
         
@@ -58,7 +59,7 @@ async def create_user(
             raise UserAlreadyExists(f'Пользователь с  email {email} уже есть')
     else:
         async with get_async_session_context() as session:
-            existing_user = await user_crud.get_by_email(session, email)
+            existing_user = await user_crud.get_by_email(session, email, LoaderProfile.BARE)
             if existing_user:
                 raise UserAlreadyExists(f'Пользователь с  email {email} уже есть')
             
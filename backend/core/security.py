@@ -18,6 +18,11 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def hash_passwords(passwords: list[str]) -> list[str]:
+    '''Хеширование списка паролей (выполняется в процессах пула импорта)'''
+    return [pwd_context.hash(password) for password in passwords]
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     '''Проверка пароля'''
     return pwd_context.verify(plain_password, hashed_password)
@@ -41,7 +46,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({'exp': expire})
+    # jti - идентификатор токена, по которому его можно отозвать
+    to_encode.update({'exp': expire, 'jti': uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
@@ -76,7 +82,19 @@ def get_user_id_from_token(token: str) -> Optional[uuid.UUID]:
     payload = decode_access_token(token)
     if payload is None:
         return None
+    return get_user_id_from_payload(payload)
+
 
+def get_user_id_from_payload(payload: dict) -> Optional[uuid.UUID]:
+    '''
+    Получить ID пользователя из декодированного JWT токена
+    
+    Args:
+        payload: Данные токена
+    
+    Returns:
+        UUID пользователя или None, если в токене нет корректного sub
+    '''
     user_id_str: str = payload.get('sub')
     if user_id_str is None:
         return None
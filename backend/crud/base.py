@@ -2,58 +2,234 @@
 Базовый CRUD класс (асинхронный)
 '''
 import uuid
-from typing import Generic, Optional, Type, TypeVar
+from collections import defaultdict
+from typing import Any, Generic, Optional, Sequence, Type, TypeVar
 
 from fastapi import HTTPException
-from sqlalchemy import select
+from pydantic import BaseModel as SchemaModel
+from sqlalchemy import Select, any_, bindparam, func, select
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
+from crud.loaders import LoaderProfile, loader_options
+from database.annotations import GUID
 from models.base import BaseModel
+from models.enums.tag import TagEntityType, TagFilterMode
+from models.tag import Tag, TagFacetCounter, TagLink
+from schemas.tag import TagFilter
 
 ModelType = TypeVar('ModelType', bound=BaseModel)
 CreateSchemaType = TypeVar('CreateSchemaType')
 UpdateSchemaType = TypeVar('UpdateSchemaType')
 
+
+def schema_columns(model: Type[BaseModel], schema: Type[SchemaModel]) -> list:
+    '''Колонки модели, соответствующие полям Pydantic схемы'''
+    table_columns = model.__table__.columns
+    return [
+        getattr(model, field)
+        for field in schema.model_fields
+        if field in table_columns
+    ]
+
+
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     '''Базовый CRUD класс'''
 
+    # Тип сущности в tag_links (None - модель не размечается тегами)
+    tag_entity_type: Optional[TagEntityType] = None
+
     def __init__(self, model: Type[ModelType]):
         self.model = model
 
+    def _tagged_with(self, tag_filter: TagFilter):
+        '''
+        Условие "сущность отмечена тегами" (полусоединение по tag_links)
+
+        ID сущностей берутся из индекса (entity_type, tag_id, entity_id);
+        в режиме all сущность должна иметь связь с каждым из тегов,
+        что проверяется числом связей (пара тег-сущность уникальна)
+        '''
+        entity_ids = (
+            select(TagLink.entity_id)
+            .where(TagLink.entity_type == self.tag_entity_type)
+            .where(
+                TagLink.tag_id.in_(
+                    select(Tag.id).where(Tag.name.in_(tag_filter.names))
+                )
+            )
+            .correlate(None)
+        )
+        if tag_filter.mode is TagFilterMode.ALL:
+            entity_ids = entity_ids.group_by(TagLink.entity_id).having(
+                func.count() == len(tag_filter.names)
+            )
+        return self.model.id.in_(entity_ids)
+
+    def _apply_filters(self, query: Select, filters: dict) -> Select:
+        '''
+        Применить фильтры вида поле == значение к запросу, а также tags,
+        список ids и список pipeline_ids (для моделей с pipeline_id:
+        фильтр видимости пайплайнов)
+        '''
+        tag_filter = filters.pop('tags', None)
+        if tag_filter is not None and self.tag_entity_type is not None:
+            query = query.where(self._tagged_with(tag_filter))
+        ids = filters.pop('ids', None)
+        if ids is not None:
+            query = query.where(
+                self.model.id == any_(bindparam('ids', list(ids), type_=ARRAY(GUID())))
+            )
+        pipeline_ids = filters.pop('pipeline_ids', None)
+        if pipeline_ids is not None:
+            query = query.where(
+                self.model.pipeline_id == any_(
+                    bindparam('pipeline_ids', list(pipeline_ids), type_=ARRAY(GUID()))
+                )
+            )
+        for key, value in filters.items():
+            if hasattr(self.model, key) and value is not None:
+                query = query.where(getattr(self.model, key) == value)
+        return query
+
+    def loader_options(self, profile: LoaderProfile) -> tuple:
+        '''Опции загрузки связей модели по профилю (crud/loaders.py)'''
+        return loader_options(self.model, profile)
+
     async def get_all(
         self,
         session: AsyncSession,
         offset: int = 0,
         limit: int = 100,
+        profile: LoaderProfile = LoaderProfile.BARE,
         **filters
     ) -> list[ModelType]:
         '''Получить все модели с опциональными фильтрами'''
-        query = select(self.model)
-
-        for key, value in filters.items():
-            if hasattr(self.model, key) and value is not None:
-                query = query.where(getattr(self.model, key) == value)
-        
+        query = self._apply_filters(
+            select(self.model).options(*self.loader_options(profile)), filters
+        )
         result = await session.execute(
             query.offset(offset).limit(limit)
         )
         return list(result.scalars().all())
 
+    async def get_all_mappings(
+        self,
+        session: AsyncSession,
+        columns: Optional[Sequence] = None,
+        offset: int = 0,
+        limit: int = 100,
+        **filters
+    ) -> list[dict]:
+        '''
+        Получить модели в виде словарей колонок (только для чтения)
+
+        Выбираются плоские строки без гидратации ORM объектов и учета
+        в identity map, поэтому результат можно сразу отдавать
+        в ORJSONResponse без повторной валидации через from_attributes
+        '''
+        query = self._apply_filters(
+            select(*(columns or self.model.__table__.columns)), filters
+        )
+        result = await session.execute(
+            query.offset(offset).limit(limit)
+        )
+        return [dict(row) for row in result.mappings()]
+
+    async def get_tag_facets(
+        self,
+        session: AsyncSession,
+        limit: int = 50,
+        **filters
+    ) -> list[dict]:
+        '''
+        Получить число отфильтрованных сущностей по каждому тегу
+
+        Без фильтров ответ берется из инкрементальных счетчиков
+        tag_facet_counters, иначе связи считаются только для ID
+        сущностей, прошедших фильтр
+        '''
+        if any(value is not None for value in filters.values()):
+            count = func.count().label('count')
+            query = (
+                select(Tag.id.label('tag_id'), Tag.name, count)
+                .join(TagLink, TagLink.tag_id == Tag.id)
+                .where(TagLink.entity_type == self.tag_entity_type)
+                .where(
+                    TagLink.entity_id.in_(
+                        self._apply_filters(select(self.model.id), filters)
+                    )
+                )
+                .group_by(Tag.id)
+            )
+        else:
+            count = TagFacetCounter.count
+            query = (
+                select(Tag.id.label('tag_id'), Tag.name, count)
+                .join(TagFacetCounter, TagFacetCounter.tag_id == Tag.id)
+                .where(TagFacetCounter.entity_type == self.tag_entity_type)
+                .where(count > 0)
+            )
+        result = await session.execute(
+            query.order_by(count.desc(), Tag.name).limit(limit)
+        )
+        return [dict(row) for row in result.mappings()]
+
+    @staticmethod
+    async def group_mappings(
+        session: AsyncSession,
+        query: Select,
+        key: str,
+    ) -> dict[Any, list[dict]]:
+        '''Выполнить запрос и сгруппировать строки по колонке key'''
+        grouped = defaultdict(list)
+        for row in (await session.execute(query)).mappings():
+            row = dict(row)
+            grouped[row.pop(key)].append(row)
+        return grouped
+
     async def get_by_id(
         self,
         session: AsyncSession,
-        id: uuid.UUID
+        id: uuid.UUID,
+        profile: LoaderProfile = LoaderProfile.BARE,
     ) -> Optional[ModelType]:
         '''Получить модель по ID'''
 
         return (
             await session.execute(
-                select(self.model).where(self.model.id == id)
+                select(self.model)
+                .where(self.model.id == id)
+                .options(*self.loader_options(profile))
             )
         ).scalar_one_or_none()
 
+    async def get_by_ids(
+        self,
+        session: AsyncSession,
+        ids: Sequence[uuid.UUID],
+        profile: LoaderProfile = LoaderProfile.BARE,
+    ) -> list[Optional[ModelType]]:
+        '''
+        Получить модели по списку ID одним запросом
+
+        Выполняется один запрос WHERE id = ANY(:ids), связи подгружаются
+        пакетно по профилю загрузки. Результат возвращается в порядке
+        запрошенных ID, для ненайденных ID на их месте стоит None
+        '''
+        result = await session.execute(
+            select(self.model)
+            .where(
+                self.model.id == any_(
+                    bindparam('ids', list(set(ids)), type_=ARRAY(GUID()))
+                )
+            )
+            .options(*self.loader_options(profile))
+        )
+        objects = {db_object.id: db_object for db_object in result.scalars()}
+        return [objects.get(id) for id in ids]
+
     async def create(
         self,
         session: AsyncSession,
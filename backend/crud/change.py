@@ -0,0 +1,64 @@
+'''
+CRUD операции для ленты изменений
+'''
+import uuid
+from typing import Optional
+
+from sqlalchemy import (BigInteger, Text, any_, bindparam, func, select,
+                        tuple_)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from crud.base import CRUDBase
+from database.annotations import GUID
+from models.change import Change
+from models.enums.change import ChangeEntityType
+
+
+class CRUDChange(CRUDBase[Change, None, None]):
+    '''CRUD операции для ленты изменений'''
+
+    async def get_since(
+        self,
+        session: AsyncSession,
+        cursor: Optional[tuple[int, int]] = None,
+        types: Optional[list[ChangeEntityType]] = None,
+        limit: int = 100,
+        pipeline_ids: Optional[list[uuid.UUID]] = None,
+    ) -> list[Change]:
+        '''
+        Получить изменения после курсора в порядке фиксации транзакций
+
+        pipeline_ids - только изменения сущностей этих пайплайнов
+        (None - без ограничения)
+        '''
+        # Записи незавершенных транзакций не отдаются, иначе они могли бы
+        # появиться в ленте "позади" уже выданного курсора
+        visible_xact_id = (
+            func.pg_snapshot_xmin(func.pg_current_snapshot())
+            .cast(Text)
+            .cast(BigInteger)
+        )
+        query = select(Change).where(Change.xact_id < visible_xact_id)
+        if cursor is not None:
+            query = query.where(
+                tuple_(Change.xact_id, Change.id) > tuple_(*cursor)
+            )
+        if types:
+            query = query.where(Change.entity_type.in_(types))
+        if pipeline_ids is not None:
+            query = query.where(
+                Change.pipeline_id == any_(
+                    bindparam('pipeline_ids', list(pipeline_ids), type_=ARRAY(GUID()))
+                )
+            )
+        return list(
+            (
+                await session.execute(
+                    query.order_by(Change.xact_id, Change.id).limit(limit)
+                )
+            ).scalars().all()
+        )
+
+
+change_crud = CRUDChange(Change)
@@ -0,0 +1,53 @@
+'''
+Профили загрузки связей моделей
+'''
+from enum import StrEnum
+
+from sqlalchemy.orm import selectinload
+
+from models.pipeline import Pipeline
+from models.pipeline_version import PipelineVersion
+from models.user import User
+
+
+class LoaderProfile(StrEnum):
+    '''Набор связей, загружаемых вместе с моделью'''
+
+    # Только колонки модели
+    BARE = 'bare'
+    # Связи, которые отдает схема ответа API (PipelineRead, UserRead, ...)
+    DETAIL = 'detail'
+
+
+# Связи моделей неявно не загружаются (lazy='raise_on_sql'), поэтому каждый
+# метод CRUD, возвращающий ORM объекты, объявляет профиль. Число запросов
+# на объект или страницу определяется профилем: 1 + число selectinload
+LOADER_PROFILES: dict[tuple[type, LoaderProfile], tuple] = {
+    (Pipeline, LoaderProfile.DETAIL): (
+        selectinload(Pipeline.owners),
+    ),
+    (PipelineVersion, LoaderProfile.DETAIL): (
+        selectinload(PipelineVersion.pipeline),
+        selectinload(PipelineVersion.runs),
+    ),
+    (User, LoaderProfile.DETAIL): (
+        selectinload(User.pipelines),
+    ),
+}
+
+
+def loader_options(model: type, profile: LoaderProfile) -> tuple:
+    '''
+    Опции загрузки связей модели по профилю
+
+    Raises:
+        LookupError: Если профиль для модели не объявлен
+    '''
+    if profile is LoaderProfile.BARE:
+        return ()
+    try:
+        return LOADER_PROFILES[(model, profile)]
+    except KeyError:
+        raise LookupError(
+            f'Профиль загрузки {profile} не объявлен для {model.__name__}'
+        )
@@ -0,0 +1,68 @@
+'''
+CRUD операции для счетчиков попыток входа
+'''
+from sqlalchemy import and_, delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from crud.base import CRUDBase
+from models.login_attempt import LoginAttemptCounter
+
+
+class CRUDLoginAttempt(CRUDBase[LoginAttemptCounter, None, None]):
+    '''CRUD операции для счетчиков попыток входа'''
+
+    async def hit(
+        self,
+        session: AsyncSession,
+        keys: list[str],
+        window: int,
+    ) -> dict[str, tuple[int, int]]:
+        '''
+        Учесть попытку по каждому ключу в окне window
+
+        Одним запросом увеличивает счетчики текущего окна и читает
+        счетчики предыдущего. Ключи обновляются в отсортированном
+        порядке, чтобы конкурирующие транзакции блокировали строки
+        в одном порядке
+
+        Returns:
+            ключ -> (попыток в предыдущем окне, попыток в текущем окне)
+        '''
+        table = LoginAttemptCounter.__table__
+        query = insert(table).values(
+            [{'key': key, 'window': window, 'count': 1} for key in sorted(keys)]
+        )
+        current = query.on_conflict_do_update(
+            constraint='uix_login_attempt_counter',
+            set_={'count': table.c.count + 1, 'updated_at': func.now()},
+        ).returning(table.c.key, table.c.count).cte('current')
+        previous = table.alias('previous')
+        rows = await session.execute(
+            select(
+                current.c.key,
+                func.coalesce(previous.c.count, 0),
+                current.c.count,
+            ).outerjoin(
+                previous,
+                and_(
+                    previous.c.key == current.c.key,
+                    previous.c.window == window - 1,
+                ),
+            )
+        )
+        result = {key: (previous_count, count) for key, previous_count, count in rows}
+        await session.commit()
+        return result
+
+    async def purge(self, session: AsyncSession, before_window: int) -> int:
+        '''Удалить счетчики окон раньше before_window'''
+        result = await session.execute(
+            delete(LoginAttemptCounter)
+            .where(LoginAttemptCounter.window < before_window)
+        )
+        await session.commit()
+        return result.rowcount
+
+
+login_attempt_crud = CRUDLoginAttempt(LoginAttemptCounter)
@@ -2,74 +2,212 @@
 CRUD операции для Pipeline
 '''
 import uuid
-from typing import Optional, override
+from typing import Optional, Sequence, override
 
-from sqlalchemy import select
+from fastapi import HTTPException, status
+from sqlalchemy import (Column, all_, any_, bindparam, delete, exists, literal,
+                        select)
+from sqlalchemy.dialects.postgresql import ARRAY, insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
-from crud.base import CRUDBase
-from models.pipeline import Pipeline
+from crud.base import CRUDBase, schema_columns
+from crud.loaders import LoaderProfile
+from database.annotations import GUID
+from models.enums.outbox import OutboxEventType
+from models.enums.pipeline import OwnershipUpdateMode
+from models.enums.tag import TagEntityType
+from models.outbox import OUTBOX_AGGREGATES, enqueue_outbox_events
+from models.pipeline import Pipeline, pipeline_owners
 from models.user import User
-from schemas.pipeline import PipelineCreate, PipelineUpdate
+from schemas.pipeline import (PipelineCreate, PipelineInDB, PipelineUpdate,
+                              PipelineUserRead)
+from services.owner_index import OwnerChange, record_owner_changes
+
+
+def parse_ownership_ids(items: Sequence[dict], id_name: str) -> list[uuid.UUID]:
+    '''
+    ID из списка словарей вида {'id': ...} для update_ownership
+
+    Raises:
+        HTTPException: Если ID отсутствует или некорректен (400)
+    '''
+    ids = []
+    for item in items:
+        value = item.get('id')
+        try:
+            ids.append(uuid.UUID(str(value)))
+        except (ValueError, TypeError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f'Некорректный {id_name} = {value}'
+            )
+    return ids
+
+
+async def update_ownership(
+    session: AsyncSession,
+    key_column: Column,
+    key: uuid.UUID,
+    ids: Sequence[uuid.UUID],
+    mode: OwnershipUpdateMode,
+) -> None:
+    '''
+    Изменить связи в pipeline_owners для одной стороны связи
+
+    key_column - сторона, которая фиксирована (pipeline_id: меняются
+    владельцы пайплайна key, user_id: меняются пайплайны пользователя
+    key), ids - ID другой стороны. Каждый режим выполняется одним-двумя
+    запросами к pipeline_owners без загрузки объектов: replace удаляет
+    связи вне ids, add вставляет недостающие (несуществующие ID
+    отбрасываются соединением с их таблицей, повторы - ON CONFLICT),
+    remove удаляет связи с ids. Для затронутых пайплайнов и
+    пользователей пишутся outbox-события, а изменения передаются
+    индексу владельцев (применятся после commit)
+    '''
+    if key_column is pipeline_owners.c.pipeline_id:
+        other_column, other_model = pipeline_owners.c.user_id, User
+    else:
+        other_column, other_model = pipeline_owners.c.pipeline_id, Pipeline
+    ids = list(set(ids))
+    ids_param = bindparam('ids', ids, type_=ARRAY(GUID()))
+    returning = (pipeline_owners.c.pipeline_id, pipeline_owners.c.user_id)
+    removed, added = [], []
+    if mode is not OwnershipUpdateMode.ADD:
+        condition = (
+            other_column == any_(ids_param)
+            if mode is OwnershipUpdateMode.REMOVE
+            else other_column != all_(ids_param)
+        )
+        removed = (
+            await session.execute(
+                delete(pipeline_owners)
+                .where(key_column == key)
+                .where(condition)
+                .returning(*returning)
+            )
+        ).all()
+    if mode is not OwnershipUpdateMode.REMOVE and ids:
+        added = (
+            await session.execute(
+                insert(pipeline_owners)
+                .from_select(
+                    [key_column.name, other_column.name],
+                    select(literal(key, GUID()), other_model.id)
+                    .where(other_model.id == any_(ids_param)),
+                )
+                .on_conflict_do_nothing()
+                .returning(*returning)
+            )
+        ).all()
+    changed = removed + added
+    if not changed:
+        return
+    record_owner_changes(
+        session,
+        [(OwnerChange.REMOVE, *row) for row in removed]
+        + [(OwnerChange.ADD, *row) for row in added],
+    )
+
+    def write_events(sync_session) -> None:
+        '''Outbox-события для изменения связей в обход ORM'''
+        connection = sync_session.connection()
+        enqueue_outbox_events(
+            connection,
+            OUTBOX_AGGREGATES[Pipeline.__tablename__],
+            sorted({row.pipeline_id for row in changed}),
+            OutboxEventType.UPDATED,
+            {'fields': ['owners']},
+        )
+        enqueue_outbox_events(
+            connection,
+            OUTBOX_AGGREGATES[User.__tablename__],
+            sorted({row.user_id for row in changed}),
+            OutboxEventType.UPDATED,
+            {'fields': ['pipelines']},
+        )
+
+    await session.run_sync(write_events)
 
 
 class CRUDPipeline(CRUDBase[Pipeline, PipelineCreate, PipelineUpdate]):
     '''CRUD операции для Pipeline'''
 
-    async def get_all_pipelines(
+    tag_entity_type = TagEntityType.PIPELINE
+
+    @override
+    async def get_all_mappings(
         self,
         session: AsyncSession,
+        columns: Optional[Sequence] = None,
         offset: int = 0,
         limit: int = 100,
-        is_active: bool = True,
-        order_by: str = 'created_at',
-    ) -> list[Pipeline]:
-        '''Получить все пайплайны'''
-        return (
-            await session.execute(
-                select(Pipeline)
-                .where(Pipeline.is_active == is_active)
-                .offset(offset)
-                .limit(limit)
-                .options(selectinload(Pipeline.owners))
+        **filters
+    ) -> list[dict]:
+        '''Получить пайплайны в виде словарей вместе с владельцами'''
+        pipelines = await super().get_all_mappings(
+            session,
+            columns or schema_columns(Pipeline, PipelineInDB),
+            offset,
+            limit,
+            **filters
+        )
+        if not pipelines:
+            return pipelines
+        owners = await self.group_mappings(
+            session,
+            select(
+                pipeline_owners.c.pipeline_id,
+                *schema_columns(User, PipelineUserRead)
             )
-        ).scalars().all()
+            .join(User, User.id == pipeline_owners.c.user_id)
+            .where(
+                pipeline_owners.c.pipeline_id.in_(
+                    [pipeline['id'] for pipeline in pipelines]
+                )
+            ),
+            'pipeline_id',
+        )
+        for pipeline in pipelines:
+            pipeline['owners'] = owners.get(pipeline['id'], [])
+        return pipelines
 
     @override
     async def get_by_id(
         self,
         session: AsyncSession,
-        id: uuid.UUID
+        id: uuid.UUID,
+        profile: LoaderProfile = LoaderProfile.DETAIL,
     ) -> Optional[Pipeline]:
         '''Получить пайплайн по ID'''
-        return (
-            await session.execute(
-                select(Pipeline)
-                .where(Pipeline.id == id)
-                .options(selectinload(Pipeline.owners))
-            )
-        ).scalar_one_or_none()
+        return await super().get_by_id(session, id, profile)
+
+    @override
+    async def get_by_ids(
+        self,
+        session: AsyncSession,
+        ids: Sequence[uuid.UUID],
+        profile: LoaderProfile = LoaderProfile.DETAIL,
+    ) -> list[Optional[Pipeline]]:
+        '''Получить пайплайны по списку ID вместе с владельцами'''
+        return await super().get_by_ids(session, ids, profile)
 
-    async def get_by_user(
+    async def is_owner(
         self,
         session: AsyncSession,
+        pipeline_id: uuid.UUID,
         user_id: uuid.UUID,
-        offset: int = 0,
-        limit: int = 100
-    ) -> list[Pipeline]:
-        '''Получить все пайплайны пользователя (где пользователь является владельцем)'''
-        from models.pipeline import pipeline_owners
+    ) -> bool:
+        '''Является ли пользователь владельцем пайплайна (по pipeline_owners)'''
         return (
             await session.execute(
-                select(Pipeline)
-                .join(pipeline_owners, Pipeline.id == pipeline_owners.c.pipeline_id)
-                .where(pipeline_owners.c.user_id == user_id)
-                .offset(offset)
-                .limit(limit)
-                .options(selectinload(Pipeline.owners))
+                select(
+                    exists().where(
+                        pipeline_owners.c.pipeline_id == pipeline_id,
+                        pipeline_owners.c.user_id == user_id,
+                    )
+                )
             )
-        ).scalars().all()
+        ).scalar()
 
     async def get_by_code(
         self,
@@ -127,35 +265,23 @@ class CRUDPipeline(CRUDBase[Pipeline, PipelineCreate, PipelineUpdate]):
         update_schema: PipelineUpdate,
         commit: bool = True
     ) -> Pipeline:
-        '''Обновить пайплайн с обработкой owners'''
+        '''Обновить пайплайн с обработкой owners (режим owners_mode: add, remove, replace)'''
 
-        update_data = update_schema.model_dump(exclude_unset=True, exclude={'owners'})
+        update_data = update_schema.model_dump(
+            exclude_unset=True, exclude={'owners', 'owners_mode'}
+        )
         
         for field, value in update_data.items():
             setattr(db_object, field, value)
         
         if update_schema.owners is not None:
-            await session.refresh(db_object, ['owners'])
-            current_owner_ids = {owner.id for owner in db_object.owners}
-
-            owner_ids = []
-            for owner_data in update_schema.owners:
-                owner_id = owner_data.get('id')
-                if owner_id:
-                    try:
-                        owner_ids.append(uuid.UUID(str(owner_id)))
-                    except (ValueError, TypeError):
-                        continue
-
-            if owner_ids:
-                result = await session.execute(
-                    select(User).where(User.id.in_(owner_ids))
-                )
-                users = list(result.scalars().all())
-
-                for user in users:
-                    if user.id not in current_owner_ids:
-                        db_object.owners.append(user)
+            await update_ownership(
+                session,
+                pipeline_owners.c.pipeline_id,
+                db_object.id,
+                parse_ownership_ids(update_schema.owners, 'owner_id'),
+                update_schema.owners_mode,
+            )
 
         session.add(db_object)
         if commit:
@@ -0,0 +1,714 @@
+'''
+CRUD операции для PipelineRun
+'''
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional, override
+
+from sqlalchemy import (DateTime, Float, Select, String, and_, case, cast,
+                        column, or_, select, true, update, values)
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import func
+
+from core.config import settings
+from crud.base import CRUDBase
+from crud.run_concurrency import run_concurrency_crud
+from crud.run_param_value import param_equals, run_param_value_crud
+from models.change import record_changes
+from models.enums.change import ChangeEntityType, ChangeOperation
+from models.enums.outbox import OutboxEventType
+from models.enums.pipeline_run import (TRANSIENT_FAILURE_REASONS,
+                                       RunFailureReason, RunPriority)
+from models.enums.tag import TagEntityType
+from models.outbox import OUTBOX_AGGREGATES, enqueue_outbox_events
+from models.enums.run_concurrency import ConcurrencyScope
+from models.pipeline import Pipeline
+from models.pipeline_run import (FINISHED_PIPELINE_RUN_STATUSES,
+                                 PIPELINE_RUN_REACHABLE, PipelineRun,
+                                 PipelineRunStatus)
+from models.pipeline_version import PipelineVersion
+from models.run_param_value import RunParamValue
+from models.run_concurrency import RunConcurrencyCounter
+from schemas.executor import ExecutorSubmission, RunStatusUpdate
+from schemas.pipeline_run import PipelineRunCreate, PipelineRunUpdate
+
+
+def retry_delay(
+    attempt: int,
+    backoff_seconds: float,
+    max_backoff_seconds: float,
+    jitter: float,
+) -> timedelta:
+    '''
+    Задержка перед повтором после неуспешной попытки attempt
+
+    Экспоненциальный рост от backoff_seconds с потолком max_backoff_seconds;
+    доля jitter задержки случайна, чтобы повторы не приходили пачкой.
+    Показатель степени ограничен: задержка упирается в потолок задолго
+    до 2 ** 32, а большее значение переполнило бы float
+    '''
+    delay = min(
+        max_backoff_seconds, backoff_seconds * 2 ** min(attempt - 1, 32)
+    )
+    return timedelta(seconds=delay * (1 - jitter * random.random()))
+
+
+class CRUDPipelineRun(CRUDBase[PipelineRun, PipelineRunCreate, PipelineRunUpdate]):
+    '''CRUD операции для PipelineRun'''
+
+    tag_entity_type = TagEntityType.PIPELINE_RUN
+
+    async def create_pending(
+        self,
+        session: AsyncSession,
+        pipeline_id: uuid.UUID,
+        pipeline_version_id: uuid.UUID,
+        user_id: Optional[uuid.UUID] = None,
+        priority: RunPriority = RunPriority.NORMAL,
+        params: Optional[dict[str, str]] = None,
+        commit: bool = True,
+    ) -> PipelineRun:
+        '''Создать ожидающий запуск версии пайплайна с параметрами'''
+        db_run = PipelineRun(
+            pipeline_id=pipeline_id,
+            pipeline_version_id=pipeline_version_id,
+            user_id=user_id,
+            status=PipelineRunStatus.PENDING,
+            priority=priority,
+        )
+        session.add(db_run)
+        if params:
+            await session.flush()
+            await run_param_value_crud.bulk_create(
+                session, db_run.id, params, commit=False
+            )
+        if commit:
+            await session.commit()
+            await session.refresh(db_run)
+        return db_run
+
+    async def create_for_version(
+        self,
+        session: AsyncSession,
+        pipeline_version: PipelineVersion,
+        user_id: Optional[uuid.UUID] = None,
+        priority: RunPriority = RunPriority.NORMAL,
+        params: Optional[dict[str, str]] = None,
+        commit: bool = True,
+    ) -> PipelineRun:
+        '''Создать ожидающий запуск версии пайплайна'''
+        return await self.create_pending(
+            session,
+            pipeline_version.pipeline_id,
+            pipeline_version.id,
+            user_id,
+            priority,
+            params,
+            commit,
+        )
+
+    @override
+    def _apply_filters(self, query: Select, filters: dict) -> Select:
+        '''Применить фильтры, в том числе по параметрам (params: имя -> значение)'''
+        params = filters.pop('params', None) or {}
+        for name, value in params.items():
+            query = query.where(param_equals(PipelineRun.id, name, value))
+        return super()._apply_filters(query, filters)
+
+    async def get_status(
+        self,
+        session: AsyncSession,
+        run_id: uuid.UUID,
+    ) -> Optional[PipelineRunStatus]:
+        '''Получить статус запуска'''
+        return (
+            await session.execute(
+                select(PipelineRun.status).where(PipelineRun.id == run_id)
+            )
+        ).scalar_one_or_none()
+
+    async def get_executor_type(
+        self,
+        session: AsyncSession,
+        run_id: uuid.UUID,
+    ) -> Optional[str]:
+        '''Получить тип исполнителя запуска (по его пайплайну)'''
+        return (
+            await session.execute(
+                select(Pipeline.executor_type)
+                .join(PipelineRun, PipelineRun.pipeline_id == Pipeline.id)
+                .where(PipelineRun.id == run_id)
+            )
+        ).scalar_one_or_none()
+
+    async def get_dispatch_candidates(
+        self,
+        session: AsyncSession,
+        limit: int = 100,
+    ) -> list[uuid.UUID]:
+        '''
+        Получить ID ожидающих запусков, которые можно попытаться допустить
+
+        Запуски пайплайнов и типов исполнителей без свободных слотов
+        отсекаются, а для остальных пайплайнов берется не больше запусков,
+        чем у них свободных слотов, начиная с более приоритетных.
+        Отложенные повторы не рассматриваются до наступления available_at.
+
+        Очередь не ранжируется целиком: для каждого потока (пайплайн со
+        свободными слотами, полоса приоритета) LATERAL подзапрос берет
+        по индексу ix_pipelineruns_pending не больше limit первых
+        запусков, и ранжируются только эти головы. Стоимость зависит
+        от числа пайплайнов и limit, а не от длины очереди.
+
+        Порядок - взвешенная справедливая очередь: у каждого запуска
+        виртуальное время = его место в полосе приоритета пайплайна
+        (и пользователя, среди голов), деленное на вес полосы. Поэтому
+        поток запусков одного пайплайна или пользователя чередуется
+        с остальными, а не вытесняет их, и срочные полосы получают
+        долю пропорционально весу
+        '''
+        saturated = await run_concurrency_crud.get_saturated_executor_types(session)
+        free_slots = Pipeline.max_concurrent_runs - func.coalesce(
+            RunConcurrencyCounter.running, 0
+        )
+        pipelines = (
+            select(Pipeline.id, free_slots.label('free_slots'))
+            .outerjoin(
+                RunConcurrencyCounter,
+                and_(
+                    RunConcurrencyCounter.scope == ConcurrencyScope.PIPELINE,
+                    RunConcurrencyCounter.key == cast(Pipeline.id, String),
+                ),
+            )
+            .where(
+                or_(Pipeline.max_concurrent_runs.is_(None), free_slots > 0)
+            )
+        )
+        if saturated:
+            pipelines = pipelines.where(Pipeline.executor_type.notin_(saturated))
+        pipelines = pipelines.subquery('pipelines_with_slots')
+        lanes = values(
+            column('priority', String),
+            column('weight', Float),
+            name='lanes',
+        ).data([
+            (priority.name, settings.RUN_PRIORITY_WEIGHTS.get(priority.value, 1))
+            for priority in RunPriority
+        ])
+        head = (
+            select(
+                PipelineRun.id,
+                PipelineRun.user_id,
+                PipelineRun.priority,
+                PipelineRun.available_at,
+                func.row_number()
+                .over(order_by=PipelineRun.available_at)
+                .label('pipeline_position'),
+            )
+            .where(
+                PipelineRun.pipeline_id == pipelines.c.id,
+                PipelineRun.priority == cast(lanes.c.priority, PipelineRun.priority.type),
+                PipelineRun.status == PipelineRunStatus.PENDING,
+                PipelineRun.available_at <= func.now(),
+            )
+            .order_by(PipelineRun.available_at)
+            .limit(limit)
+            .lateral('head')
+        )
+        user_position = func.row_number().over(
+            partition_by=(head.c.user_id, head.c.priority),
+            order_by=head.c.available_at,
+        )
+        candidates = (
+            select(
+                head.c.id,
+                head.c.priority,
+                head.c.available_at,
+                func.row_number()
+                .over(
+                    partition_by=pipelines.c.id,
+                    order_by=(head.c.priority, head.c.available_at),
+                )
+                .label('position'),
+                (
+                    cast(func.greatest(head.c.pipeline_position, user_position), Float)
+                    / lanes.c.weight
+                ).label('virtual_time'),
+                pipelines.c.free_slots,
+            )
+            .select_from(pipelines)
+            .join(lanes, true())
+            .join(head, true())
+            .subquery('candidates')
+        )
+        return list(
+            (
+                await session.execute(
+                    select(candidates.c.id)
+                    .where(
+                        or_(
+                            candidates.c.free_slots.is_(None),
+                            candidates.c.position <= candidates.c.free_slots,
+                        )
+                    )
+                    .order_by(
+                        candidates.c.virtual_time,
+                        candidates.c.priority,
+                        candidates.c.available_at,
+                    )
+                    .limit(limit)
+                )
+            ).scalars().all()
+        )
+
+    async def admit(
+        self,
+        session: AsyncSession,
+        run_id: uuid.UUID,
+    ) -> Optional[PipelineRun]:
+        '''
+        Допустить ожидающий запуск к исполнению
+
+        Запуск переводится в RUNNING, только если удалось занять слоты
+        пайплайна и типа исполнителя, иначе он остается в PENDING
+        '''
+        row = (
+            await session.execute(
+                select(
+                    PipelineRun,
+                    Pipeline.executor_type,
+                    Pipeline.max_concurrent_runs,
+                )
+                .join(Pipeline, Pipeline.id == PipelineRun.pipeline_id)
+                .where(
+                    PipelineRun.id == run_id,
+                    PipelineRun.status == PipelineRunStatus.PENDING,
+                    PipelineRun.available_at <= func.now(),
+                )
+                .with_for_update(of=PipelineRun, skip_locked=True)
+            )
+        ).first()
+        if row is None:
+            return None
+        db_run, executor_type, max_concurrent_runs = row
+        if not await run_concurrency_crud.acquire(
+            session, db_run.pipeline_id, executor_type, max_concurrent_runs
+        ):
+            return None
+        db_run.status = PipelineRunStatus.RUNNING
+        db_run.started_at = datetime.now(timezone.utc)
+        return db_run
+
+    async def get_submissions(
+        self,
+        session: AsyncSession,
+        run_ids: list[uuid.UUID],
+    ) -> list[tuple[str, ExecutorSubmission]]:
+        '''Получить (executor_type, данные для исполнителя) запусков одним запросом'''
+        if not run_ids:
+            return []
+        rows = await session.execute(
+            select(
+                Pipeline.executor_type,
+                PipelineRun.id.label('run_id'),
+                PipelineRun.pipeline_id,
+                Pipeline.code.label('pipeline_code'),
+                Pipeline.external_id,
+                PipelineRun.pipeline_version_id,
+                PipelineVersion.version,
+                PipelineRun.attempt,
+                PipelineRun.priority,
+            )
+            .join(Pipeline, Pipeline.id == PipelineRun.pipeline_id)
+            .join(
+                PipelineVersion,
+                PipelineVersion.id == PipelineRun.pipeline_version_id,
+            )
+            .where(PipelineRun.id.in_(run_ids))
+        )
+        return [
+            (
+                row['executor_type'],
+                ExecutorSubmission.model_validate(
+                    {key: value for key, value in row.items() if key != 'executor_type'}
+                ),
+            )
+            for row in rows.mappings()
+        ]
+
+    async def record_submissions(
+        self,
+        session: AsyncSession,
+        executor_run_ids: dict[uuid.UUID, str],
+        failures: dict[uuid.UUID, str],
+        commit: bool = True,
+    ) -> None:
+        '''
+        Сохранить результаты передачи запусков исполнителям
+
+        Принятым запускам проставляется executor_run_id, отклоненные
+        завершаются FAILED с причиной (и, возможно, повтором).
+        Запуски, успевшие за это время завершиться, не трогаются
+        '''
+        run_ids = [*executor_run_ids, *failures]
+        if not run_ids:
+            return
+        db_runs = (
+            await session.execute(
+                select(PipelineRun)
+                .where(
+                    PipelineRun.id.in_(run_ids),
+                    PipelineRun.status == PipelineRunStatus.RUNNING,
+                )
+                .with_for_update()
+                .execution_options(populate_existing=True)
+            )
+        ).scalars().all()
+        for db_run in db_runs:
+            if db_run.id in executor_run_ids:
+                db_run.executor_run_id = executor_run_ids[db_run.id]
+            else:
+                await self.set_status(
+                    session,
+                    db_run,
+                    PipelineRunStatus.FAILED,
+                    commit=False,
+                    failure_reason=failures[db_run.id],
+                )
+        if commit:
+            await session.commit()
+
+    async def fail_unsubmitted(
+        self,
+        session: AsyncSession,
+        executor_types: list[str],
+        submitted_before: datetime,
+        limit: int = 100,
+    ) -> int:
+        '''
+        Завершить допущенные, но так и не переданные исполнителю запуски
+
+        Если процесс упал между фиксацией admit и передачей исполнителю,
+        запуск остается в RUNNING без executor_run_id и держит слоты.
+        Такие запуски типов с адаптером, допущенные раньше
+        submitted_before, завершаются FAILED (executor_unavailable):
+        слоты освобождаются, а по политике пайплайна создается повтор.
+        Возвращает число завершенных запусков
+        '''
+        if not executor_types:
+            return 0
+        db_runs = (
+            await session.execute(
+                select(PipelineRun)
+                .join(Pipeline, Pipeline.id == PipelineRun.pipeline_id)
+                .where(
+                    PipelineRun.status == PipelineRunStatus.RUNNING,
+                    PipelineRun.executor_run_id.is_(None),
+                    PipelineRun.started_at < submitted_before,
+                    Pipeline.executor_type.in_(executor_types),
+                )
+                .limit(limit)
+                .with_for_update(of=PipelineRun, skip_locked=True)
+                .execution_options(populate_existing=True)
+            )
+        ).scalars().all()
+        for db_run in db_runs:
+            await self.set_status(
+                session,
+                db_run,
+                PipelineRunStatus.FAILED,
+                commit=False,
+                failure_reason=RunFailureReason.EXECUTOR_UNAVAILABLE,
+            )
+        await session.commit()
+        return len(db_runs)
+
+    async def apply_status_updates(
+        self,
+        session: AsyncSession,
+        updates: list[RunStatusUpdate],
+        commit: bool = True,
+    ) -> dict[tuple[str, str], PipelineRunStatus]:
+        '''
+        Применить пачку обновлений статусов от исполнителей
+
+        Все обновления применяются одним UPDATE ... FROM (VALUES ...):
+        запуски ищутся по (executor_type, executor_run_id) и блокируются,
+        статус меняется только по допустимой цепочке переходов,
+        started_at и finished_at проставляются один раз. Затем для
+        изменившихся запусков пишутся лента изменений и outbox-события,
+        освобождаются слоты и планируются повторы неуспешных.
+        Возвращает для ключей (executor_type, executor_run_id) принятых
+        обновлений статус запуска до обновления
+        '''
+        if not updates:
+            return {}
+        callbacks = values(
+            column('executor_type', String),
+            column('executor_run_id', String),
+            column('status', String),
+            column('failure_reason', String),
+            column('started_at', DateTime(timezone=True)),
+            column('finished_at', DateTime(timezone=True)),
+            name='callbacks',
+        ).data([
+            (
+                status_update.executor_type,
+                status_update.executor_run_id,
+                status_update.status.name,
+                status_update.failure_reason,
+                status_update.started_at,
+                status_update.finished_at,
+            )
+            for status_update in updates
+        ])
+        locked = (
+            select(
+                PipelineRun.id,
+                PipelineRun.pipeline_id,
+                PipelineRun.status.label('previous_status'),
+                Pipeline.executor_type,
+                callbacks.c.executor_run_id,
+                cast(callbacks.c.status, PipelineRun.status.type).label('status'),
+                callbacks.c.failure_reason,
+                # Явное приведение: столбец VALUES из одних NULL имеет тип text
+                cast(callbacks.c.started_at, DateTime(timezone=True)).label('started_at'),
+                cast(callbacks.c.finished_at, DateTime(timezone=True)).label('finished_at'),
+            )
+            .join(Pipeline, Pipeline.id == PipelineRun.pipeline_id)
+            .join(
+                callbacks,
+                and_(
+                    callbacks.c.executor_run_id == PipelineRun.executor_run_id,
+                    callbacks.c.executor_type == Pipeline.executor_type,
+                ),
+            )
+            .with_for_update(of=PipelineRun)
+            .subquery('locked')
+        )
+        is_legal = or_(
+            locked.c.previous_status == locked.c.status,
+            *(
+                and_(
+                    locked.c.previous_status == status,
+                    locked.c.status.in_(reachable),
+                )
+                for status, reachable in PIPELINE_RUN_REACHABLE.items()
+                if reachable
+            ),
+        )
+        rows = (
+            await session.execute(
+                update(PipelineRun)
+                .where(PipelineRun.id == locked.c.id, is_legal)
+                .values(
+                    status=locked.c.status,
+                    started_at=case(
+                        (
+                            locked.c.status == PipelineRunStatus.PENDING,
+                            PipelineRun.started_at,
+                        ),
+                        else_=func.coalesce(
+                            PipelineRun.started_at,
+                            locked.c.started_at,
+                            locked.c.finished_at,
+                            func.now(),
+                        ),
+                    ),
+                    finished_at=case(
+                        (
+                            locked.c.status.in_(FINISHED_PIPELINE_RUN_STATUSES),
+                            func.coalesce(
+                                PipelineRun.finished_at,
+                                locked.c.finished_at,
+                                func.now(),
+                            ),
+                        ),
+                        else_=PipelineRun.finished_at,
+                    ),
+                    failure_reason=func.coalesce(
+                        locked.c.failure_reason, PipelineRun.failure_reason
+                    ),
+                    updated_at=func.now(),
+                )
+                .returning(
+                    PipelineRun.id,
+                    PipelineRun.pipeline_id,
+                    locked.c.executor_type,
+                    locked.c.executor_run_id,
+                    locked.c.previous_status,
+                    PipelineRun.status,
+                )
+                .execution_options(synchronize_session=False)
+            )
+        ).all()
+
+        changed = [row for row in rows if row.previous_status is not row.status]
+        await run_concurrency_crud.release_many(
+            session,
+            [
+                (row.pipeline_id, row.executor_type)
+                for row in changed
+                if row.previous_status is PipelineRunStatus.RUNNING
+                and row.status in FINISHED_PIPELINE_RUN_STATUSES
+            ],
+        )
+        changed_ids = [row.id for row in changed]
+
+        def write_events(sync_session) -> None:
+            '''Лента изменений и outbox для обновления в обход ORM'''
+            connection = sync_session.connection()
+            record_changes(
+                connection,
+                ChangeEntityType.PIPELINE_RUN,
+                [(row.id, row.pipeline_id) for row in changed],
+                ChangeOperation.UPDATE,
+            )
+            enqueue_outbox_events(
+                connection,
+                OUTBOX_AGGREGATES[PipelineRun.__tablename__],
+                changed_ids,
+                OutboxEventType.UPDATED,
+                {'fields': ['status', 'started_at', 'finished_at', 'failure_reason']},
+            )
+
+        if changed_ids:
+            await session.run_sync(write_events)
+
+        failed_ids = [
+            row.id for row in changed if row.status is PipelineRunStatus.FAILED
+        ]
+        if failed_ids:
+            failed = await session.execute(
+                select(PipelineRun, Pipeline)
+                .join(Pipeline, Pipeline.id == PipelineRun.pipeline_id)
+                .where(PipelineRun.id.in_(failed_ids))
+                .execution_options(populate_existing=True)
+            )
+            for db_run, pipeline in failed:
+                await self.schedule_retry(session, db_run, pipeline)
+
+        if commit:
+            await session.commit()
+        return {
+            (row.executor_type, row.executor_run_id): row.previous_status
+            for row in rows
+        }
+
+    async def schedule_retry(
+        self,
+        session: AsyncSession,
+        db_run: PipelineRun,
+        pipeline: Pipeline,
+    ) -> Optional[PipelineRun]:
+        '''
+        Создать повтор неуспешного запуска по политике пайплайна
+
+        Повтор создается в PENDING с отложенным available_at, поэтому
+        ожидание не занимает ни задач, ни слотов параллельности
+        '''
+        retry_on = pipeline.retry_on or TRANSIENT_FAILURE_REASONS
+        if (
+            db_run.failure_reason not in retry_on
+            or db_run.attempt >= pipeline.retry_max_attempts
+        ):
+            return None
+        db_retry = PipelineRun(
+            pipeline_id=db_run.pipeline_id,
+            pipeline_version_id=db_run.pipeline_version_id,
+            user_id=db_run.user_id,
+            status=PipelineRunStatus.PENDING,
+            priority=db_run.priority,
+            attempt=db_run.attempt + 1,
+            parent_run_id=db_run.id,
+            available_at=datetime.now(timezone.utc) + retry_delay(
+                db_run.attempt,
+                pipeline.retry_backoff_seconds,
+                pipeline.retry_max_backoff_seconds,
+                pipeline.retry_jitter,
+            ),
+        )
+        # Параметры копируются через ORM, чтобы не сбрасывать сессию
+        # посреди смены статуса упавшего запуска
+        db_retry.param_values = [
+            RunParamValue(name=param.name, value=param.value)
+            for param in await run_param_value_crud.get_by_run(session, db_run.id)
+        ]
+        session.add(db_retry)
+        return db_retry
+
+    async def set_status(
+        self,
+        session: AsyncSession,
+        db_run: PipelineRun,
+        status: PipelineRunStatus,
+        commit: bool = True,
+        failure_reason: Optional[str] = None,
+    ) -> PipelineRun:
+        '''
+        Перевести запуск в новый статус
+
+        При завершении освобождаются слоты параллельности, а при
+        неуспехе по повторяемой причине создается повтор запуска.
+        Слоты занимает только admit, поэтому из PENDING в RUNNING
+        запуск сюда не переводится
+        '''
+        now = datetime.now(timezone.utc)
+        if status is PipelineRunStatus.RUNNING and db_run.started_at is None:
+            db_run.started_at = now
+        if status in FINISHED_PIPELINE_RUN_STATUSES:
+            db_run.finished_at = db_run.finished_at or now
+            pipeline = (
+                await session.execute(
+                    select(Pipeline).where(Pipeline.id == db_run.pipeline_id)
+                )
+            ).scalar_one()
+            if db_run.status is PipelineRunStatus.RUNNING:
+                await run_concurrency_crud.release(
+                    session, db_run.pipeline_id, pipeline.executor_type
+                )
+            if status is PipelineRunStatus.FAILED:
+                if failure_reason is not None:
+                    db_run.failure_reason = failure_reason
+                await self.schedule_retry(session, db_run, pipeline)
+        db_run.status = status
+        session.add(db_run)
+        if commit:
+            await session.commit()
+            await session.refresh(db_run)
+        return db_run
+
+    @override
+    async def update(
+        self,
+        session: AsyncSession,
+        db_object: PipelineRun,
+        update_schema: PipelineRunUpdate,
+        commit: bool = True,
+    ) -> PipelineRun:
+        '''Обновить запуск, переводя статус через set_status'''
+        if (
+            update_schema.status is not None
+            and update_schema.status is not db_object.status
+        ):
+            await self.set_status(
+                session,
+                db_object,
+                update_schema.status,
+                commit=False,
+                failure_reason=update_schema.failure_reason,
+            )
+        return await super().update(
+            session,
+            db_object,
+            PipelineRunUpdate(
+                **update_schema.model_dump(
+                    exclude_unset=True, exclude={'status', 'failure_reason'}
+                )
+            ),
+            commit=commit,
+        )
+
+
+pipeline_run_crud = CRUDPipelineRun(PipelineRun)
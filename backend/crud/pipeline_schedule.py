@@ -0,0 +1,186 @@
+'''
+CRUD операции для PipelineSchedule
+'''
+import uuid
+from datetime import datetime, timezone
+from typing import Optional, override
+
+from croniter import croniter
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from crud.base import CRUDBase
+from crud.pipeline_run import pipeline_run_crud
+from models.pipeline import Pipeline
+from models.pipeline_schedule import PipelineSchedule
+from models.pipeline_version import PipelineVersion
+from schemas.pipeline_schedule import (PipelineScheduleCreate,
+                                       PipelineScheduleUpdate)
+
+
+def next_fire_time(cron: str, after: datetime) -> datetime:
+    '''Ближайшее срабатывание cron-выражения строго после after (UTC)'''
+    return croniter(cron, after).get_next(datetime)
+
+
+class CRUDPipelineSchedule(
+    CRUDBase[PipelineSchedule, PipelineScheduleCreate, PipelineScheduleUpdate]
+):
+    '''CRUD операции для PipelineSchedule'''
+
+    @override
+    async def create(
+        self,
+        session: AsyncSession,
+        create_schema: PipelineScheduleCreate,
+        commit: bool = True,
+    ) -> PipelineSchedule:
+        '''Создать расписание и вычислить ближайшее срабатывание'''
+        db_schedule = PipelineSchedule(
+            **create_schema.model_dump(),
+            next_run_at=next_fire_time(
+                create_schema.cron, datetime.now(timezone.utc)
+            ),
+        )
+        session.add(db_schedule)
+        if commit:
+            await session.commit()
+            await session.refresh(db_schedule)
+        return db_schedule
+
+    @override
+    async def update(
+        self,
+        session: AsyncSession,
+        db_object: PipelineSchedule,
+        update_schema: PipelineScheduleUpdate,
+        commit: bool = True,
+    ) -> PipelineSchedule:
+        '''
+        Обновить расписание, пересчитав срабатывание при смене cron
+        и при повторной активации
+
+        Без пересчета активированное расписание с catchup сразу
+        догоняло бы все срабатывания, пропущенные, пока оно было выключено
+        '''
+        cron_changed = (
+            update_schema.cron is not None and update_schema.cron != db_object.cron
+        )
+        reactivated = update_schema.is_active is True and not db_object.is_active
+        if cron_changed or reactivated:
+            db_object.next_run_at = next_fire_time(
+                update_schema.cron or db_object.cron, datetime.now(timezone.utc)
+            )
+        return await super().update(session, db_object, update_schema, commit)
+
+    async def get_changed_since(
+        self,
+        session: AsyncSession,
+        since: Optional[datetime] = None,
+    ) -> list:
+        '''Получить (id, cron, is_active, next_run_at, updated_at) расписаний, измененных после since'''
+        query = select(
+            PipelineSchedule.id,
+            PipelineSchedule.cron,
+            PipelineSchedule.is_active,
+            PipelineSchedule.next_run_at,
+            PipelineSchedule.updated_at,
+        )
+        if since is None:
+            query = query.where(PipelineSchedule.is_active == True)
+        else:
+            query = query.where(PipelineSchedule.updated_at >= since)
+        return list((await session.execute(query)).all())
+
+    async def fire(
+        self,
+        session: AsyncSession,
+        schedule_id: uuid.UUID,
+        expected_next_run_at: datetime,
+        now: datetime,
+    ) -> Optional[datetime]:
+        '''
+        Создать запуски для наступивших срабатываний расписания
+
+        Расписание блокируется и обрабатывается, только если его
+        next_run_at не изменился с момента планирования, поэтому
+        удаленные и измененные расписания не срабатывают повторно.
+        Возвращает новое next_run_at или None, если расписание
+        больше не нужно планировать
+        '''
+        db_schedule = (
+            await session.execute(
+                select(PipelineSchedule)
+                .where(
+                    PipelineSchedule.id == schedule_id,
+                    PipelineSchedule.is_active == True,
+                    PipelineSchedule.next_run_at == expected_next_run_at,
+                )
+                .with_for_update(skip_locked=True)
+            )
+        ).scalar_one_or_none()
+        if db_schedule is None:
+            return None
+        if db_schedule.next_run_at > now:
+            return db_schedule.next_run_at
+
+        if db_schedule.catchup:
+            # Все пропущенные срабатывания, но не больше SCHEDULER_MAX_CATCHUP_RUNS
+            fire_times = []
+            next_run_at = db_schedule.next_run_at
+            while (
+                next_run_at <= now
+                and len(fire_times) < settings.SCHEDULER_MAX_CATCHUP_RUNS
+            ):
+                fire_times.append(next_run_at)
+                next_run_at = next_fire_time(db_schedule.cron, next_run_at)
+            if next_run_at <= now:
+                next_run_at = next_fire_time(db_schedule.cron, now)
+        else:
+            fire_times = [db_schedule.next_run_at]
+            next_run_at = next_fire_time(db_schedule.cron, now)
+
+        pipeline_version_id = db_schedule.pipeline_version_id
+        if pipeline_version_id is None:
+            pipeline_version_id = (
+                await session.execute(
+                    select(PipelineVersion.id)
+                    .where(
+                        PipelineVersion.pipeline_id == db_schedule.pipeline_id,
+                        PipelineVersion.is_active == True,
+                    )
+                )
+            ).scalar_one_or_none()
+        pipeline_is_active = (
+            await session.execute(
+                select(Pipeline.is_active)
+                .where(Pipeline.id == db_schedule.pipeline_id)
+            )
+        ).scalar_one()
+        if pipeline_version_id is not None and pipeline_is_active:
+            for _ in fire_times:
+                await pipeline_run_crud.create_pending(
+                    session,
+                    db_schedule.pipeline_id,
+                    pipeline_version_id,
+                    priority=db_schedule.priority,
+                    commit=False,
+                )
+
+        # updated_at не меняется: планировщик досинхронизирует по нему
+        # изменения определений, а не каждое срабатывание
+        await session.execute(
+            update(PipelineSchedule)
+            .where(PipelineSchedule.id == db_schedule.id)
+            .values(
+                next_run_at=next_run_at,
+                last_run_at=fire_times[-1] if fire_times else db_schedule.last_run_at,
+                updated_at=PipelineSchedule.updated_at,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return next_run_at
+
+
+pipeline_schedule_crud = CRUDPipelineSchedule(PipelineSchedule)
@@ -1,19 +1,27 @@
 import uuid
-from typing import Optional, override
+from typing import Optional, Sequence, override
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
-from crud.base import CRUDBase
+from crud.base import CRUDBase, schema_columns
+from crud.loaders import LoaderProfile
+from models.enums.tag import TagEntityType
+from models.pipeline import Pipeline
+from models.pipeline_run import PipelineRun
 from models.pipeline_version import PipelineVersion
 from schemas.pipeline_version import (PipelineVersionCreate,
+                                      PipelineVersionInDB,
+                                      PipelineVersionPipeline,
+                                      PipelineVersionPipelineRun,
                                       PipelineVersionUpdate)
 
 
 class PipelineVersionCRUD(CRUDBase[PipelineVersion, PipelineVersionCreate, PipelineVersionUpdate]):
     '''CRUD для PipelineVersion'''
 
+    tag_entity_type = TagEntityType.PIPELINE_VERSION
+
     @override
     async def get_all(
         self,
@@ -26,33 +34,82 @@ class PipelineVersionCRUD(CRUDBase[PipelineVersion, PipelineVersionCreate, Pipel
 
         query = (
             select(PipelineVersion)
-            .options(selectinload(PipelineVersion.pipeline))
-            .options(selectinload(PipelineVersion.runs))
+            .options(*self.loader_options(LoaderProfile.DETAIL))
         )
-        for key, value in filters.items():
-            if hasattr(PipelineVersion, key) and value is not None:
-                query = query.where(getattr(PipelineVersion, key) == value)
+        query = self._apply_filters(query, filters)
         result = await session.execute(
             query.offset(offset).limit(limit)
         )
         return list(result.scalars().all())
-    
+
+    @override
+    async def get_all_mappings(
+        self,
+        session: AsyncSession,
+        columns: Optional[Sequence] = None,
+        offset: int = 0,
+        limit: int = 100,
+        **filters
+    ) -> list[dict]:
+        '''Получить PipelineVersion в виде словарей вместе с пайплайном и запусками'''
+        versions = await super().get_all_mappings(
+            session,
+            columns or schema_columns(PipelineVersion, PipelineVersionInDB),
+            offset,
+            limit,
+            **filters
+        )
+        if not versions:
+            return versions
+        pipelines = await self.group_mappings(
+            session,
+            select(
+                Pipeline.id.label('pipeline_key'),
+                *schema_columns(Pipeline, PipelineVersionPipeline)
+            ).where(
+                Pipeline.id.in_(
+                    list({version['pipeline_id'] for version in versions})
+                )
+            ),
+            'pipeline_key',
+        )
+        runs = await self.group_mappings(
+            session,
+            select(
+                PipelineRun.pipeline_version_id,
+                *schema_columns(PipelineRun, PipelineVersionPipelineRun)
+            ).where(
+                PipelineRun.pipeline_version_id.in_(
+                    [version['id'] for version in versions]
+                )
+            ),
+            'pipeline_version_id',
+        )
+        for version in versions:
+            version['pipeline'] = pipelines[version['pipeline_id']][0]
+            version['runs'] = runs.get(version['id'], [])
+        return versions
+
     @override
     async def get_by_id(
         self,
         session: AsyncSession,
-        id: uuid.UUID
+        id: uuid.UUID,
+        profile: LoaderProfile = LoaderProfile.DETAIL,
     ) -> Optional[PipelineVersion]:
         '''Получить PipelineVersion по ID'''
-        return (
-            await session.execute(
-                select(PipelineVersion)
-                .where(PipelineVersion.id == id)
-                .options(selectinload(PipelineVersion.pipeline))
-                .options(selectinload(PipelineVersion.runs))
-            )
-        ).scalar_one_or_none()
+        return await super().get_by_id(session, id, profile)
+
 
+    @override
+    async def get_by_ids(
+        self,
+        session: AsyncSession,
+        ids: Sequence[uuid.UUID],
+        profile: LoaderProfile = LoaderProfile.DETAIL,
+    ) -> list[Optional[PipelineVersion]]:
+        '''Получить PipelineVersion по списку ID вместе с пайплайном и запусками'''
+        return await super().get_by_ids(session, ids, profile)
 
     async def get_all_by_pipeline_id(
         self,
@@ -64,8 +121,7 @@ class PipelineVersionCRUD(CRUDBase[PipelineVersion, PipelineVersionCreate, Pipel
             await session.execute(
                 select(PipelineVersion)
                 .where(PipelineVersion.pipeline_id == pipeline_id)
-                .options(selectinload(PipelineVersion.pipeline))
-                .options(selectinload(PipelineVersion.runs))
+                .options(*self.loader_options(LoaderProfile.DETAIL))
             )
         ).scalars().all()
 
@@ -80,8 +136,7 @@ class PipelineVersionCRUD(CRUDBase[PipelineVersion, PipelineVersionCreate, Pipel
                 select(PipelineVersion)
                 .where(PipelineVersion.pipeline_id == pipeline_id)
                 .where(PipelineVersion.is_active == True)
-                .options(selectinload(PipelineVersion.pipeline))
-                .options(selectinload(PipelineVersion.runs))
+                .options(*self.loader_options(LoaderProfile.DETAIL))
             )
         ).scalar_one_or_none()
 
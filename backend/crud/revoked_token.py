@@ -0,0 +1,73 @@
+'''
+CRUD операции для отозванных токенов
+'''
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from crud.base import CRUDBase
+from models.revoked_token import RevokedToken
+
+
+class CRUDRevokedToken(CRUDBase[RevokedToken, None, None]):
+    '''CRUD операции для отозванных токенов'''
+
+    async def revoke(
+        self,
+        session: AsyncSession,
+        jti: str,
+        user_id: Optional[uuid.UUID],
+        expires_at: datetime,
+    ) -> None:
+        '''
+        Отозвать токен
+
+        В той же транзакции отправляется NOTIFY с jti, поэтому остальные
+        процессы узнают об отзыве сразу после фиксации
+        '''
+        await session.execute(
+            insert(RevokedToken)
+            .values(jti=jti, user_id=user_id, expires_at=expires_at)
+            .on_conflict_do_nothing(index_elements=['jti'])
+        )
+        await session.execute(
+            select(func.pg_notify(settings.TOKEN_REVOCATION_CHANNEL, jti))
+        )
+        await session.commit()
+
+    async def is_revoked(self, session: AsyncSession, jti: str) -> bool:
+        '''Отозван ли токен (и еще не истек)'''
+        return (
+            await session.execute(
+                select(RevokedToken.id)
+                .where(RevokedToken.jti == jti)
+                .where(RevokedToken.expires_at > func.now())
+            )
+        ).first() is not None
+
+    async def get_active_jtis(self, session: AsyncSession) -> list[str]:
+        '''Получить jti всех отозванных и еще не истекших токенов'''
+        return list(
+            (
+                await session.execute(
+                    select(RevokedToken.jti)
+                    .where(RevokedToken.expires_at > func.now())
+                )
+            ).scalars()
+        )
+
+    async def purge_expired(self, session: AsyncSession) -> int:
+        '''Удалить записи об истекших токенах'''
+        result = await session.execute(
+            delete(RevokedToken).where(RevokedToken.expires_at <= func.now())
+        )
+        await session.commit()
+        return result.rowcount
+
+
+revoked_token_crud = CRUDRevokedToken(RevokedToken)
@@ -0,0 +1,150 @@
+'''
+CRUD операции для счетчиков параллельности запусков
+'''
+import uuid
+from collections import Counter
+from typing import Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from crud.base import CRUDBase
+from models.enums.run_concurrency import ConcurrencyScope
+from models.run_concurrency import RunConcurrencyCounter
+
+
+class CRUDRunConcurrency(CRUDBase[RunConcurrencyCounter, None, None]):
+    '''
+    CRUD операции для счетчиков параллельности запусков
+
+    Слоты всегда занимаются и освобождаются в порядке
+    "пайплайн, затем тип исполнителя", поэтому конкурирующие транзакции
+    не могут заблокировать друг друга по кругу
+    '''
+
+    async def _increment(
+        self,
+        session: AsyncSession,
+        scope: ConcurrencyScope,
+        key: str,
+        limit: Optional[int],
+    ) -> bool:
+        '''Занять слот в области, если лимит не исчерпан'''
+        await session.execute(
+            insert(RunConcurrencyCounter)
+            .values(scope=scope, key=key, running=0)
+            .on_conflict_do_nothing(constraint='uix_run_concurrency_counter')
+        )
+        query = (
+            update(RunConcurrencyCounter)
+            .where(
+                RunConcurrencyCounter.scope == scope,
+                RunConcurrencyCounter.key == key,
+            )
+            .values(running=RunConcurrencyCounter.running + 1)
+            .returning(RunConcurrencyCounter.running)
+            .execution_options(synchronize_session=False)
+        )
+        if limit is not None:
+            query = query.where(RunConcurrencyCounter.running < limit)
+        return (await session.execute(query)).first() is not None
+
+    async def _decrement(
+        self,
+        session: AsyncSession,
+        scope: ConcurrencyScope,
+        key: str,
+        amount: int = 1,
+    ) -> None:
+        '''Освободить слоты в области'''
+        await session.execute(
+            update(RunConcurrencyCounter)
+            .where(
+                RunConcurrencyCounter.scope == scope,
+                RunConcurrencyCounter.key == key,
+            )
+            .values(
+                running=func.greatest(RunConcurrencyCounter.running - amount, 0)
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    async def acquire(
+        self,
+        session: AsyncSession,
+        pipeline_id: uuid.UUID,
+        executor_type: str,
+        pipeline_limit: Optional[int],
+    ) -> bool:
+        '''Занять слоты пайплайна и типа исполнителя для запуска'''
+        if not await self._increment(
+            session, ConcurrencyScope.PIPELINE, str(pipeline_id), pipeline_limit
+        ):
+            return False
+        if not await self._increment(
+            session,
+            ConcurrencyScope.EXECUTOR,
+            executor_type,
+            settings.EXECUTOR_CONCURRENCY_LIMITS.get(executor_type),
+        ):
+            await self._decrement(
+                session, ConcurrencyScope.PIPELINE, str(pipeline_id)
+            )
+            return False
+        return True
+
+    async def release(
+        self,
+        session: AsyncSession,
+        pipeline_id: uuid.UUID,
+        executor_type: str,
+    ) -> None:
+        '''Освободить слоты пайплайна и типа исполнителя после завершения запуска'''
+        await self._decrement(session, ConcurrencyScope.PIPELINE, str(pipeline_id))
+        await self._decrement(session, ConcurrencyScope.EXECUTOR, executor_type)
+
+    async def release_many(
+        self,
+        session: AsyncSession,
+        runs: list[tuple[uuid.UUID, str]],
+    ) -> None:
+        '''
+        Освободить слоты пачки завершенных запусков (pipeline_id, executor_type)
+
+        Один UPDATE на счетчик; счетчики обходятся в отсортированном
+        порядке, чтобы параллельные пачки не блокировали друг друга
+        '''
+        pipelines = Counter(str(pipeline_id) for pipeline_id, _ in runs)
+        executors = Counter(executor_type for _, executor_type in runs)
+        for key in sorted(pipelines):
+            await self._decrement(
+                session, ConcurrencyScope.PIPELINE, key, pipelines[key]
+            )
+        for key in sorted(executors):
+            await self._decrement(
+                session, ConcurrencyScope.EXECUTOR, key, executors[key]
+            )
+
+    async def get_saturated_executor_types(
+        self,
+        session: AsyncSession,
+    ) -> list[str]:
+        '''Получить типы исполнителей, исчерпавшие лимит параллельности'''
+        limits = settings.EXECUTOR_CONCURRENCY_LIMITS
+        if not limits:
+            return []
+        counters = (
+            await session.execute(
+                select(RunConcurrencyCounter.key, RunConcurrencyCounter.running)
+                .where(
+                    RunConcurrencyCounter.scope == ConcurrencyScope.EXECUTOR,
+                    RunConcurrencyCounter.key.in_(list(limits)),
+                )
+            )
+        ).all()
+        return [key for key, running in counters if running >= limits[key]]
+
+
+run_concurrency_crud = CRUDRunConcurrency(RunConcurrencyCounter)
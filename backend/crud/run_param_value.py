@@ -0,0 +1,68 @@
+'''
+CRUD операции для RunParamValue
+'''
+import hashlib
+import uuid
+
+from sqlalchemy import exists, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from crud.base import CRUDBase
+from models.run_param_value import RunParamValue
+from schemas.run_param_value import RunParamValueCreate, RunParamValueUpdate
+
+
+def param_equals(run_id_column, name: str, value: str):
+    '''
+    Условие "у запуска есть параметр name = value"
+
+    Сравнение хеша позволяет использовать индекс (name, md5(value)),
+    сравнение самого значения исключает коллизии
+    '''
+    return exists().where(
+        RunParamValue.pipeline_run_id == run_id_column,
+        RunParamValue.name == name,
+        func.md5(RunParamValue.value) == hashlib.md5(value.encode()).hexdigest(),
+        RunParamValue.value == value,
+    )
+
+
+class CRUDRunParamValue(
+    CRUDBase[RunParamValue, RunParamValueCreate, RunParamValueUpdate]
+):
+    '''CRUD операции для RunParamValue'''
+
+    async def get_by_run(
+        self,
+        session: AsyncSession,
+        run_id: uuid.UUID,
+    ) -> list[RunParamValue]:
+        '''Получить параметры запуска'''
+        result = await session.execute(
+            select(RunParamValue)
+            .where(RunParamValue.pipeline_run_id == run_id)
+            .order_by(RunParamValue.name)
+        )
+        return list(result.scalars().all())
+
+    async def bulk_create(
+        self,
+        session: AsyncSession,
+        run_id: uuid.UUID,
+        params: dict[str, str],
+        commit: bool = True,
+    ) -> None:
+        '''Сохранить все параметры запуска одним INSERT'''
+        if not params:
+            return
+        await session.execute(
+            insert(RunParamValue).values([
+                {'pipeline_run_id': run_id, 'name': name, 'value': value}
+                for name, value in params.items()
+            ])
+        )
+        if commit:
+            await session.commit()
+
+
+run_param_value_crud = CRUDRunParamValue(RunParamValue)
@@ -0,0 +1,84 @@
+'''
+Поиск по JSONB schema версий пайплайнов и артефактов запусков
+'''
+import uuid
+from typing import Optional, Type
+
+from sqlalchemy import Select, any_, bindparam, cast, column, select, table
+from sqlalchemy.dialects.postgresql import (ARRAY, JSONB, JSONPATH,
+                                            REGCLASS)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.annotations import GUID
+from models.base import BaseModel
+from models.pipeline_run import PipelineRun
+from models.run_artifact import RunArtifact
+
+pg_class = table('pg_class', column('oid'), column('reltuples'))
+
+
+def schema_index_name(model: Type[BaseModel]) -> str:
+    '''Имя GIN индекса jsonb_path_ops по schema модели'''
+    return f'ix_{model.__tablename__}_schema_path_ops'
+
+
+def schema_search_query(
+    model: Type[BaseModel],
+    contains: Optional[dict] = None,
+    path: Optional[str] = None,
+) -> Select:
+    '''
+    Запрос моделей, schema которых удовлетворяет фильтру
+
+    Используются только операторы @> и @?, которые поддерживает
+    GIN индекс jsonb_path_ops (jsonb_path_exists() индекс не использует)
+    '''
+    query = select(model)
+    if contains is not None:
+        query = query.where(model.schema.op('@>')(cast(contains, JSONB)))
+    if path is not None:
+        query = query.where(model.schema.op('@?')(cast(path, JSONPATH)))
+    return query
+
+
+def restrict_to_pipelines(
+    query: Select,
+    model: Type[BaseModel],
+    pipeline_ids: Optional[list[uuid.UUID]],
+) -> Select:
+    '''
+    Оставить в запросе поиска только сущности доступных пайплайнов
+
+    None - без ограничения (администратор). Артефакты фильтруются по
+    пайплайну своего запуска
+    '''
+    if pipeline_ids is None:
+        return query
+    visible = any_(
+        bindparam('pipeline_ids', list(pipeline_ids), type_=ARRAY(GUID()))
+    )
+    if model is RunArtifact:
+        return query.where(
+            RunArtifact.pipeline_run_id.in_(
+                select(PipelineRun.id).where(PipelineRun.pipeline_id == visible)
+            )
+        )
+    return query.where(model.pipeline_id == visible)
+
+
+async def get_estimated_rows(
+    session: AsyncSession, table_name: str
+) -> Optional[float]:
+    '''
+    Оценка числа строк таблицы по статистике планировщика
+
+    None, если таблица еще не анализировалась (reltuples = -1)
+    '''
+    reltuples = (
+        await session.execute(
+            select(pg_class.c.reltuples)
+            .where(pg_class.c.oid == cast(table_name, REGCLASS))
+        )
+    ).scalar_one()
+    return None if reltuples < 0 else reltuples
+
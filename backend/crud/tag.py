@@ -1,9 +1,236 @@
+import uuid
+from collections import Counter
+from typing import AsyncIterator, Optional, Sequence
+
+from fastapi import HTTPException
+from sqlalchemy import any_, bindparam, delete, func, literal, select
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
 from crud.base import CRUDBase
-from models.tag import Tag
-from schemas.tag import TagCreate, TagUpdate, TagRead
+from database.annotations import GUID
+from models.enums.tag import TagEntityType
+from models.pipeline import Pipeline
+from models.pipeline_run import PipelineRun
+from models.pipeline_version import PipelineVersion
+from models.tag import Tag, TagLink, record_tag_counts
+from schemas.tag import (TagCreate, TagLinkCreate, TagLinksBulkRequest,
+                         TagLinksBulkResult, TagUpdate, TagRead)
+
+# Модели сущностей, к которым привязываются теги
+TAGGED_MODELS = {
+    TagEntityType.PIPELINE: Pipeline,
+    TagEntityType.PIPELINE_VERSION: PipelineVersion,
+    TagEntityType.PIPELINE_RUN: PipelineRun,
+}
 
 class CRUDTag(CRUDBase[Tag, TagCreate, TagUpdate]):
     pass
 
 
+class CRUDTagLink(CRUDBase[TagLink, TagLinkCreate, TagLinkCreate]):
+    '''CRUD операции для связей тегов с сущностями'''
+
+    async def get_by_tag(
+        self,
+        session: AsyncSession,
+        tag_id: int,
+        entity_type: Optional[TagEntityType] = None,
+        offset: int = 0,
+        limit: int = 100,
+    ) -> list[TagLink]:
+        '''Получить связи тега (опционально только с сущностями одного типа)'''
+        return await self.get_all(
+            session,
+            offset,
+            limit,
+            tag_id=tag_id,
+            entity_type=entity_type,
+        )
+
+    async def get_link(
+        self,
+        session: AsyncSession,
+        tag_id: int,
+        entity_type: TagEntityType,
+        entity_id: uuid.UUID,
+    ) -> Optional[TagLink]:
+        '''Получить связь тега с сущностью'''
+        return (
+            await session.execute(
+                select(TagLink)
+                .where(TagLink.tag_id == tag_id)
+                .where(TagLink.entity_type == entity_type)
+                .where(TagLink.entity_id == entity_id)
+            )
+        ).scalar_one_or_none()
+
+    async def create_for_tag(
+        self,
+        session: AsyncSession,
+        tag_id: int,
+        create_schema: TagLinkCreate,
+    ) -> TagLink:
+        '''Привязать тег к сущности'''
+        db_link = TagLink(tag_id=tag_id, **create_schema.model_dump())
+        session.add(db_link)
+        await session.commit()
+        await session.refresh(db_link)
+        return db_link
+
+    @staticmethod
+    async def iter_entity_id_chunks(
+        session: AsyncSession,
+        bulk_request: TagLinksBulkRequest,
+        chunk_size: int,
+    ) -> AsyncIterator[list[uuid.UUID]]:
+        '''
+        Разбить сущности пакетной операции на пачки ID
+
+        Явный список режется после удаления повторов, а сущности
+        пайплайна читаются по ключу (id > последнего ID пачки)
+        '''
+        if bulk_request.entity_ids is not None:
+            entity_ids = list(dict.fromkeys(bulk_request.entity_ids))
+            for start in range(0, len(entity_ids), chunk_size):
+                yield entity_ids[start:start + chunk_size]
+            return
+        model = TAGGED_MODELS[bulk_request.entity_type]
+        last_id = None
+        while True:
+            query = (
+                select(model.id)
+                .where(model.pipeline_id == bulk_request.pipeline_id)
+                .order_by(model.id)
+                .limit(chunk_size)
+            )
+            if last_id is not None:
+                query = query.where(model.id > last_id)
+            chunk = list((await session.execute(query)).scalars())
+            if not chunk:
+                return
+            yield chunk
+            last_id = chunk[-1]
+
+    @staticmethod
+    def _entity_ids_param(entity_ids: Sequence[uuid.UUID]):
+        '''Пачка ID одним параметром-массивом (вместо IN со списком)'''
+        return any_(bindparam('entity_ids', list(entity_ids), type_=ARRAY(GUID())))
+
+    async def _create_chunk(
+        self,
+        session: AsyncSession,
+        tag_id: int,
+        entity_type: TagEntityType,
+        entity_ids: Sequence[uuid.UUID],
+    ) -> tuple[int, int]:
+        '''
+        Привязать тег к пачке сущностей одним запросом
+
+        Несуществующие сущности отбрасываются соединением с их таблицей,
+        уже существующие связи пропускаются ON CONFLICT DO NOTHING.
+        Возвращает число найденных сущностей и созданных связей
+        '''
+        model = TAGGED_MODELS[entity_type]
+        found = (
+            select(model.id)
+            .where(model.id == self._entity_ids_param(entity_ids))
+            .cte('found')
+        )
+        created = (
+            insert(TagLink)
+            .from_select(
+                ['tag_id', 'entity_type', 'entity_id'],
+                select(literal(tag_id), literal(entity_type.value), found.c.id),
+            )
+            .on_conflict_do_nothing(constraint='uix_tag_link_unique')
+            .returning(TagLink.entity_id)
+            .cte('created')
+        )
+        row = (
+            await session.execute(
+                select(
+                    select(func.count()).select_from(found).scalar_subquery(),
+                    select(func.count()).select_from(created).scalar_subquery(),
+                )
+            )
+        ).one()
+        return row[0], row[1]
+
+    async def _delete_chunk(
+        self,
+        session: AsyncSession,
+        tag_id: int,
+        entity_type: TagEntityType,
+        entity_ids: Sequence[uuid.UUID],
+    ) -> int:
+        '''Отвязать тег от пачки сущностей одним запросом, вернуть число удаленных связей'''
+        result = await session.execute(
+            delete(TagLink)
+            .where(TagLink.tag_id == tag_id)
+            .where(TagLink.entity_type == entity_type)
+            .where(TagLink.entity_id == self._entity_ids_param(entity_ids))
+            .returning(TagLink.id)
+        )
+        return len(result.all())
+
+    async def bulk_link(
+        self,
+        session: AsyncSession,
+        tag_id: int,
+        bulk_request: TagLinksBulkRequest,
+        remove: bool = False,
+    ) -> TagLinksBulkResult:
+        '''
+        Пакетно привязать (remove=True - отвязать) тег к сущностям
+
+        Сущности обрабатываются пачками по TAG_BULK_CHUNK_SIZE, каждая
+        пачка - один запрос и отдельная транзакция вместе с изменением
+        счетчиков фасетов, поэтому блокировки держатся недолго, а при
+        ошибке уже обработанные пачки остаются в силе
+        '''
+        entity_type = bulk_request.entity_type
+        result = TagLinksBulkResult()
+        committed = 0
+        try:
+            async for entity_ids in self.iter_entity_id_chunks(
+                session, bulk_request, settings.TAG_BULK_CHUNK_SIZE
+            ):
+                result.requested += len(entity_ids)
+                if remove:
+                    delta = -await self._delete_chunk(
+                        session, tag_id, entity_type, entity_ids
+                    )
+                    result.removed -= delta
+                else:
+                    found, delta = await self._create_chunk(
+                        session, tag_id, entity_type, entity_ids
+                    )
+                    result.created += delta
+                    result.existing += found - delta
+                    result.not_found += len(entity_ids) - found
+                if delta:
+                    deltas = Counter({(entity_type.value, tag_id): delta})
+                    await session.run_sync(
+                        lambda sync_session: record_tag_counts(
+                            sync_session.connection(), deltas
+                        )
+                    )
+                await session.commit()
+                committed = result.requested
+        except SQLAlchemyError as error:
+            await session.rollback()
+            raise HTTPException(
+                status_code=500,
+                detail=(
+                    f'Ошибка SQLAlchemy после обработки {committed} '
+                    f'сущностей: {str(error)}'
+                )
+            )
+        return result
+
+
 tag_crud = CRUDTag(Tag)
+tag_link_crud = CRUDTagLink(TagLink)
@@ -1,49 +1,168 @@
 import uuid
-from typing import Optional, override
+from typing import Optional, Sequence, override
 
-from fastapi import HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import Select, String, any_, bindparam, func, select
+from sqlalchemy.dialects.postgresql import ARRAY, insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from core.security import get_password_hash
-from crud.base import CRUDBase
-from crud.pipeline import pipeline_crud
-from models.pipeline import Pipeline
+from crud.base import CRUDBase, schema_columns
+from crud.loaders import LoaderProfile
+from crud.pipeline import (parse_ownership_ids, pipeline_crud,
+                          update_ownership)
+from models.enums.outbox import OutboxEventType
+from models.outbox import OUTBOX_AGGREGATES, enqueue_outbox_events
+from models.pipeline import Pipeline, pipeline_owners
 from models.user import User
-from schemas.user import UserCreate, UserUpdate
+from schemas.user import (UserCreate, UserListRead, UserPipelinesRead,
+                          UserUpdate)
 
 
 class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
     '''CRUD операции для User'''
 
+    def _list_query(self, **filters) -> Select:
+        '''Запрос колонок пользователей для списков вместе с числом пайплайнов'''
+        pipelines_count = (
+            select(func.count())
+            .where(pipeline_owners.c.user_id == self.model.id)
+            .correlate(self.model)
+            .scalar_subquery()
+            .label('pipelines_count')
+        )
+        return self._apply_filters(
+            select(*schema_columns(User, UserListRead), pipelines_count), filters
+        )
+
+    def page_query(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        email_prefix: Optional[str] = None,
+        **filters
+    ) -> Select:
+        '''Запрос страницы пользователей (см. get_page_mappings)'''
+        query = self._list_query(**filters)
+        if email_prefix:
+            query = query.where(
+                func.lower(self.model.email).startswith(email_prefix.lower(), autoescape=True)
+            )
+        if cursor is not None:
+            query = query.where(self.model.email > cursor)
+        return query.order_by(self.model.email).limit(limit)
+
+    async def get_page_mappings(
+        self,
+        session: AsyncSession,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        email_prefix: Optional[str] = None,
+        expand_pipelines: bool = False,
+        **filters
+    ) -> list[dict]:
+        '''
+        Получить страницу пользователей в виде словарей (по возрастанию email)
+
+        cursor - email последнего пользователя предыдущей страницы, страница
+        выбирается по уникальному индексу email без OFFSET. Число пайплайнов
+        считается в том же запросе, списки пайплайнов загружаются одним
+        дополнительным запросом только при expand_pipelines
+        '''
+        users = [
+            dict(row)
+            for row in (
+                await session.execute(
+                    self.page_query(cursor, limit, email_prefix, **filters)
+                )
+            ).mappings()
+        ]
+        if not users or not expand_pipelines:
+            return users
+        pipelines = await self.group_mappings(
+            session,
+            select(
+                pipeline_owners.c.user_id,
+                *schema_columns(Pipeline, UserPipelinesRead)
+            )
+            .join(Pipeline, Pipeline.id == pipeline_owners.c.pipeline_id)
+            .where(pipeline_owners.c.user_id.in_([user['id'] for user in users])),
+            'user_id',
+        )
+        for user in users:
+            user['pipelines'] = pipelines.get(user['id'], [])
+        return users
+
+    async def search_mappings(
+        self,
+        session: AsyncSession,
+        q: str,
+        limit: int = 20,
+    ) -> list[dict]:
+        '''
+        Найти пользователей, email которых содержит q (без учета регистра)
+
+        Условие lower(email) LIKE '%q%' выполняется по GIN индексу
+        триграмм ix_users_email_lower_trgm, найденные упорядочиваются
+        по сходству email со строкой поиска
+        '''
+        result = await session.execute(self.search_query(q, limit))
+        return [dict(row) for row in result.mappings()]
+
+    def search_query(self, q: str, limit: int = 20) -> Select:
+        '''Запрос поиска пользователей по подстроке email (см. search_mappings)'''
+        q = q.lower()
+        email = func.lower(self.model.email)
+        return (
+            self._list_query()
+            .where(email.contains(q, autoescape=True))
+            .order_by(func.similarity(email, q).desc(), self.model.email)
+            .limit(limit)
+        )
+
     @override
     async def get_by_id(
         self,
         session: AsyncSession,
-        id: uuid.UUID
+        id: uuid.UUID,
+        profile: LoaderProfile = LoaderProfile.DETAIL,
     ) -> Optional[User]:
         '''Получить пользователя по ID'''
-        result = await session.execute(
-            select(self.model)
-            .where(self.model.id == id)
-            .options(selectinload(self.model.pipelines))
-        )
-        return result.scalar_one_or_none()
+        return await super().get_by_id(session, id, profile)
+
+    @override
+    async def get_by_ids(
+        self,
+        session: AsyncSession,
+        ids: Sequence[uuid.UUID],
+        profile: LoaderProfile = LoaderProfile.DETAIL,
+    ) -> list[Optional[User]]:
+        '''Получить пользователей по списку ID вместе с пайплайнами'''
+        return await super().get_by_ids(session, ids, profile)
 
     async def get_by_email(
         self,
         session: AsyncSession,
-        email: str
+        email: str,
+        profile: LoaderProfile = LoaderProfile.DETAIL,
     ) -> Optional[User]:
-        '''Получить пользователя по email'''
+        '''Получить пользователя по email (без учета регистра, по индексу lower(email))'''
         result = await session.execute(
-            select(self.model)
-            .where(self.model.email == email)
-            .options(selectinload(self.model.pipelines))
+            self.email_query(email).options(*self.loader_options(profile))
         )
         return result.scalar_one_or_none()
 
+    def email_query(self, email: str) -> Select:
+        '''Запрос пользователя по email без учета регистра'''
+        return select(self.model).where(func.lower(self.model.email) == email.lower())
+
+    async def get_for_auth(
+        self,
+        session: AsyncSession,
+        user_id: uuid.UUID
+    ) -> Optional[User]:
+        '''Получить пользователя для проверки доступа (без загрузки пайплайнов)'''
+        return await super().get_by_id(session, user_id, LoaderProfile.BARE)
+
     async def get_current_user(
         self,
         session: AsyncSession,
@@ -53,7 +172,7 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         result = await session.execute(
             select(self.model)
             .where(self.model.id == user_id)
-            .options(selectinload(self.model.pipelines))
+            .options(*self.loader_options(LoaderProfile.DETAIL))
         )
         return result.scalar_one_or_none()
     
@@ -83,12 +202,75 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
             result = await session.execute(
                 select(self.model)
                 .where(self.model.id == db_user.id)
-                .options(selectinload(self.model.pipelines))
+                .options(*self.loader_options(LoaderProfile.DETAIL))
             )
             db_user = result.scalar_one()
         
         return db_user
 
+    async def get_existing_emails(
+        self,
+        session: AsyncSession,
+        emails: Sequence[str],
+    ) -> set[str]:
+        '''Получить email из списка, которые уже заняты (в нижнем регистре, одним запросом)'''
+        if not emails:
+            return set()
+        return set(
+            (await session.execute(self.existing_emails_query(emails))).scalars()
+        )
+
+    def existing_emails_query(self, emails: Sequence[str]) -> Select:
+        '''Запрос занятых email из списка (в нижнем регистре)'''
+        email = func.lower(self.model.email)
+        return select(email).where(
+            email == any_(
+                bindparam(
+                    'emails',
+                    [value.lower() for value in emails],
+                    type_=ARRAY(String()),
+                )
+            )
+        )
+
+    async def bulk_insert(
+        self,
+        session: AsyncSession,
+        rows: list[dict],
+    ) -> set[str]:
+        '''
+        Вставить пачку пользователей одним многострочным INSERT
+
+        rows - значения колонок с уже вычисленным password_hash. Строки
+        с email, занятым к моменту вставки (в любом регистре, например
+        параллельным импортом), пропускаются. Пачка фиксируется отдельной транзакцией
+        вместе с outbox-событиями о созданных пользователях
+
+        Returns:
+            email созданных пользователей
+        '''
+        created = (
+            await session.execute(
+                insert(self.model)
+                .values([{'id': uuid.uuid4(), **row} for row in rows])
+                .on_conflict_do_nothing()
+                .returning(self.model.id, self.model.email)
+            )
+        ).all()
+
+        def write_events(sync_session) -> None:
+            '''Outbox-события для пользователей, созданных в обход ORM'''
+            enqueue_outbox_events(
+                sync_session.connection(),
+                OUTBOX_AGGREGATES[self.model.__tablename__],
+                [row.id for row in created],
+                OutboxEventType.CREATED,
+            )
+
+        await session.run_sync(write_events)
+        await session.commit()
+        return {row.email for row in created}
+
     @override
     async def update(
         self,
@@ -97,10 +279,10 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         update_schema: UserUpdate,
         commit: bool = True,
     ) -> User:
-        '''Обновить пользователя с обработкой пароля'''
+        '''Обновить пользователя с обработкой пароля и пайплайнов (режим pipelines_mode)'''
 
         update_data = update_schema.model_dump(
-            exclude_unset=True, exclude={'password', 'pipelines'}
+            exclude_unset=True, exclude={'password', 'pipelines', 'pipelines_mode'}
         )
         
         if update_schema.password is not None:
@@ -110,44 +292,18 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
             setattr(db_user, field, value)
 
         if update_schema.pipelines is not None:
-            pipeline_ids = []
-            for pipeline_data in update_schema.pipelines:
-                pipeline_id = pipeline_data.get('id')
-                if pipeline_id:
-                    try:
-                        pipeline_ids.append(uuid.UUID(str(pipeline_id)))
-                    except (ValueError, TypeError):
-                        raise HTTPException(
-                            status_code=status.HTTP_400_BAD_REQUEST,
-                            detail=f'Некорректный pipeline_id = {pipeline_id}'
-                        )
-            
-            if pipeline_ids:
-                result = await session.execute(
-                    select(Pipeline)
-                    .where(Pipeline.id.in_(pipeline_ids))
-                    .options(selectinload(Pipeline.owners))
-                )
-                pipelines = list(result.scalars().all())
-                
-                for pipeline in pipelines:
-                    current_owner_ids = {owner.id for owner in pipeline.owners}
-                    if db_user.id not in current_owner_ids:
-                        pipeline.owners.append(db_user)
-                        session.add(pipeline)
+            await update_ownership(
+                session,
+                pipeline_owners.c.user_id,
+                db_user.id,
+                parse_ownership_ids(update_schema.pipelines, 'pipeline_id'),
+                update_schema.pipelines_mode,
+            )
 
+        session.add(db_user)
         if commit:
-            print('commit')
-            await session.flush()
             await session.commit()
-            
-            result = await session.execute(
-                select(self.model)
-                .where(self.model.id == db_user.id)
-                .options(selectinload(self.model.pipelines))
-            )
-            db_user = result.scalar_one()
-            print([p.id for p in db_user.pipelines])
+            await session.refresh(db_user, ['pipelines'])
         
         return db_user
 
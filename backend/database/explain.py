@@ -0,0 +1,41 @@
+'''
+Конструкция EXPLAIN для запросов SQLAlchemy
+'''
+import json
+
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+
+class Explain(Executable, ClauseElement):
+    '''EXPLAIN (FORMAT JSON) запроса с сохранением bind-параметров'''
+
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain, 'postgresql')
+def compile_explain(element: Explain, compiler, **kw) -> str:
+    '''Компиляция EXPLAIN для PostgreSQL'''
+    return 'EXPLAIN (FORMAT JSON) ' + compiler.process(element.statement, **kw)
+
+
+async def get_plan(session: AsyncSession, query: Select) -> dict:
+    '''Получить план запроса (EXPLAIN FORMAT JSON) без выполнения'''
+    plan = (await session.execute(Explain(query))).scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]['Plan']
+
+
+def plan_uses_index(plan: dict, index_name: str) -> bool:
+    '''Используется ли индекс где-либо в плане запроса'''
+    if plan.get('Index Name') == index_name:
+        return True
+    return any(
+        plan_uses_index(subplan, index_name) for subplan in plan.get('Plans', ())
+    )
@@ -10,6 +10,18 @@ from core.initial_data import create_first_superuser
 from database.base import Base, async_engine
 # Импорт всех моделей для создания таблиц
 from models import Pipeline, PipelineRun, PipelineVersion, User  # noqa: F401
+from services.outbox_dispatcher import outbox_dispatcher
+from services.callback_buffer import run_callback_buffer
+from services.executors import executor_registry
+from services.invalidation import invalidation_listener
+from services.run_dispatcher import run_dispatcher
+from services.run_logs import run_log_store
+from services.owner_index import pipeline_owner_index
+from services.query_stats import QueryStatsMiddleware
+from services.scheduler import run_scheduler
+from services.tag_suggest import tag_suggest_index
+from services.token_revocation import token_revocation_list
+from services.user_import import password_hasher
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -27,6 +39,9 @@ app.add_middleware(
     allow_headers=['*'],
 )
 
+# Число SQL запросов и время БД в заголовке Server-Timing
+app.add_middleware(QueryStatsMiddleware)
+
 # Подключение роутеров
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -41,10 +56,41 @@ async def startup_event():
     # Создание первого суперпользователя
     await create_first_superuser()
 
+    # Загрузка индексов в памяти: подсказки тегов и владельцы пайплайнов
+    await tag_suggest_index.load()
+    await pipeline_owner_index.load()
+
+    # Слушатели отзыва токенов (фильтр Блума отозванных jti)
+    # и изменений индексов в памяти из других процессов
+    token_revocation_list.start()
+    invalidation_listener.start()
+
+    # Запуск фоновой обработки outbox-событий
+    if settings.OUTBOX_DISPATCHER_ENABLED:
+        outbox_dispatcher.start()
+
+    # Запуск диспетчера запусков пайплайнов
+    if settings.RUN_DISPATCHER_ENABLED:
+        executor_registry.configure()
+        run_dispatcher.start()
+
+    # Запуск планировщика (планирует только узел, ставший лидером)
+    if settings.SCHEDULER_ENABLED:
+        run_scheduler.start()
+
 
 @app.on_event('shutdown')
 async def shutdown_event():
     '''Закрытие соединений при остановке приложения'''
+    await token_revocation_list.stop()
+    await invalidation_listener.stop()
+    await run_scheduler.stop()
+    await run_dispatcher.stop()
+    await run_callback_buffer.close()
+    await run_log_store.close()
+    await executor_registry.close()
+    await outbox_dispatcher.stop()
+    password_hasher.close()
     await async_engine.dispose()
 
 
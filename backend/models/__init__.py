@@ -3,10 +3,18 @@ Models модуль - SQLAlchemy модели базы данных
 '''
 from database.base import Base  # noqa
 from models.base import BaseModel  # noqa
+from models.change import Change  # noqa
+from models.login_attempt import LoginAttemptCounter  # noqa
+from models.outbox import OutboxEvent  # noqa
 from models.pipeline import Pipeline  # noqa
 from models.pipeline_run import PipelineRun  # noqa
+from models.pipeline_schedule import PipelineSchedule  # noqa
 from models.pipeline_version import PipelineVersion  # noqa
 from models.run_artifact import RunArtifact  # noqa
+from models.run_concurrency import RunConcurrencyCounter  # noqa
+from models.revoked_token import RevokedToken  # noqa
+from models.run_param_value import RunParamValue  # noqa
+from models.tag import Tag, TagFacetCounter, TagLink  # noqa
 from models.user import User  # noqa
 
 __all__ = [
@@ -17,4 +25,14 @@ __all__ = [
     'PipelineVersion',
     'PipelineRun',
     'RunArtifact',
+    'Change',
+    'OutboxEvent',
+    'RunConcurrencyCounter',
+    'PipelineSchedule',
+    'RunParamValue',
+    'Tag',
+    'TagLink',
+    'TagFacetCounter',
+    'RevokedToken',
+    'LoginAttemptCounter',
 ]
\ No newline at end of file
@@ -6,9 +6,16 @@ from sqlalchemy.ext.declarative import declared_attr
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.sql import func
 
+from core.config import settings
 from database.annotations import not_null_datetime
 from database.base import Base
 
+# Связи не подгружаются неявно: обращение к незагруженной связи, которое
+# потребовало бы запрос, падает. Что загружать, задает профиль загрузки
+# в CRUD (crud/loaders.py). В строгом режиме падает любое неявное
+# обращение, даже если связанный объект уже есть в identity map
+RELATIONSHIP_LAZY = 'raise' if settings.ORM_STRICT_LOADING else 'raise_on_sql'
+
 
 class BaseModel(Base):
     '''Базовый класс для всех моделей'''
@@ -0,0 +1,114 @@
+'''
+Модель ленты изменений
+'''
+import uuid
+from typing import Iterable, Optional
+
+from sqlalchemy import BigInteger
+from sqlalchemy import Enum as SQLEnum
+from sqlalchemy import Index, event, insert, text
+from sqlalchemy.orm import Mapped, Session, mapped_column
+
+from database.annotations import GUID
+from models.base import BaseModel
+from models.enums.change import ChangeEntityType, ChangeOperation
+
+# Таблицы, изменения которых попадают в ленту
+TRACKED_TABLES = {
+    'pipelines': ChangeEntityType.PIPELINE,
+    'pipelineversions': ChangeEntityType.PIPELINE_VERSION,
+    'pipelineruns': ChangeEntityType.PIPELINE_RUN,
+}
+
+
+class Change(BaseModel):
+    '''
+    Модель записи ленты изменений
+
+    Курсором служит пара (xact_id, id): xact_id - номер транзакции,
+    записавшей изменение. Лента отдает только записи транзакций старше
+    xmin текущего снимка, поэтому незавершенная транзакция не может
+    позже появиться "позади" уже выданного курсора. pipeline_id -
+    пайплайн сущности на момент изменения: по нему лента фильтруется
+    для пользователя, в том числе для уже удаленных версий и запусков
+    '''
+
+    __table_args__ = (
+        Index('ix_changes_xact_id_id', 'xact_id', 'id'),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    xact_id: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+        server_default=text('pg_current_xact_id()::text::bigint'),
+    )
+    entity_type: Mapped[ChangeEntityType] = mapped_column(
+        SQLEnum(ChangeEntityType), nullable=False
+    )
+    entity_id: Mapped[uuid.UUID] = mapped_column(GUID(), nullable=False)
+    operation: Mapped[ChangeOperation] = mapped_column(
+        SQLEnum(ChangeOperation), nullable=False
+    )
+    pipeline_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        GUID(), nullable=True
+    )
+
+
+def change_pipeline_id(db_object) -> Optional[uuid.UUID]:
+    '''Пайплайн отслеживаемой сущности (для самого пайплайна - его ID)'''
+    if db_object.__tablename__ == 'pipelines':
+        return db_object.id
+    return db_object.pipeline_id
+
+
+def record_changes(
+    connection,
+    entity_type: ChangeEntityType,
+    entities: Iterable[tuple[uuid.UUID, uuid.UUID]],
+    operation: ChangeOperation,
+) -> None:
+    '''
+    Записать в ленту изменения, сделанные в обход ORM
+
+    entities - пары (ID сущности, ID ее пайплайна)
+    '''
+    changes = [
+        {
+            'entity_type': entity_type,
+            'entity_id': entity_id,
+            'operation': operation,
+            'pipeline_id': pipeline_id,
+        }
+        for entity_id, pipeline_id in entities
+    ]
+    if changes:
+        connection.execute(insert(Change.__table__), changes)
+
+
+@event.listens_for(Session, 'after_flush')
+def track_changes(session: Session, flush_context) -> None:
+    '''Записать изменения отслеживаемых моделей в ленту в той же транзакции'''
+    changes = []
+    for operation, objects in (
+        (ChangeOperation.INSERT, session.new),
+        (ChangeOperation.UPDATE, session.dirty),
+        (ChangeOperation.DELETE, session.deleted),
+    ):
+        for db_object in objects:
+            entity_type = TRACKED_TABLES.get(getattr(db_object, '__tablename__', None))
+            if entity_type is None:
+                continue
+            if (
+                operation is ChangeOperation.UPDATE
+                and not session.is_modified(db_object, include_collections=False)
+            ):
+                continue
+            changes.append({
+                'entity_type': entity_type,
+                'entity_id': db_object.id,
+                'operation': operation,
+                'pipeline_id': change_pipeline_id(db_object),
+            })
+    if changes:
+        session.connection().execute(insert(Change.__table__), changes)
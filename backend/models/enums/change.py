@@ -0,0 +1,17 @@
+from enum import StrEnum
+
+
+class ChangeEntityType(StrEnum):
+    '''Типы сущностей в ленте изменений'''
+
+    PIPELINE = 'pipeline'
+    PIPELINE_VERSION = 'pipeline_version'
+    PIPELINE_RUN = 'pipeline_run'
+
+
+class ChangeOperation(StrEnum):
+    '''Типы операций в ленте изменений'''
+
+    INSERT = 'insert'
+    UPDATE = 'update'
+    DELETE = 'delete'
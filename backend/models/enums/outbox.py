@@ -0,0 +1,9 @@
+from enum import StrEnum
+
+
+class OutboxEventType(StrEnum):
+    '''Типы outbox-событий'''
+
+    CREATED = 'created'
+    UPDATED = 'updated'
+    DELETED = 'deleted'
@@ -0,0 +1,9 @@
+from enum import StrEnum
+
+
+class OwnershipUpdateMode(StrEnum):
+    '''Режим изменения владельцев пайплайнов'''
+
+    ADD = 'add'
+    REMOVE = 'remove'
+    REPLACE = 'replace'
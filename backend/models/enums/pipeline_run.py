@@ -0,0 +1,27 @@
+from enum import StrEnum
+
+
+class RunPriority(StrEnum):
+    '''Приоритеты (полосы) запусков, от самого срочного'''
+
+    HIGH = 'high'
+    NORMAL = 'normal'
+    LOW = 'low'
+
+
+class RunFailureReason(StrEnum):
+    '''Причины неуспешного завершения запуска'''
+
+    EXECUTOR_UNAVAILABLE = 'executor_unavailable'
+    EXECUTOR_ERROR = 'executor_error'
+    TIMEOUT = 'timeout'
+    PIPELINE_ERROR = 'pipeline_error'
+    CANCELLED = 'cancelled'
+
+
+# Временные сбои, которые по умолчанию повторяются автоматически
+TRANSIENT_FAILURE_REASONS = (
+    RunFailureReason.EXECUTOR_UNAVAILABLE,
+    RunFailureReason.EXECUTOR_ERROR,
+    RunFailureReason.TIMEOUT,
+)
@@ -0,0 +1,8 @@
+from enum import StrEnum
+
+
+class ConcurrencyScope(StrEnum):
+    '''Области действия лимитов параллельности запусков'''
+
+    PIPELINE = 'pipeline'
+    EXECUTOR = 'executor'
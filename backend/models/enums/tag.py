@@ -10,4 +10,19 @@ class TagType(StrEnum):
     PIPELINE = 'pipeline'
     PIPELINE_VERSION = 'pipeline_version'
     PIPELINE_RUN = 'pipeline_run'
-    PIPELINE_RUN_ARTIFACT = 'pipeline_run_artifact'
\ No newline at end of file
+    PIPELINE_RUN_ARTIFACT = 'pipeline_run_artifact'
+
+
+class TagEntityType(StrEnum):
+    '''Типы сущностей, к которым привязываются теги'''
+
+    PIPELINE = 'pipeline'
+    PIPELINE_VERSION = 'pipeline_version'
+    PIPELINE_RUN = 'pipeline_run'
+
+
+class TagFilterMode(StrEnum):
+    '''Режим фильтра по тегам: все теги сразу или любой из них'''
+
+    ALL = 'all'
+    ANY = 'any'
@@ -0,0 +1,14 @@
+from enum import StrEnum
+
+
+class UserImportFormat(StrEnum):
+    '''Формат файла импорта пользователей'''
+
+    CSV = 'csv'
+    JSON = 'json'
+
+
+class UserExpand(StrEnum):
+    '''Связанные данные, добавляемые в список пользователей по запросу'''
+
+    PIPELINES = 'pipelines'
@@ -0,0 +1,25 @@
+'''
+Модель счетчиков попыток входа
+'''
+from sqlalchemy import BigInteger, Integer, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from models.base import BaseModel
+
+
+class LoginAttemptCounter(BaseModel):
+    '''
+    Число попыток входа по ключу (email или IP) в окне ограничения
+
+    Используется только общим (postgres) backend ограничения попыток
+    входа. window - номер окна: unix-время, деленное на длину окна
+    '''
+
+    __tablename__ = 'login_attempt_counters'
+    __table_args__ = (
+        UniqueConstraint('key', 'window', name='uix_login_attempt_counter'),
+    )
+
+    key: Mapped[str] = mapped_column(String(320), nullable=False)
+    window: Mapped[int] = mapped_column(BigInteger, nullable=False, index=True)
+    count: Mapped[int] = mapped_column(Integer, nullable=False, server_default='0')
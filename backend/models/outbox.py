@@ -0,0 +1,138 @@
+'''
+Модель outbox-событий
+'''
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import BigInteger, DateTime, Index, Integer, String, event
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy import insert, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, Session, mapped_column
+from sqlalchemy.sql import func
+
+from database.annotations import GUID, null_text
+from models.base import BaseModel
+from models.enums.outbox import OutboxEventType
+
+# Таблицы, изменения которых порождают outbox-события (таблица -> агрегат)
+OUTBOX_AGGREGATES = {
+    'pipelines': 'pipeline',
+    'pipelineversions': 'pipeline_version',
+    'pipelineruns': 'pipeline_run',
+    'users': 'user',
+}
+
+PENDING_CONDITION = 'processed_at IS NULL AND failed_at IS NULL'
+
+
+class OutboxEvent(BaseModel):
+    '''
+    Модель outbox-события
+
+    Событие пишется в той же транзакции, что и изменение сущности,
+    и позже обрабатывается фоновым диспетчером
+    (services.outbox_dispatcher)
+    '''
+
+    __tablename__ = 'outbox_events'
+    __table_args__ = (
+        Index(
+            'ix_outbox_events_pending',
+            'available_at',
+            'id',
+            postgresql_where=text(PENDING_CONDITION),
+        ),
+        Index(
+            'ix_outbox_events_aggregate_pending',
+            'aggregate_type',
+            'aggregate_id',
+            'id',
+            postgresql_where=text(PENDING_CONDITION),
+        ),
+        # Очистка по сроку хранения (services.outbox_dispatcher)
+        Index(
+            'ix_outbox_events_processed_at',
+            'processed_at',
+            postgresql_where=text('processed_at IS NOT NULL'),
+        ),
+        Index(
+            'ix_outbox_events_failed_at',
+            'failed_at',
+            postgresql_where=text('failed_at IS NOT NULL'),
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    aggregate_type: Mapped[str] = mapped_column(String(50), nullable=False)
+    aggregate_id: Mapped[uuid.UUID] = mapped_column(GUID(), nullable=False)
+    event_type: Mapped[str] = mapped_column(String(50), nullable=False)
+    payload: Mapped[Optional[dict]] = mapped_column(JSONB, nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, server_default='0')
+    available_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    processed_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    failed_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    last_error: Mapped[null_text]
+
+
+def enqueue_outbox_events(
+    connection,
+    aggregate_type: str,
+    aggregate_ids,
+    event_type: OutboxEventType,
+    payload: Optional[dict] = None,
+) -> None:
+    '''Записать outbox-события для изменений, сделанных в обход ORM'''
+    events = [
+        {
+            'aggregate_type': aggregate_type,
+            'aggregate_id': aggregate_id,
+            'event_type': event_type,
+            'payload': payload,
+        }
+        for aggregate_id in aggregate_ids
+    ]
+    if events:
+        connection.execute(insert(OutboxEvent.__table__), events)
+
+
+@event.listens_for(Session, 'after_flush')
+def write_outbox_events(session: Session, flush_context) -> None:
+    '''Записать outbox-события для изменений агрегатов в той же транзакции'''
+    events = []
+    for event_type, objects in (
+        (OutboxEventType.CREATED, session.new),
+        (OutboxEventType.UPDATED, session.dirty),
+        (OutboxEventType.DELETED, session.deleted),
+    ):
+        for db_object in objects:
+            aggregate_type = OUTBOX_AGGREGATES.get(
+                getattr(db_object, '__tablename__', None)
+            )
+            if aggregate_type is None:
+                continue
+            payload = None
+            if event_type is OutboxEventType.UPDATED:
+                fields = [
+                    attr.key
+                    for attr in sa_inspect(db_object).attrs
+                    if attr.history.has_changes()
+                ]
+                if not fields:
+                    continue
+                payload = {'fields': fields}
+            events.append({
+                'aggregate_type': aggregate_type,
+                'aggregate_id': db_object.id,
+                'event_type': event_type,
+                'payload': payload,
+            })
+    if events:
+        session.connection().execute(insert(OutboxEvent.__table__), events)
@@ -4,13 +4,15 @@
 import uuid
 from typing import TYPE_CHECKING, List, Optional
 
-from sqlalchemy import Boolean, Column, ForeignKey, String, Table, Text
+from sqlalchemy import (Boolean, Column, Float, ForeignKey, Index, Integer,
+                        String, Table, Text)
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.types import CHAR, TypeDecorator
 
 from database.annotations import GUID, null_text
 from database.base import Base
-from models.base import BaseModel
+from models.base import RELATIONSHIP_LAZY, BaseModel
 
 if TYPE_CHECKING:
     from models.pipeline_run import PipelineRun
@@ -23,6 +25,9 @@ pipeline_owners = Table(
     Base.metadata,
     Column('pipeline_id', GUID(), ForeignKey('pipelines.id', ondelete='CASCADE'), primary_key=True),
     Column('user_id', GUID(), ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+    # Первичный ключ начинается с pipeline_id, поэтому выборки и подсчет
+    # пайплайнов пользователя идут по отдельному индексу
+    Index('ix_pipeline_owners_user_id', 'user_id'),
 )
 
 class Pipeline(BaseModel):
@@ -40,20 +45,43 @@ class Pipeline(BaseModel):
     executor_type: Mapped[str] = mapped_column(String(50), nullable=False, index=True)
     external_id: Mapped[Optional[str]] = mapped_column(String(255), nullable=True, index=True)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
+    # Максимум одновременно выполняющихся запусков (None - без ограничения)
+    max_concurrent_runs: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    # Политика повторов: всего попыток (1 - без повторов), задержка перед
+    # повтором растет экспоненциально от base до max, jitter - доля случайного
+    # разброса задержки, retry_on - повторяемые причины (None - временные сбои)
+    retry_max_attempts: Mapped[int] = mapped_column(
+        Integer, default=1, server_default='1', nullable=False
+    )
+    retry_backoff_seconds: Mapped[float] = mapped_column(
+        Float, default=30.0, server_default='30', nullable=False
+    )
+    retry_max_backoff_seconds: Mapped[float] = mapped_column(
+        Float, default=3600.0, server_default='3600', nullable=False
+    )
+    retry_jitter: Mapped[float] = mapped_column(
+        Float, default=0.5, server_default='0.5', nullable=False
+    )
+    retry_on: Mapped[Optional[list[str]]] = mapped_column(
+        ARRAY(String(50)), nullable=True
+    )
     
     # Relationships
     versions: Mapped[List['PipelineVersion']] = relationship(
         'PipelineVersion',
         back_populates='pipeline',
-        cascade='all, delete-orphan'
+        cascade='all, delete-orphan',
+        lazy=RELATIONSHIP_LAZY,
     )
     runs: Mapped[List['PipelineRun']] = relationship(
         'PipelineRun',
         back_populates='pipeline',
-        cascade='all, delete-orphan'
+        cascade='all, delete-orphan',
+        lazy=RELATIONSHIP_LAZY,
     )
     owners: Mapped[List['User']] = relationship(
         'User',
         secondary=pipeline_owners,
-        back_populates='pipelines'
+        back_populates='pipelines',
+        lazy=RELATIONSHIP_LAZY,
     )
@@ -8,16 +8,19 @@ from typing import TYPE_CHECKING, Optional
 
 from sqlalchemy import DateTime
 from sqlalchemy import Enum as SQLEnum
-from sqlalchemy import ForeignKey, String
+from sqlalchemy import ForeignKey, Index, Integer, String, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.sql import func
 
 from database.annotations import GUID
-from models.base import BaseModel
+from models.base import RELATIONSHIP_LAZY, BaseModel
+from models.enums.pipeline_run import RunPriority
 
 if TYPE_CHECKING:
     from models.pipeline import Pipeline
     from models.pipeline_version import PipelineVersion
     from models.run_artifact import RunArtifact
+    from models.run_param_value import RunParamValue
     from models.user import User
 
 
@@ -29,8 +32,58 @@ class PipelineRunStatus(PyEnum):
     FAILED = 'failed'
 
 
+# Допустимые переходы между статусами запуска
+PIPELINE_RUN_TRANSITIONS = {
+    PipelineRunStatus.PENDING: {PipelineRunStatus.RUNNING, PipelineRunStatus.FAILED},
+    PipelineRunStatus.RUNNING: {PipelineRunStatus.SUCCESS, PipelineRunStatus.FAILED},
+    PipelineRunStatus.SUCCESS: set(),
+    PipelineRunStatus.FAILED: set(),
+}
+
+def _reachable_statuses(status: PipelineRunStatus) -> frozenset:
+    '''Статусы, достижимые из status цепочкой допустимых переходов'''
+    reachable = set()
+    pending = [status]
+    while pending:
+        for next_status in PIPELINE_RUN_TRANSITIONS[pending.pop()]:
+            if next_status not in reachable:
+                reachable.add(next_status)
+                pending.append(next_status)
+    return frozenset(reachable)
+
+
+# Статусы, достижимые цепочкой переходов (для схлопнутых обновлений)
+PIPELINE_RUN_REACHABLE = {
+    status: _reachable_statuses(status) for status in PIPELINE_RUN_TRANSITIONS
+}
+
+# Статусы завершенного запуска
+FINISHED_PIPELINE_RUN_STATUSES = frozenset({
+    PipelineRunStatus.SUCCESS,
+    PipelineRunStatus.FAILED,
+})
+
+
 class PipelineRun(BaseModel):
     '''Модель запусков пайплайна'''
+
+    __table_args__ = (
+        # Индекс выборки диспетчера: голова полосы приоритета пайплайна
+        # в порядке готовности (LATERAL ... ORDER BY available_at LIMIT k)
+        Index(
+            'ix_pipelineruns_pending',
+            'pipeline_id',
+            'priority',
+            'available_at',
+            postgresql_where=text("status = 'PENDING'"),
+        ),
+        # Отложенные повторы не видны диспетчеру, пока не наступит available_at
+        Index(
+            'ix_pipelineruns_pending_available_at',
+            'available_at',
+            postgresql_where=text("status = 'PENDING'"),
+        ),
+    )
     
     id: Mapped[uuid.UUID] = mapped_column(
         GUID(),
@@ -62,12 +115,56 @@ class PipelineRun(BaseModel):
         nullable=False,
         index=True
     )
+    priority: Mapped[RunPriority] = mapped_column(
+        SQLEnum(RunPriority),
+        default=RunPriority.NORMAL,
+        server_default=RunPriority.NORMAL.name,
+        nullable=False,
+    )
     executor_run_id: Mapped[Optional[str]] = mapped_column(String(255), nullable=True, index=True)
     started_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
     finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Момент, начиная с которого запуск может быть допущен к исполнению
+    available_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    # Номер попытки и запуск, повтором которого является данный
+    attempt: Mapped[int] = mapped_column(
+        Integer, default=1, server_default='1', nullable=False
+    )
+    parent_run_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        GUID(),
+        ForeignKey('pipelineruns.id', ondelete='SET NULL'),
+        nullable=True,
+        index=True
+    )
+    failure_reason: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
     
     # Relationships
-    pipeline: Mapped['Pipeline'] = relationship('Pipeline', back_populates='runs')
-    pipeline_version: Mapped['PipelineVersion'] = relationship('PipelineVersion', back_populates='runs')
-    user: Mapped[Optional['User']] = relationship('User', back_populates='pipeline_runs')
-    artifacts: Mapped[list['RunArtifact']] = relationship('RunArtifact', back_populates='pipeline_run')
+    pipeline: Mapped['Pipeline'] = relationship(
+        'Pipeline',
+        back_populates='runs',
+        lazy=RELATIONSHIP_LAZY,
+    )
+    pipeline_version: Mapped['PipelineVersion'] = relationship(
+        'PipelineVersion',
+        back_populates='runs',
+        lazy=RELATIONSHIP_LAZY,
+    )
+    user: Mapped[Optional['User']] = relationship(
+        'User',
+        back_populates='pipeline_runs',
+        lazy=RELATIONSHIP_LAZY,
+    )
+    artifacts: Mapped[list['RunArtifact']] = relationship(
+        'RunArtifact',
+        back_populates='pipeline_run',
+        lazy=RELATIONSHIP_LAZY,
+    )
+    param_values: Mapped[list['RunParamValue']] = relationship(
+        'RunParamValue',
+        back_populates='pipeline_run',
+        cascade='all, delete-orphan',
+        passive_deletes=True,
+        lazy=RELATIONSHIP_LAZY,
+    )
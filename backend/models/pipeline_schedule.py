@@ -0,0 +1,61 @@
+'''
+Модель расписания запусков пайплайна
+'''
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Boolean, DateTime
+from sqlalchemy import Enum as SQLEnum
+from sqlalchemy import ForeignKey, Index, String, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from database.annotations import GUID
+from models.base import BaseModel
+from models.enums.pipeline_run import RunPriority
+
+
+class PipelineSchedule(BaseModel):
+    '''Модель расписания запусков пайплайна (cron-выражение в UTC)'''
+
+    __table_args__ = (
+        Index(
+            'ix_pipelineschedules_active_next_run_at',
+            'next_run_at',
+            postgresql_where=text('is_active = true'),
+        ),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        GUID(),
+        primary_key=True,
+        default=uuid.uuid4,
+        index=True
+    )
+    pipeline_id: Mapped[uuid.UUID] = mapped_column(
+        GUID(),
+        ForeignKey('pipelines.id', ondelete='CASCADE'),
+        nullable=False,
+        index=True
+    )
+    # Если версия не указана, запускается активная версия пайплайна
+    pipeline_version_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        GUID(),
+        ForeignKey('pipelineversions.id', ondelete='CASCADE'),
+        nullable=True,
+    )
+    cron: Mapped[str] = mapped_column(String(100), nullable=False)
+    is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
+    # Запускать ли все пропущенные срабатывания после простоя (иначе одно)
+    catchup: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    # Приоритет создаваемых запусков (массовые ночные прогоны - LOW)
+    priority: Mapped[RunPriority] = mapped_column(
+        SQLEnum(RunPriority),
+        default=RunPriority.NORMAL,
+        server_default=RunPriority.NORMAL.name,
+        nullable=False,
+    )
+    next_run_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    last_run_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
@@ -9,7 +9,7 @@ from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from database.annotations import GUID, null_text
-from models.base import BaseModel
+from models.base import RELATIONSHIP_LAZY, BaseModel
 
 if TYPE_CHECKING:
     from models.pipeline import Pipeline
@@ -26,6 +26,13 @@ class PipelineVersion(BaseModel):
             unique=True,
             postgresql_where=text("is_active = true")
         ),
+        # Поиск по содержимому schema (@> и @?)
+        Index(
+            'ix_pipelineversions_schema_path_ops',
+            'schema',
+            postgresql_using='gin',
+            postgresql_ops={'schema': 'jsonb_path_ops'},
+        ),
     )
     
     id: Mapped[uuid.UUID] = mapped_column(
@@ -46,9 +53,14 @@ class PipelineVersion(BaseModel):
     is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
     
     # Relationships
-    pipeline: Mapped['Pipeline'] = relationship('Pipeline', back_populates='versions')
+    pipeline: Mapped['Pipeline'] = relationship(
+        'Pipeline',
+        back_populates='versions',
+        lazy=RELATIONSHIP_LAZY,
+    )
     runs: Mapped[list['PipelineRun']] = relationship(
         'PipelineRun',
         back_populates='pipeline_version',
-        cascade='all, delete-orphan'
+        cascade='all, delete-orphan',
+        lazy=RELATIONSHIP_LAZY,
     )
\ No newline at end of file
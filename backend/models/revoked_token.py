@@ -0,0 +1,33 @@
+'''
+Модель отозванных JWT токенов
+'''
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, ForeignKey, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from database.annotations import GUID
+from models.base import BaseModel
+
+
+class RevokedToken(BaseModel):
+    '''
+    Отозванный токен (по claim jti)
+
+    Запись нужна только до истечения срока действия токена (expires_at),
+    после чего она удаляется фоновой очисткой
+    '''
+
+    __tablename__ = 'revoked_tokens'
+
+    jti: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)
+    user_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        GUID(),
+        ForeignKey('users.id', ondelete='CASCADE'),
+        nullable=True,
+    )
+    expires_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, index=True
+    )
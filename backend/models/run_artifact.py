@@ -3,12 +3,12 @@ from enum import StrEnum
 from typing import TYPE_CHECKING, Optional
 
 from sqlalchemy import Enum as SQLEnum
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from database.annotations import GUID, not_null_unique_str
-from models.base import BaseModel
+from models.base import RELATIONSHIP_LAZY, BaseModel
 
 if TYPE_CHECKING:
     from models.pipeline_run import PipelineRun
@@ -25,6 +25,16 @@ class TypeEnum(StrEnum):
 class RunArtifact(BaseModel):
     '''Модель артефакта запуска'''
 
+    __table_args__ = (
+        # Поиск по содержимому schema (@> и @?)
+        Index(
+            'ix_runartifacts_schema_path_ops',
+            'schema',
+            postgresql_using='gin',
+            postgresql_ops={'schema': 'jsonb_path_ops'},
+        ),
+    )
+
     pipeline_run_id: Mapped[uuid.UUID] = mapped_column(
         GUID(),
         ForeignKey('pipelineruns.id', ondelete='CASCADE'),
@@ -40,4 +50,5 @@ class RunArtifact(BaseModel):
     pipeline_run: Mapped['PipelineRun'] = relationship(
         'PipelineRun',
         back_populates='artifacts',
+        lazy=RELATIONSHIP_LAZY,
     )
@@ -0,0 +1,26 @@
+'''
+Модель счетчиков параллельности запусков
+'''
+from sqlalchemy import Integer, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from models.base import BaseModel
+
+
+class RunConcurrencyCounter(BaseModel):
+    '''
+    Счетчик выполняющихся запусков в области (пайплайн или тип исполнителя)
+
+    Слот занимается условным UPDATE ... SET running = running + 1
+    WHERE running < limit, поэтому проверка лимита занимает O(1)
+    и атомарна при любом числе конкурирующих диспетчеров
+    '''
+
+    __tablename__ = 'run_concurrency_counters'
+    __table_args__ = (
+        UniqueConstraint('scope', 'key', name='uix_run_concurrency_counter'),
+    )
+
+    scope: Mapped[str] = mapped_column(String(20), nullable=False)
+    key: Mapped[str] = mapped_column(String(255), nullable=False)
+    running: Mapped[int] = mapped_column(Integer, nullable=False, server_default='0')
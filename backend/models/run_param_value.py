@@ -1,28 +1,49 @@
 import uuid
 from typing import TYPE_CHECKING
 
-from sqlalchemy import ForeignKey, Text
+from sqlalchemy import (ForeignKey, Index, String, Text, UniqueConstraint,
+                        text)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from database.annotations import GUID, not_null_unique_str
-from models.base import BaseModel
+from database.annotations import GUID
+from models.base import RELATIONSHIP_LAZY, BaseModel
 
 if TYPE_CHECKING:
     from models.pipeline_run import PipelineRun
 
+# Максимальная длина имени параметра (колонка name)
+RUN_PARAM_NAME_MAX_LENGTH = 255
+
 
 class RunParamValue(BaseModel):
     '''Модель значения параметра запуска'''
-    
+
+    __table_args__ = (
+        # Имя параметра уникально в пределах запуска
+        UniqueConstraint(
+            'pipeline_run_id', 'name', name='uix_runparamvalues_run_name'
+        ),
+        # Поиск запусков по "параметр = значение": значение может быть
+        # длинным, поэтому в индексе его хеш, а само значение сверяется
+        # на найденных строках
+        Index(
+            'ix_runparamvalues_name_value_md5',
+            'name',
+            text('md5(value)'),
+            'pipeline_run_id',
+        ),
+    )
+
     pipeline_run_id: Mapped[uuid.UUID] = mapped_column(
         GUID(),
         ForeignKey('pipelineruns.id', ondelete='CASCADE'),
         nullable=False,
     )
-    name: Mapped[not_null_unique_str]
+    name: Mapped[str] = mapped_column(String(RUN_PARAM_NAME_MAX_LENGTH), nullable=False)
     value: Mapped[str] = mapped_column(Text, nullable=False)
 
     pipeline_run: Mapped['PipelineRun'] = relationship(
         'PipelineRun',
         back_populates='param_values',
+        lazy=RELATIONSHIP_LAZY,
     )
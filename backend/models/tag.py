@@ -1,13 +1,23 @@
 import uuid
+from collections import Counter
 from typing import List
 
 from sqlalchemy import Enum as SQLEnum
-from sqlalchemy import ForeignKey, String, Text, UniqueConstraint
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import (ForeignKey, Index, Integer, String, Text,
+                        UniqueConstraint, delete, event, func)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Mapped, Session, mapped_column, relationship
 
 from database.annotations import GUID, not_null_unique_str, null_text
-from models.base import BaseModel
-from models.enums.tag import TagType
+from models.base import RELATIONSHIP_LAZY, BaseModel
+from models.enums.tag import TagEntityType, TagType
+
+# Таблицы сущностей, к которым привязываются теги
+TAGGED_TABLES = {
+    'pipelines': TagEntityType.PIPELINE,
+    'pipelineversions': TagEntityType.PIPELINE_VERSION,
+    'pipelineruns': TagEntityType.PIPELINE_RUN,
+}
 
 
 class Tag(BaseModel):
@@ -18,7 +28,11 @@ class Tag(BaseModel):
     description: Mapped[null_text]
 
     # Relationships
-    links: Mapped[List['TagLink']] = relationship('TagLink', back_populates='tag')
+    links: Mapped[List['TagLink']] = relationship(
+        'TagLink',
+        back_populates='tag',
+        lazy=RELATIONSHIP_LAZY,
+    )
 
 
 class TagLink(BaseModel):
@@ -27,11 +41,19 @@ class TagLink(BaseModel):
     __tablename__ = 'tag_links'
     __table_args__ = (
         UniqueConstraint(
-            'tag_id', 
-            'entity_type', 
-            'entity_id', 
+            'tag_id',
+            'entity_type',
+            'entity_id',
             name='uix_tag_link_unique'
         ),
+        # Полусоединение фильтра по тегам: по типу сущности и тегу
+        # индекс сразу отдает ID сущностей (index only scan)
+        Index(
+            'ix_tag_links_entity_type_tag_id_entity_id',
+            'entity_type',
+            'tag_id',
+            'entity_id',
+        ),
     )
 
     tag_id: Mapped[int] = mapped_column(
@@ -40,4 +62,87 @@ class TagLink(BaseModel):
     entity_type: Mapped[str] = mapped_column(String(255), nullable=False)
     entity_id: Mapped[uuid.UUID] = mapped_column(GUID(), nullable=False)
 
-    tag: Mapped['Tag'] = relationship('Tag', back_populates='links')
+    tag: Mapped['Tag'] = relationship(
+        'Tag',
+        back_populates='links',
+        lazy=RELATIONSHIP_LAZY,
+    )
+
+
+class TagFacetCounter(BaseModel):
+    '''
+    Счетчик связей тега с сущностями одного типа
+
+    Поддерживается инкрементально при каждом flush, поэтому фасеты
+    без дополнительных фильтров отдаются без подсчета по tag_links
+    '''
+
+    __tablename__ = 'tag_facet_counters'
+    __table_args__ = (
+        UniqueConstraint('entity_type', 'tag_id', name='uix_tag_facet_counter'),
+    )
+
+    tag_id: Mapped[int] = mapped_column(
+        ForeignKey('tags.id', ondelete='CASCADE'), nullable=False
+    )
+    entity_type: Mapped[str] = mapped_column(String(255), nullable=False)
+    count: Mapped[int] = mapped_column(Integer, nullable=False, server_default='0')
+
+
+def record_tag_counts(connection, deltas: Counter) -> None:
+    '''
+    Изменить счетчики фасетов на deltas: (тип сущности, ID тега) -> delta
+
+    Ключи обновляются в отсортированном порядке, чтобы конкурирующие
+    транзакции блокировали строки счетчиков в одном порядке
+    '''
+    rows = [
+        {'entity_type': entity_type, 'tag_id': tag_id, 'count': delta}
+        for (entity_type, tag_id), delta in sorted(deltas.items())
+        if delta
+    ]
+    if not rows:
+        return
+    query = insert(TagFacetCounter.__table__)
+    connection.execute(
+        query.on_conflict_do_update(
+            constraint='uix_tag_facet_counter',
+            set_={
+                'count': TagFacetCounter.__table__.c.count + query.excluded.count,
+                'updated_at': func.now(),
+            },
+        ),
+        rows,
+    )
+
+
+@event.listens_for(Session, 'after_flush')
+def track_tag_counts(session: Session, flush_context) -> None:
+    '''
+    Обновить счетчики фасетов по связям, созданным и удаленным в flush
+
+    При удалении сущности через ORM удаляются и ее связи с тегами
+    (у полиморфной связи нет внешнего ключа, который сделал бы это сам)
+    '''
+    deltas = Counter()
+    deleted_entities = {}
+    for db_object in session.new:
+        if isinstance(db_object, TagLink):
+            deltas[(db_object.entity_type, db_object.tag_id)] += 1
+    for db_object in session.deleted:
+        if isinstance(db_object, TagLink):
+            deltas[(db_object.entity_type, db_object.tag_id)] -= 1
+            continue
+        entity_type = TAGGED_TABLES.get(getattr(db_object, '__tablename__', None))
+        if entity_type is not None:
+            deleted_entities.setdefault(entity_type, []).append(db_object.id)
+    connection = session.connection()
+    for entity_type, entity_ids in deleted_entities.items():
+        for tag_id in connection.execute(
+            delete(TagLink.__table__)
+            .where(TagLink.entity_type == entity_type)
+            .where(TagLink.entity_id.in_(entity_ids))
+            .returning(TagLink.tag_id)
+        ).scalars():
+            deltas[(entity_type, tag_id)] -= 1
+    record_tag_counts(connection, deltas)
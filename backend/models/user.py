@@ -7,11 +7,11 @@ from typing import TYPE_CHECKING, List
 
 from sqlalchemy import Boolean
 from sqlalchemy import Enum as SQLEnum
-from sqlalchemy import String
+from sqlalchemy import Index, String, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from database.annotations import GUID
-from models.base import BaseModel
+from models.base import RELATIONSHIP_LAZY, BaseModel
 
 if TYPE_CHECKING:
     from models.pipeline import Pipeline
@@ -47,9 +47,22 @@ class User(BaseModel):
     pipelines: Mapped[List['Pipeline']] = relationship(
         'Pipeline',
         secondary='pipeline_owners',
-        back_populates='owners'
+        back_populates='owners',
+        lazy=RELATIONSHIP_LAZY,
     )
     pipeline_runs: Mapped[List['PipelineRun']] = relationship(
         'PipelineRun',
-        back_populates='user'
-    )
\ No newline at end of file
+        back_populates='user',
+        lazy=RELATIONSHIP_LAZY,
+    )
+
+
+# Email сравнивается без учета регистра: уникальность и поиск при логине -
+# по lower(email), поиск по подстроке - по триграммам (расширение pg_trgm)
+Index('uix_users_email_lower', func.lower(User.email), unique=True)
+Index(
+    'ix_users_email_lower_trgm',
+    func.lower(User.email).label('email_lower'),
+    postgresql_using='gin',
+    postgresql_ops={'email_lower': 'gin_trgm_ops'},
+)
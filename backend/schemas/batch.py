@@ -0,0 +1,31 @@
+'''
+Pydantic схемы для пакетного чтения по списку ID
+'''
+import uuid
+from typing import Any, Generic, Optional, Sequence, TypeVar
+
+from pydantic import BaseModel
+
+ReadSchemaType = TypeVar('ReadSchemaType')
+
+
+class BatchReadRequest(BaseModel):
+    '''Схема запроса пакетного чтения'''
+    ids: list[uuid.UUID]
+
+
+class BatchReadItem(BaseModel, Generic[ReadSchemaType]):
+    '''Элемент ответа пакетного чтения (found = False, если объект не найден)'''
+    id: uuid.UUID
+    found: bool
+    item: Optional[ReadSchemaType] = None
+
+
+def to_batch_items(
+    ids: Sequence[uuid.UUID], objects: Sequence[Optional[Any]]
+) -> list[dict]:
+    '''Сопоставить запрошенные ID с найденными объектами'''
+    return [
+        {'id': id, 'found': db_object is not None, 'item': db_object}
+        for id, db_object in zip(ids, objects)
+    ]
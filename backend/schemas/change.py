@@ -0,0 +1,25 @@
+'''
+Pydantic схемы для ленты изменений
+'''
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+from models.enums.change import ChangeEntityType, ChangeOperation
+
+
+class ChangeRead(BaseModel):
+    '''Схема записи ленты изменений'''
+    cursor: str
+    entity_type: ChangeEntityType
+    entity_id: uuid.UUID
+    operation: ChangeOperation
+    created_at: datetime
+
+
+class ChangeFeedRead(BaseModel):
+    '''Схема страницы ленты изменений'''
+    changes: list[ChangeRead]
+    next_cursor: Optional[str] = None
@@ -0,0 +1,46 @@
+'''
+Pydantic схемы для взаимодействия с исполнителями
+'''
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+from models.enums.pipeline_run import RunFailureReason, RunPriority
+from models.pipeline_run import PipelineRunStatus
+
+
+class ExecutorSubmission(BaseModel):
+    '''Запуск, передаваемый исполнителю'''
+    run_id: uuid.UUID
+    pipeline_id: uuid.UUID
+    pipeline_code: str
+    external_id: Optional[str] = None
+    pipeline_version_id: uuid.UUID
+    version: str
+    attempt: int = 1
+    priority: RunPriority = RunPriority.NORMAL
+
+
+class ExecutorSubmissionResult(BaseModel):
+    '''Ответ исполнителя на постановку запуска'''
+    id: str
+
+
+class ExecutorCallback(BaseModel):
+    '''Уведомление исполнителя о статусе запуска'''
+    executor_run_id: str
+    status: PipelineRunStatus
+    failure_reason: Optional[RunFailureReason] = None
+    occurred_at: Optional[datetime] = None
+
+
+class RunStatusUpdate(BaseModel):
+    '''Накопленное (схлопнутое) обновление статуса запуска исполнителя'''
+    executor_type: str
+    executor_run_id: str
+    status: PipelineRunStatus
+    failure_reason: Optional[RunFailureReason] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
@@ -5,8 +5,14 @@ import uuid
 from datetime import datetime
 from typing import Optional
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
+from models.enums.pipeline import OwnershipUpdateMode
+from models.enums.pipeline_run import RunFailureReason
+
+# Верхняя граница задержек повтора (сутки): задержка считается как
+# backoff * 2 ** (attempt - 1) и переводится в timedelta
+RETRY_BACKOFF_MAX_SECONDS = 24 * 3600
 
 class PipelineBase(BaseModel):
     '''Базовая схема для Pipeline'''
@@ -16,6 +22,14 @@ class PipelineBase(BaseModel):
     executor_type: str
     external_id: Optional[str] = None
     is_active: bool = True
+    max_concurrent_runs: Optional[int] = Field(None, ge=1)
+    retry_max_attempts: int = Field(1, ge=1, le=20)
+    retry_backoff_seconds: float = Field(30.0, gt=0, le=RETRY_BACKOFF_MAX_SECONDS)
+    retry_max_backoff_seconds: float = Field(
+        3600.0, gt=0, le=RETRY_BACKOFF_MAX_SECONDS
+    )
+    retry_jitter: float = Field(0.5, ge=0, le=1)
+    retry_on: Optional[list[RunFailureReason]] = None
 
 
 class PipelineCreate(PipelineBase):
@@ -31,7 +45,19 @@ class PipelineUpdate(BaseModel):
     executor_type: Optional[str] = None
     external_id: Optional[str] = None
     is_active: Optional[bool] = None
+    max_concurrent_runs: Optional[int] = Field(None, ge=1)
+    retry_max_attempts: Optional[int] = Field(None, ge=1, le=20)
+    retry_backoff_seconds: Optional[float] = Field(
+        None, gt=0, le=RETRY_BACKOFF_MAX_SECONDS
+    )
+    retry_max_backoff_seconds: Optional[float] = Field(
+        None, gt=0, le=RETRY_BACKOFF_MAX_SECONDS
+    )
+    retry_jitter: Optional[float] = Field(None, ge=0, le=1)
+    retry_on: Optional[list[RunFailureReason]] = None
     owners: Optional[list[dict]] = None  # Список словарей с ключом 'id' для owner_id
+    # add - добавить owners, remove - убрать owners, replace - оставить ровно owners
+    owners_mode: OwnershipUpdateMode = OwnershipUpdateMode.ADD
 
 
 class PipelineInDB(PipelineBase):
@@ -3,11 +3,19 @@ Pydantic схемы для PipelineRun
 '''
 import uuid
 from datetime import datetime
-from typing import Optional
+from typing import Annotated, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, StringConstraints
 
+from core.config import settings
+from models.enums.pipeline_run import RunFailureReason, RunPriority
 from models.pipeline_run import PipelineRunStatus
+from models.run_param_value import RUN_PARAM_NAME_MAX_LENGTH
+
+# Имя параметра запуска
+RunParamName = Annotated[
+    str, StringConstraints(min_length=1, max_length=RUN_PARAM_NAME_MAX_LENGTH)
+]
 
 
 class PipelineRunBase(BaseModel):
@@ -15,7 +23,11 @@ class PipelineRunBase(BaseModel):
     pipeline_id: uuid.UUID
     pipeline_version_id: uuid.UUID
     status: PipelineRunStatus = PipelineRunStatus.PENDING
+    priority: RunPriority = RunPriority.NORMAL
     executor_run_id: Optional[str] = None
+    attempt: int = 1
+    parent_run_id: Optional[uuid.UUID] = None
+    failure_reason: Optional[RunFailureReason] = None
     
     class Config:
         title = 'PipelineRunBase'
@@ -24,17 +36,24 @@ class PipelineRunBase(BaseModel):
 class PipelineRunCreate(BaseModel):
     '''Схема для создания PipelineRun'''
     pipeline_version_id: uuid.UUID
+    priority: RunPriority = RunPriority.NORMAL
+    params: dict[RunParamName, str] = Field(
+        default_factory=dict, max_length=settings.RUN_PARAMS_MAX_COUNT
+    )
     
     class Config:
         title = 'PipelineRunCreate'
 
 
 class PipelineRunUpdate(BaseModel):
-    '''Схема для обновления PipelineRun'''
+    '''
+    Схема для обновления PipelineRun
+
+    executor_run_id, started_at и finished_at выставляют диспетчер
+    и уведомления исполнителей, через API они не меняются
+    '''
     status: Optional[PipelineRunStatus] = None
-    executor_run_id: Optional[str] = None
-    started_at: Optional[datetime] = None
-    finished_at: Optional[datetime] = None
+    failure_reason: Optional[RunFailureReason] = None
     
     class Config:
         title = 'PipelineRunUpdate'
@@ -46,6 +65,7 @@ class PipelineRunInDB(PipelineRunBase):
     user_id: Optional[uuid.UUID] = None
     started_at: Optional[datetime] = None
     finished_at: Optional[datetime] = None
+    available_at: Optional[datetime] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
     
@@ -60,3 +80,9 @@ class PipelineRunRead(PipelineRunInDB):
     class Config:
         title = 'PipelineRun'
         from_attributes = True
+
+
+class RunLogAppendRead(BaseModel):
+    '''Результат записи в лог запуска'''
+    offset: int
+    next_offset: int
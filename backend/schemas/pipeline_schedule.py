@@ -0,0 +1,45 @@
+'''
+Pydantic схемы для PipelineSchedule
+'''
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict
+
+from models.enums.pipeline_run import RunPriority
+
+
+class PipelineScheduleBase(BaseModel):
+    '''Базовая схема для PipelineSchedule'''
+    pipeline_id: uuid.UUID
+    pipeline_version_id: Optional[uuid.UUID] = None
+    cron: str
+    is_active: bool = True
+    catchup: bool = False
+    priority: RunPriority = RunPriority.NORMAL
+
+
+class PipelineScheduleCreate(PipelineScheduleBase):
+    '''Схема для создания PipelineSchedule'''
+    pass
+
+
+class PipelineScheduleUpdate(BaseModel):
+    '''Схема для обновления PipelineSchedule'''
+    pipeline_version_id: Optional[uuid.UUID] = None
+    cron: Optional[str] = None
+    is_active: Optional[bool] = None
+    catchup: Optional[bool] = None
+    priority: Optional[RunPriority] = None
+
+
+class PipelineScheduleRead(PipelineScheduleBase):
+    '''Схема PipelineSchedule для ответа API'''
+    id: uuid.UUID
+    next_run_at: datetime
+    last_run_at: Optional[datetime] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
@@ -42,7 +42,7 @@ class RunArtifactUpdate(BaseModel):
 
 class RunArtifactInDB(RunArtifactBase):
     '''Схема RunArtifact из базы данных'''
-    id: uuid.UUID
+    id: int
     pipeline_run_id: uuid.UUID
     created_at: datetime
     updated_at: Optional[datetime] = None
@@ -37,7 +37,7 @@ class RunParamValueUpdate(BaseModel):
 
 class RunParamValueInDB(RunParamValueBase):
     '''Схема RunParamValue из базы данных'''
-    id: uuid.UUID
+    id: int
     pipeline_run_id: uuid.UUID
     created_at: datetime
     updated_at: Optional[datetime] = None
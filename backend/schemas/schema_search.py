@@ -0,0 +1,28 @@
+'''
+Pydantic схемы для поиска по JSONB schema
+'''
+from enum import StrEnum
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class SchemaSearchTarget(StrEnum):
+    '''Сущности с JSONB schema, по которым доступен поиск'''
+
+    PIPELINE_VERSIONS = 'pipeline-versions'
+    RUN_ARTIFACTS = 'run-artifacts'
+
+
+class SchemaSearchRequest(BaseModel):
+    '''
+    Фильтр по содержимому schema
+
+    contains - JSON, который должен содержаться в schema (schema @> contains),
+    path - ограниченный JSONPath, который должен находить значение
+    (schema @? path), например $.steps[*] ? (@.type == "sql")
+    '''
+    contains: Optional[dict] = None
+    path: Optional[str] = None
+    offset: int = Field(0, ge=0)
+    limit: int = Field(100, ge=1, le=1000)
@@ -1,8 +1,10 @@
+import uuid
 from datetime import datetime
 from typing import Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from database.annotations import not_null_datetime
+from models.enums.tag import TagEntityType, TagFilterMode, TagType
 
 class TagBase(BaseModel):
     '''Модель тега'''
@@ -34,3 +36,67 @@ class TagRead(TagBase):
     description: str
     created_at: not_null_datetime
     updated_at: not_null_datetime
+
+
+class TagFilter(BaseModel):
+    '''Фильтр списка сущностей по именам тегов'''
+
+    names: list[str]
+    mode: TagFilterMode = TagFilterMode.ALL
+
+
+class TagLinkCreate(BaseModel):
+    '''Модель привязки тега к сущности'''
+
+    entity_type: TagEntityType
+    entity_id: uuid.UUID
+
+
+class TagLinkRead(TagLinkCreate):
+    '''Модель чтения связи тега с сущностью'''
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    tag_id: int
+    created_at: not_null_datetime
+
+
+class TagFacetRead(BaseModel):
+    '''Число сущностей с тегом (фасет)'''
+
+    tag_id: int
+    name: str
+    count: int
+
+
+class TagLinksBulkRequest(BaseModel):
+    '''
+    Модель пакетной привязки (отвязки) тега
+
+    Сущности задаются списком entity_ids либо через pipeline_id:
+    все версии или все запуски пайплайна
+    '''
+
+    entity_type: TagEntityType
+    entity_ids: Optional[list[uuid.UUID]] = None
+    pipeline_id: Optional[uuid.UUID] = None
+
+
+class TagLinksBulkResult(BaseModel):
+    '''Итог пакетной операции со связями тега'''
+
+    requested: int = 0
+    created: int = 0
+    existing: int = 0
+    removed: int = 0
+    not_found: int = 0
+
+
+class TagSuggestion(BaseModel):
+    '''Подсказка тега по префиксу имени'''
+
+    id: int
+    name: str
+    type: TagType
+    usage_count: int
@@ -7,6 +7,7 @@ from typing import Optional
 
 from pydantic import BaseModel, ConfigDict, EmailStr
 
+from models.enums.pipeline import OwnershipUpdateMode
 from models.user import UserRole
 
 
@@ -29,6 +30,8 @@ class UserUpdate(BaseModel):
     is_active: Optional[bool] = None
     role: Optional[UserRole] = None
     pipelines: Optional[list[dict]] = None
+    # add - добавить pipelines, remove - убрать pipelines, replace - оставить ровно pipelines
+    pipelines_mode: OwnershipUpdateMode = OwnershipUpdateMode.ADD
 
 
 class UserPipelinesRead(BaseModel):
@@ -61,6 +64,34 @@ class UserRead(UserBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class UserListRead(UserBase):
+    '''Схема User в списке пользователей (pipelines - только при expand=pipelines)'''
+    id: uuid.UUID
+    created_at: datetime
+    pipelines_count: int = 0
+    pipelines: Optional[list[UserPipelinesRead]] = None
+
+
+class UserPage(BaseModel):
+    '''Схема страницы списка пользователей'''
+    users: list[UserListRead]
+    next_cursor: Optional[str] = None
+
+
+class UserImportFailure(BaseModel):
+    '''Строка импорта, по которой пользователь не создан'''
+    row: int
+    email: Optional[str] = None
+    error: str
+
+
+class UserImportResult(BaseModel):
+    '''Итог импорта пользователей'''
+    requested: int = 0
+    created: int = 0
+    failed: list[UserImportFailure] = []
+
+
 class UserLogin(BaseModel):
     '''Схема для логина пользователя'''
     email: EmailStr
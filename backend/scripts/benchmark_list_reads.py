@@ -0,0 +1,174 @@
+'''
+Сравнение путей чтения страницы списка пайплайнов (GET /pipelines)
+
+Запуск из каталога backend на базе с примененными миграциями:
+
+    python -m scripts.benchmark_list_reads --seed 1000 --limit 1000
+
+Страница пайплайнов с владельцами читается и сериализуется в JSON
+тремя способами:
+
+    n_plus_one - ORM объекты и отдельный запрос владельцев на каждый
+                 пайплайн, валидация PipelineRead через from_attributes
+    orm_batch  - ORM объекты с selectinload владельцев (профиль DETAIL),
+                 валидация PipelineRead через from_attributes
+    mappings   - get_all_mappings: плоские строки и один запрос
+                 владельцев на страницу, orjson (ORJSONResponse)
+
+Для каждого пути выводится число SQL запросов, строк в секунду и
+пик выделенной памяти на страницу (tracemalloc, включает буферы
+драйвера). --seed добавляет пайплайны с владельцем в транзакции,
+которая откатывается в конце, поэтому база не меняется
+'''
+import argparse
+import asyncio
+import time
+import tracemalloc
+import uuid
+from statistics import median
+from typing import Awaitable, Callable
+
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from crud.loaders import LoaderProfile
+from crud.pipeline import pipeline_crud
+from database.base import AsyncSessionLocal, async_engine
+from models.pipeline import Pipeline, pipeline_owners
+from models.user import User, UserRole
+from schemas.pipeline import PipelineInDB, PipelineRead, PipelineUserRead
+from services.query_stats import count_queries
+
+pipelines_adapter = TypeAdapter(list[PipelineRead])
+
+
+async def read_n_plus_one(session: AsyncSession, limit: int) -> bytes:
+    '''Страница ORM объектов, владельцы отдельным запросом на пайплайн'''
+    pipelines = await pipeline_crud.get_all(session, limit=limit, is_active=True)
+    items = []
+    for pipeline in pipelines:
+        owners = (
+            await session.execute(
+                select(User)
+                .join(pipeline_owners, pipeline_owners.c.user_id == User.id)
+                .where(pipeline_owners.c.pipeline_id == pipeline.id)
+            )
+        ).scalars().all()
+        # Связи без профиля загрузки не читаются (raise_on_sql), поэтому
+        # владельцы подставляются из отдельного запроса
+        item = PipelineRead(
+            **PipelineInDB.model_validate(pipeline).model_dump(),
+            owners=[PipelineUserRead.model_validate(owner) for owner in owners],
+        )
+        items.append(item)
+    return pipelines_adapter.dump_json(items)
+
+
+async def read_orm_batch(session: AsyncSession, limit: int) -> bytes:
+    '''Страница ORM объектов с selectinload владельцев'''
+    pipelines = await pipeline_crud.get_all(
+        session, limit=limit, profile=LoaderProfile.DETAIL, is_active=True
+    )
+    return pipelines_adapter.dump_json(
+        pipelines_adapter.validate_python(pipelines, from_attributes=True)
+    )
+
+
+async def read_mappings(session: AsyncSession, limit: int) -> bytes:
+    '''Страница словарей колонок и один запрос владельцев'''
+    pipelines = await pipeline_crud.get_all_mappings(
+        session, limit=limit, is_active=True
+    )
+    return ORJSONResponse(pipelines).body
+
+
+PATHS: dict[str, Callable[[AsyncSession, int], Awaitable[bytes]]] = {
+    'n_plus_one': read_n_plus_one,
+    'orm_batch': read_orm_batch,
+    'mappings': read_mappings,
+}
+
+
+async def seed(session: AsyncSession, count: int) -> None:
+    '''Добавить count активных пайплайнов с одним владельцем'''
+    owner_id = uuid.uuid4()
+    await session.execute(
+        insert(User).values(
+            id=owner_id,
+            email=f'benchmark-{owner_id.hex}@example.com',
+            password_hash='-',
+            role=UserRole.USER,
+        )
+    )
+    pipeline_ids = [uuid.uuid4() for _ in range(count)]
+    await session.execute(
+        insert(Pipeline),
+        [
+            {
+                'id': pipeline_id,
+                'name': f'benchmark {index}',
+                'code': f'benchmark-{pipeline_id.hex}',
+                'executor_type': 'benchmark',
+            }
+            for index, pipeline_id in enumerate(pipeline_ids)
+        ],
+    )
+    await session.execute(
+        insert(pipeline_owners),
+        [
+            {'pipeline_id': pipeline_id, 'user_id': owner_id}
+            for pipeline_id in pipeline_ids
+        ],
+    )
+
+
+async def measure(
+    session: AsyncSession,
+    read: Callable[[AsyncSession, int], Awaitable[bytes]],
+    limit: int,
+) -> tuple[int, int, float, int]:
+    '''Одно чтение страницы: (строк, запросов, секунд, пик памяти в байтах)'''
+    session.expunge_all()
+    tracemalloc.start()
+    start = time.perf_counter()
+    with count_queries() as stats:
+        body = await read(session, limit)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    rows = body.count(b'"code":')
+    return rows, stats.count, elapsed, peak
+
+
+async def main(args: argparse.Namespace) -> None:
+    async with AsyncSessionLocal() as session:
+        if args.seed:
+            await seed(session, args.seed)
+        print(f'{"путь":<12} {"строк":>6} {"запросов":>9} {"строк/с":>10} {"память, КиБ":>12}')
+        for name, read in PATHS.items():
+            # Первый прогон прогревает кэши компиляции запросов и схем
+            await measure(session, read, args.limit)
+            samples = [
+                await measure(session, read, args.limit)
+                for _ in range(args.repeat)
+            ]
+            rows, queries = samples[0][0], samples[0][1]
+            elapsed = median(sample[2] for sample in samples)
+            peak = median(sample[3] for sample in samples)
+            print(
+                f'{name:<12} {rows:>6} {queries:>9} '
+                f'{rows / elapsed if elapsed else 0:>10.0f} {peak / 1024:>12.0f}'
+            )
+        await session.rollback()
+    await async_engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--limit', type=int, default=1000, help='размер страницы')
+    parser.add_argument('--repeat', type=int, default=5, help='прогонов на путь')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='добавить пайплайнов на время прогона (откатываются)')
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,77 @@
+'''
+Нагрузка на CPU при переборе паролей с ограничением попыток входа и без
+
+Запуск из каталога backend (без БД, backend 'memory'):
+
+    python -m scripts.benchmark_login_throttle --attempts 2000 --emails 50 --ips 20
+
+Имитируется атака: --attempts попыток входа с неверным паролем по
+--emails адресам с --ips адресов за время меньше окна
+LOGIN_THROTTLE_WINDOW_SECONDS. Каждая попытка проходит
+LoginThrottle.check (измеряется), пропущенные затем стоят одной
+проверки пароля bcrypt; без ограничения bcrypt выполняется для каждой
+попытки. Время bcrypt оценивается по выборке из --sample проверок
+(одна проверка - сотни миллисекунд), поиск пользователя в БД не
+моделируется. Выводится процессорное время (time.process_time)
+всего и на одну попытку
+'''
+import argparse
+import asyncio
+import random
+import time
+
+from core.config import settings
+from core.security import get_password_hash, verify_password
+from services.login_throttle import LoginThrottle
+
+
+def attack(args: argparse.Namespace) -> list[tuple[str, str]]:
+    '''Попытки (email, IP) в случайном порядке'''
+    rng = random.Random(args.seed)
+    return [
+        (f'user{rng.randrange(args.emails)}@example.com',
+         f'203.0.113.{rng.randrange(args.ips)}')
+        for _ in range(args.attempts)
+    ]
+
+
+async def main(args: argparse.Namespace) -> None:
+    settings.LOGIN_THROTTLE_BACKEND = 'memory'
+    password_hash = get_password_hash('correct horse battery staple')
+    attempts = attack(args)
+
+    start = time.process_time()
+    for _ in range(args.sample):
+        verify_password('wrong password', password_hash)
+    bcrypt_seconds = (time.process_time() - start) / args.sample
+
+    throttle = LoginThrottle()
+    passed = 0
+    start = time.process_time()
+    for email, ip in attempts:
+        if not await throttle.check(email, ip):
+            passed += 1
+    check_seconds = time.process_time() - start
+    throttled_seconds = check_seconds + bcrypt_seconds * passed
+    unthrottled_seconds = bcrypt_seconds * len(attempts)
+
+    print(f'попыток: {len(attempts)}, пропущено ограничением: {passed}, '
+          f'отклонено: {len(attempts) - passed}')
+    print(f'bcrypt: {bcrypt_seconds * 1000:.1f} мс, проверка ограничения: '
+          f'{check_seconds / len(attempts) * 1_000_000:.1f} мкс на попытку')
+    print(f'{"режим":<18} {"CPU, с":>8} {"мс/попытку":>11}')
+    print(f'{"без ограничения":<18} {unthrottled_seconds:>8.2f} '
+          f'{unthrottled_seconds / len(attempts) * 1000:>11.3f}')
+    print(f'{"с ограничением":<18} {throttled_seconds:>8.2f} '
+          f'{throttled_seconds / len(attempts) * 1000:>11.3f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--attempts', type=int, default=2000, help='попыток входа')
+    parser.add_argument('--emails', type=int, default=50, help='атакуемых адресов')
+    parser.add_argument('--ips', type=int, default=20, help='адресов атакующего')
+    parser.add_argument('--sample', type=int, default=20,
+                        help='проверок bcrypt для оценки режима без ограничения')
+    parser.add_argument('--seed', type=int, default=1)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,71 @@
+'''
+Проверка планов запросов пользователей по email (EXPLAIN)
+
+Запуск из каталога backend на базе с примененными миграциями:
+
+    python -m scripts.check_user_query_plans
+
+Для каждого запроса строится план (database.explain) фильтра без
+ORDER BY и LIMIT и проверяется, что условие выполняется по
+индексу из миграции d81c5f3a7e64. Последовательное чтение
+отключается (SET LOCAL enable_seqscan = off): на маленькой таблице
+планировщик выбрал бы Seq Scan, даже если индекс подходит, а проверка
+должна показать, что выражение условия совпадает с выражением
+индекса. Код выхода 1, если хотя бы один запрос не использует индекс
+'''
+import asyncio
+import sys
+
+from sqlalchemy import Select, text
+
+from crud.user import user_crud
+from database.base import AsyncSessionLocal, async_engine
+from database.explain import get_plan, plan_uses_index
+
+EMAIL_INDEX = 'uix_users_email_lower'
+TRIGRAM_INDEX = 'ix_users_email_lower_trgm'
+
+# Запрос -> индексы, любым из которых может выполняться его условие
+CHECKS: list[tuple[str, Select, tuple[str, ...]]] = [
+    ('get_by_email', user_crud.email_query('User@Example.com'), (EMAIL_INDEX,)),
+    (
+        'get_existing_emails',
+        user_crud.existing_emails_query(['a@example.com', 'B@example.com']),
+        (EMAIL_INDEX,),
+    ),
+    (
+        'get_page_mappings(email_prefix)',
+        user_crud.page_query(email_prefix='adm'),
+        # LIKE 'adm%' по btree lower(email) возможен только при
+        # collation C, триграммный индекс подходит всегда
+        (EMAIL_INDEX, TRIGRAM_INDEX),
+    ),
+    ('search_mappings', user_crud.search_query('example'), (TRIGRAM_INDEX,)),
+]
+
+
+def describe(plan: dict) -> str:
+    '''Узлы плана в одну строку: тип узла и индекс'''
+    node = plan['Node Type']
+    if 'Index Name' in plan:
+        node += f' ({plan["Index Name"]})'
+    subplans = [describe(subplan) for subplan in plan.get('Plans', ())]
+    return f'{node} -> [{", ".join(subplans)}]' if subplans else node
+
+
+async def main() -> int:
+    failed = 0
+    async with AsyncSessionLocal() as session:
+        await session.execute(text('SET LOCAL enable_seqscan = off'))
+        for name, query, indexes in CHECKS:
+            plan = await get_plan(session, query.order_by(None).limit(None))
+            ok = any(plan_uses_index(plan, index) for index in indexes)
+            failed += not ok
+            print(f'{"OK  " if ok else "FAIL"} {name}: {describe(plan)}')
+        await session.rollback()
+    await async_engine.dispose()
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,157 @@
+'''
+Симулятор ожидания в очереди запусков по полосам приоритета (без БД)
+
+Повторяет порядок выборки get_dispatch_candidates: для каждого потока
+(пайплайн, полоса) берется не больше limit первых запусков, виртуальное
+время = max(место в полосе пайплайна, место среди голов пользователя)
+/ вес полосы, допускаются запуски с меньшим виртуальным временем, пока
+есть свободные слоты. Запуск из каталога backend:
+
+    python -m scripts.simulate_run_queue --slots 20 --rate high=0.2 normal=1 low=1
+
+Время дискретное, шаг - один проход диспетчера. Запуски приходят
+по Пуассону с интенсивностью --rate на шаг, длительность выполнения
+экспоненциальная со средним --service шагов. Ограничен только общий
+лимит исполнителя --slots, лимиты пайплайнов (max_concurrent_runs)
+не моделируются. Для каждой полосы выводится время ожидания
+(от прихода до допуска) в шагах
+'''
+import argparse
+import random
+from collections import defaultdict
+from dataclasses import dataclass
+from statistics import mean, quantiles
+from typing import Optional
+
+from core.config import settings
+from models.enums.pipeline_run import RunPriority
+
+# Порядок полос при равном виртуальном времени (как у enum в БД)
+LANE_ORDER = {priority: index for index, priority in enumerate(RunPriority)}
+
+
+@dataclass
+class SimulatedRun:
+    '''Ожидающий запуск'''
+    arrival: int
+    pipeline: int
+    user: int
+    priority: RunPriority
+    admitted: Optional[int] = None
+
+
+def parse_lane_values(items: list[str], default: dict[str, float]) -> dict[RunPriority, float]:
+    '''Значения по полосам из аргументов вида high=1.5'''
+    values = dict(default)
+    for item in items:
+        name, _, value = item.partition('=')
+        values[RunPriority(name).value] = float(value)
+    return {priority: values.get(priority.value, 0.0) for priority in RunPriority}
+
+
+def poisson(rng: random.Random, rate: float) -> int:
+    '''Число событий пуассоновского потока за один шаг'''
+    count, elapsed = 0, rng.expovariate(rate) if rate > 0 else 1.0
+    while elapsed < 1.0:
+        count += 1
+        elapsed += rng.expovariate(rate)
+    return count
+
+
+def dispatch_order(
+    pending: list[SimulatedRun],
+    weights: dict[RunPriority, float],
+    limit: int,
+) -> list[SimulatedRun]:
+    '''Кандидаты в порядке виртуального времени (как get_dispatch_candidates)'''
+    flows = defaultdict(list)
+    for run in pending:
+        flows[(run.pipeline, run.priority)].append(run)
+    heads = []
+    for runs in flows.values():
+        runs.sort(key=lambda run: run.arrival)
+        heads.extend(
+            (run, position) for position, run in enumerate(runs[:limit], start=1)
+        )
+    heads.sort(key=lambda head: head[0].arrival)
+    user_positions = defaultdict(int)
+    candidates = []
+    for run, pipeline_position in heads:
+        user_positions[(run.user, run.priority)] += 1
+        virtual_time = (
+            max(pipeline_position, user_positions[(run.user, run.priority)])
+            / weights[run.priority]
+        )
+        candidates.append((virtual_time, LANE_ORDER[run.priority], run.arrival, run))
+    candidates.sort(key=lambda candidate: candidate[:3])
+    return [candidate[3] for candidate in candidates]
+
+
+def simulate(args: argparse.Namespace) -> list[SimulatedRun]:
+    '''Прогнать очередь и вернуть все пришедшие запуски'''
+    rng = random.Random(args.seed)
+    rates = parse_lane_values(args.rate, {})
+    weights = parse_lane_values(args.weight, settings.RUN_PRIORITY_WEIGHTS)
+    runs: list[SimulatedRun] = []
+    pending: list[SimulatedRun] = []
+    finishes: list[int] = []
+    for tick in range(args.ticks):
+        finishes = [finish for finish in finishes if finish > tick]
+        for priority, rate in rates.items():
+            for _ in range(poisson(rng, rate)):
+                run = SimulatedRun(
+                    arrival=tick,
+                    pipeline=rng.randrange(args.pipelines),
+                    user=rng.randrange(args.users),
+                    priority=priority,
+                )
+                runs.append(run)
+                pending.append(run)
+        free_slots = args.slots - len(finishes)
+        if free_slots <= 0:
+            continue
+        for run in dispatch_order(pending, weights, args.limit)[:free_slots]:
+            run.admitted = tick
+            finishes.append(tick + max(1, round(rng.expovariate(1 / args.service))))
+        pending = [run for run in pending if run.admitted is None]
+    return runs
+
+
+def report(runs: list[SimulatedRun], ticks: int) -> None:
+    '''Таблица ожидания по полосам'''
+    print(f'{"полоса":<8} {"пришло":>7} {"допущено":>9} {"среднее":>8} '
+          f'{"p50":>6} {"p95":>6} {"макс":>6}')
+    for priority in RunPriority:
+        lane = [run for run in runs if run.priority is priority]
+        waits = [run.admitted - run.arrival for run in lane if run.admitted is not None]
+        if len(waits) < 2:
+            print(f'{priority.value:<8} {len(lane):>7} {len(waits):>9}')
+            continue
+        percentiles = quantiles(waits, n=100)
+        print(
+            f'{priority.value:<8} {len(lane):>7} {len(waits):>9} {mean(waits):>8.1f} '
+            f'{percentiles[49]:>6.0f} {percentiles[94]:>6.0f} {max(waits):>6}'
+        )
+    print(f'шагов: {ticks}; не допущенные к концу прогона в среднее и перцентили не входят')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--ticks', type=int, default=2000, help='число шагов диспетчера')
+    parser.add_argument('--slots', type=int, default=20, help='слотов исполнителя')
+    parser.add_argument('--service', type=float, default=10.0, help='средняя длительность запуска, шагов')
+    parser.add_argument('--rate', nargs='*', default=['high=0.2', 'normal=0.8', 'low=0.8'],
+                        help='приход запусков за шаг по полосам (high=0.2 normal=1 ...)')
+    parser.add_argument('--weight', nargs='*', default=[],
+                        help='веса полос (по умолчанию RUN_PRIORITY_WEIGHTS)')
+    parser.add_argument('--pipelines', type=int, default=50)
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--limit', type=int, default=settings.RUN_DISPATCH_BATCH_SIZE,
+                        help='голов на поток (limit выборки)')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    report(simulate(args), args.ticks)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,32 @@
+'''
+Базовый класс фоновых задач приложения
+'''
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Optional
+
+
+class BackgroundWorker(ABC):
+    '''Фоновая задача, запускаемая при старте приложения'''
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        '''Запустить фоновую задачу'''
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        '''Остановить фоновую задачу'''
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    @abstractmethod
+    async def _run(self) -> None:
+        '''Основной цикл фоновой задачи'''
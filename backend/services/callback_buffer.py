@@ -0,0 +1,147 @@
+'''
+Буфер уведомлений исполнителей о статусах запусков (асинхронный)
+'''
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Optional
+
+from core.config import settings
+from crud.pipeline_run import pipeline_run_crud
+from database.base import AsyncSessionLocal
+from models.pipeline_run import (FINISHED_PIPELINE_RUN_STATUSES,
+                                 PIPELINE_RUN_REACHABLE, PipelineRunStatus)
+from schemas.executor import ExecutorCallback, RunStatusUpdate
+
+logger = logging.getLogger(__name__)
+
+CallbackKey = tuple[str, str]
+
+
+def is_legal_transition(
+    previous_status: PipelineRunStatus, status: PipelineRunStatus
+) -> bool:
+    '''Достижим ли status из previous_status (повтор статуса допустим)'''
+    return status is previous_status or status in PIPELINE_RUN_REACHABLE[previous_status]
+
+
+class RunCallbackBuffer:
+    '''
+    Буфер уведомлений исполнителей
+
+    Уведомления копятся EXECUTOR_CALLBACK_FLUSH_INTERVAL_MS миллисекунд
+    (или до EXECUTOR_CALLBACK_MAX_BATCH запусков) и схлопываются по
+    запуску: остается самый поздний статус жизненного цикла, время
+    начала и время завершения. Пачка применяется одним UPDATE, а каждый
+    отправитель ждет фиксации и узнает, принято ли его уведомление.
+
+    Переход проверяется для каждого уведомления отдельно: до схлопывания
+    - от накопленного статуса (недопустимое уведомление отклоняется
+    сразу), после UPDATE - от статуса запуска в БД. Иначе недопустимое
+    уведомление принималось бы вместе с допустимым, поглотившим его
+    '''
+
+    def __init__(self, session_factory=AsyncSessionLocal):
+        self._session_factory = session_factory
+        self._updates: dict[CallbackKey, RunStatusUpdate] = {}
+        self._waiters: dict[
+            CallbackKey, list[tuple[PipelineRunStatus, asyncio.Future]]
+        ] = defaultdict(list)
+        self._flush_timer: Optional[asyncio.TimerHandle] = None
+        self._flush_tasks: set[asyncio.Task] = set()
+
+    async def submit(self, executor_type: str, callback: ExecutorCallback) -> bool:
+        '''Добавить уведомление и дождаться его применения'''
+        key = (executor_type, callback.executor_run_id)
+        if not self._merge(key, callback):
+            return False
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        self._waiters[key].append((callback.status, waiter))
+        if len(self._updates) >= settings.EXECUTOR_CALLBACK_MAX_BATCH:
+            self._start_flush()
+        elif self._flush_timer is None:
+            self._flush_timer = loop.call_later(
+                settings.EXECUTOR_CALLBACK_FLUSH_INTERVAL_MS / 1000,
+                self._start_flush,
+            )
+        return await waiter
+
+    def _merge(self, key: CallbackKey, callback: ExecutorCallback) -> bool:
+        '''
+        Схлопнуть уведомление с накопленным обновлением запуска
+
+        Возвращает False, если статус уведомления недостижим
+        из накопленного (уведомление не схлопывается)
+        '''
+        occurred_at = callback.occurred_at or datetime.now(timezone.utc)
+        update = self._updates.get(key)
+        if update is None:
+            update = self._updates[key] = RunStatusUpdate(
+                executor_type=key[0],
+                executor_run_id=key[1],
+                status=callback.status,
+            )
+        elif is_legal_transition(update.status, callback.status):
+            update.status = callback.status
+        else:
+            return False
+        if callback.status is PipelineRunStatus.RUNNING:
+            update.started_at = min(update.started_at or occurred_at, occurred_at)
+        elif (
+            callback.status in FINISHED_PIPELINE_RUN_STATUSES
+            and callback.status is update.status
+        ):
+            update.finished_at = update.finished_at or occurred_at
+            update.failure_reason = update.failure_reason or callback.failure_reason
+        return True
+
+    def _start_flush(self) -> None:
+        '''Забрать накопленные обновления и применить их в фоне'''
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        if not self._updates:
+            return
+        updates, self._updates = self._updates, {}
+        waiters, self._waiters = self._waiters, defaultdict(list)
+        task = asyncio.create_task(self._flush(updates, waiters))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _flush(
+        self,
+        updates: dict[CallbackKey, RunStatusUpdate],
+        waiters: dict[CallbackKey, list[tuple[PipelineRunStatus, asyncio.Future]]],
+    ) -> None:
+        '''Применить пачку обновлений одним UPDATE'''
+        try:
+            async with self._session_factory() as session:
+                accepted = await pipeline_run_crud.apply_status_updates(
+                    session, list(updates.values())
+                )
+        except Exception as error:
+            logger.exception('Ошибка применения уведомлений исполнителей')
+            for key_waiters in waiters.values():
+                for _, waiter in key_waiters:
+                    if not waiter.done():
+                        waiter.set_exception(error)
+            return
+        for key, key_waiters in waiters.items():
+            previous_status = accepted.get(key)
+            for callback_status, waiter in key_waiters:
+                if not waiter.done():
+                    waiter.set_result(
+                        previous_status is not None
+                        and is_legal_transition(previous_status, callback_status)
+                    )
+
+    async def close(self) -> None:
+        '''Применить оставшиеся обновления при остановке приложения'''
+        self._start_flush()
+        if self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks, return_exceptions=True)
+
+
+run_callback_buffer = RunCallbackBuffer()
@@ -0,0 +1,15 @@
+'''
+Адаптеры внешних исполнителей пайплайнов
+'''
+from services.executors.base import (ExecutorAdapter, ExecutorError,
+                                     ExecutorUnavailableError)
+from services.executors.registry import executor_registry
+from services.executors.signature import sign_executor_body
+
+__all__ = [
+    'ExecutorAdapter',
+    'ExecutorError',
+    'ExecutorUnavailableError',
+    'executor_registry',
+    'sign_executor_body',
+]
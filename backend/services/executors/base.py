@@ -0,0 +1,34 @@
+'''
+Базовый класс адаптера исполнителя
+'''
+from abc import ABC, abstractmethod
+
+from models.enums.pipeline_run import RunFailureReason
+from schemas.executor import ExecutorSubmission
+
+
+class ExecutorError(Exception):
+    '''Исполнитель вернул ошибку'''
+
+    failure_reason = RunFailureReason.EXECUTOR_ERROR
+
+
+class ExecutorUnavailableError(ExecutorError):
+    '''Исполнитель недоступен (сеть, таймаут или открыт circuit breaker)'''
+
+    failure_reason = RunFailureReason.EXECUTOR_UNAVAILABLE
+
+
+class ExecutorAdapter(ABC):
+    '''Адаптер исполнителя определенного executor_type'''
+
+    @abstractmethod
+    async def submit(self, submission: ExecutorSubmission) -> str:
+        '''Передать запуск исполнителю, вернуть executor_run_id'''
+
+    @abstractmethod
+    async def cancel(self, executor_run_id: str) -> None:
+        '''Отменить запуск на стороне исполнителя'''
+
+    async def close(self) -> None:
+        '''Освободить ресурсы адаптера (соединения)'''
@@ -0,0 +1,53 @@
+'''
+Circuit breaker для вызовов исполнителей
+'''
+import time
+
+from services.executors.base import ExecutorUnavailableError
+
+
+class CircuitBreaker:
+    '''
+    Circuit breaker
+
+    После failure_threshold ошибок подряд цепь размыкается, и вызовы
+    сразу отклоняются reset_seconds секунд, не нагружая исполнитель.
+    Затем пропускается один пробный вызов: успех замыкает цепь,
+    ошибка снова размыкает ее
+    '''
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self._failure_threshold = failure_threshold
+        self._reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+
+    @property
+    def is_open(self) -> bool:
+        '''Разомкнута ли цепь'''
+        return self._opened_at is not None
+
+    def before_call(self) -> None:
+        '''Проверить, можно ли выполнить вызов'''
+        if self._opened_at is None:
+            return
+        now = time.monotonic()
+        if now - self._opened_at < self._reset_seconds:
+            raise ExecutorUnavailableError('Circuit breaker разомкнут')
+        # Пробный вызов; следующий возможен не раньше чем через reset_seconds
+        self._opened_at = now
+        self._probing = True
+
+    def record_success(self) -> None:
+        '''Зафиксировать успешный вызов'''
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        '''Зафиксировать неуспешный вызов'''
+        self._failures += 1
+        if self._probing or self._failures >= self._failure_threshold:
+            self._opened_at = time.monotonic()
+        self._probing = False
@@ -0,0 +1,184 @@
+'''
+Локальный фейковый исполнитель для тестов и нагрузочных прогонов
+
+Реализует HTTP API исполнителя (см. HttpExecutorAdapter) в памяти.
+Запуск отдельным процессом:
+
+    uvicorn services.executors.fake_app:app --port 8100
+
+и настройка EXECUTOR_URLS='{"fake": "http://localhost:8100"}'.
+Задержка и доля ошибок API задаются переменными окружения
+FAKE_EXECUTOR_LATENCY_SECONDS и FAKE_EXECUTOR_FAILURE_RATE.
+
+Если задан FAKE_EXECUTOR_CALLBACK_URL (например,
+http://localhost:8000/api/v1/executor-callbacks/fake), принятый запуск
+"выполняется": исполнитель отправляет уведомления RUNNING и через
+FAKE_EXECUTOR_RUN_SECONDS - SUCCESS или FAILED (с долей
+FAKE_EXECUTOR_RUN_FAILURE_RATE), подписанные секретом
+FAKE_EXECUTOR_CALLBACK_SECRET так же, как их проверяет
+validate_executor_signature (EXECUTOR_CALLBACK_SECRETS сервиса).
+Отмененный запуск уведомлений больше не отправляет
+'''
+import asyncio
+import logging
+import random
+import time
+import uuid
+
+import httpx
+from fastapi import FastAPI, HTTPException, status
+from pydantic_settings import BaseSettings
+
+from models.enums.pipeline_run import RunFailureReason
+from models.pipeline_run import PipelineRunStatus
+from schemas.executor import (ExecutorCallback, ExecutorSubmission,
+                              ExecutorSubmissionResult)
+from services.executors.signature import sign_executor_body
+
+logger = logging.getLogger(__name__)
+
+
+class FakeExecutorSettings(BaseSettings):
+    '''Настройки фейкового исполнителя'''
+    LATENCY_SECONDS: float = 0.0
+    FAILURE_RATE: float = 0.0
+    CALLBACK_URL: str = ''
+    CALLBACK_SECRET: str = ''
+    # Пауза перед RUNNING: сервис сохраняет executor_run_id только
+    # после ответа на постановку запуска
+    START_DELAY_SECONDS: float = 0.5
+    RUN_SECONDS: float = 1.0
+    RUN_FAILURE_RATE: float = 0.0
+    CALLBACK_ATTEMPTS: int = 5
+    CALLBACK_RETRY_SECONDS: float = 0.5
+
+    class Config:
+        env_prefix = 'FAKE_EXECUTOR_'
+
+
+fake_settings = FakeExecutorSettings()
+
+app = FastAPI(title='Fake executor')
+
+# Принятые запуски: executor_run_id -> запуск
+runs: dict[str, ExecutorSubmission] = {}
+# Выполняющиеся запуски: executor_run_id -> задача отправки уведомлений
+executions: dict[str, asyncio.Task] = {}
+callback_client: httpx.AsyncClient | None = None
+
+
+@app.on_event('startup')
+async def startup() -> None:
+    '''Создать клиент для уведомлений'''
+    global callback_client
+    callback_client = httpx.AsyncClient(timeout=10.0)
+
+
+@app.on_event('shutdown')
+async def shutdown() -> None:
+    '''Остановить выполнение запусков и закрыть клиент'''
+    for task in list(executions.values()):
+        task.cancel()
+    await callback_client.aclose()
+
+
+async def _simulate() -> None:
+    '''Имитация задержки и сбоев исполнителя'''
+    if fake_settings.LATENCY_SECONDS:
+        await asyncio.sleep(fake_settings.LATENCY_SECONDS)
+    if random.random() < fake_settings.FAILURE_RATE:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail='Имитация сбоя исполнителя'
+        )
+
+
+async def _send_callback(callback: ExecutorCallback) -> None:
+    '''
+    Отправить подписанное уведомление о статусе запуска
+
+    409 (запуск еще не привязан к executor_run_id), 5xx и сетевые ошибки
+    повторяются до CALLBACK_ATTEMPTS раз
+    '''
+    body = callback.model_dump_json().encode()
+    for attempt in range(1, fake_settings.CALLBACK_ATTEMPTS + 1):
+        timestamp = str(int(time.time()))
+        headers = {
+            'Content-Type': 'application/json',
+            'X-Signature': 'sha256=' + sign_executor_body(
+                fake_settings.CALLBACK_SECRET, timestamp, body
+            ),
+            'X-Signature-Timestamp': timestamp,
+        }
+        try:
+            response = await callback_client.post(
+                fake_settings.CALLBACK_URL, content=body, headers=headers
+            )
+        except httpx.TransportError as error:
+            logger.warning('Уведомление не отправлено: %s', error)
+        else:
+            if response.status_code < 400:
+                return
+            if response.status_code != status.HTTP_409_CONFLICT and response.status_code < 500:
+                logger.warning(
+                    'Сервис отклонил уведомление %s: %s %s',
+                    callback.executor_run_id, response.status_code, response.text,
+                )
+                return
+        if attempt < fake_settings.CALLBACK_ATTEMPTS:
+            await asyncio.sleep(fake_settings.CALLBACK_RETRY_SECONDS)
+    logger.warning('Уведомление %s не доставлено', callback.executor_run_id)
+
+
+async def _execute(executor_run_id: str) -> None:
+    '''Выполнить запуск: уведомления RUNNING и SUCCESS или FAILED'''
+    try:
+        await asyncio.sleep(fake_settings.START_DELAY_SECONDS)
+        await _send_callback(ExecutorCallback(
+            executor_run_id=executor_run_id,
+            status=PipelineRunStatus.RUNNING,
+        ))
+        await asyncio.sleep(fake_settings.RUN_SECONDS)
+        failed = random.random() < fake_settings.RUN_FAILURE_RATE
+        await _send_callback(ExecutorCallback(
+            executor_run_id=executor_run_id,
+            status=PipelineRunStatus.FAILED if failed else PipelineRunStatus.SUCCESS,
+            failure_reason=RunFailureReason.PIPELINE_ERROR if failed else None,
+        ))
+    finally:
+        executions.pop(executor_run_id, None)
+
+
+@app.post(
+    '/runs',
+    status_code=status.HTTP_201_CREATED,
+    response_model=ExecutorSubmissionResult,
+)
+async def submit_run(submission: ExecutorSubmission):
+    '''Принять запуск'''
+    await _simulate()
+    executor_run_id = uuid.uuid4().hex
+    runs[executor_run_id] = submission
+    if fake_settings.CALLBACK_URL:
+        executions[executor_run_id] = asyncio.create_task(
+            _execute(executor_run_id)
+        )
+    return ExecutorSubmissionResult(id=executor_run_id)
+
+
+@app.get('/runs/{executor_run_id}', response_model=ExecutorSubmission)
+async def get_run(executor_run_id: str):
+    '''Получить принятый запуск'''
+    if executor_run_id not in runs:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    return runs[executor_run_id]
+
+
+@app.delete('/runs/{executor_run_id}', status_code=status.HTTP_204_NO_CONTENT)
+async def cancel_run(executor_run_id: str):
+    '''Отменить запуск'''
+    await _simulate()
+    runs.pop(executor_run_id, None)
+    execution = executions.pop(executor_run_id, None)
+    if execution is not None:
+        execution.cancel()
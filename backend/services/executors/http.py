@@ -0,0 +1,87 @@
+'''
+HTTP адаптер исполнителя
+'''
+import asyncio
+
+import httpx
+
+from core.config import settings
+from schemas.executor import ExecutorSubmission, ExecutorSubmissionResult
+from services.executors.base import (ExecutorAdapter, ExecutorError,
+                                     ExecutorUnavailableError)
+from services.executors.circuit_breaker import CircuitBreaker
+
+
+class HttpExecutorAdapter(ExecutorAdapter):
+    '''
+    Адаптер исполнителя с HTTP API
+
+    Один httpx.AsyncClient на исполнитель держит пул keep-alive
+    соединений, поэтому постановка запуска не открывает новое соединение.
+    Число одновременных запросов ограничено семафором, каждый запрос -
+    таймаутом, а при серии ошибок запросы отсекает circuit breaker
+
+    API исполнителя:
+        POST /runs (ExecutorSubmission) -> {"id": "<executor_run_id>"}
+        DELETE /runs/{executor_run_id}
+    '''
+
+    def __init__(
+        self,
+        base_url: str,
+        max_connections: int = settings.EXECUTOR_MAX_CONNECTIONS,
+        max_concurrent_requests: int = settings.EXECUTOR_MAX_CONCURRENT_REQUESTS,
+        timeout_seconds: float = settings.EXECUTOR_TIMEOUT_SECONDS,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=timeout_seconds,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            transport=transport,
+        )
+        self._semaphore = asyncio.Semaphore(max_concurrent_requests)
+        self._breaker = CircuitBreaker(
+            settings.EXECUTOR_CIRCUIT_FAILURE_THRESHOLD,
+            settings.EXECUTOR_CIRCUIT_RESET_SECONDS,
+        )
+
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        '''Выполнить запрос к исполнителю через семафор и circuit breaker'''
+        self._breaker.before_call()
+        async with self._semaphore:
+            try:
+                response = await self._client.request(method, url, **kwargs)
+            except httpx.TransportError as error:
+                self._breaker.record_failure()
+                raise ExecutorUnavailableError(str(error)) from error
+        if response.status_code >= 500:
+            self._breaker.record_failure()
+            raise ExecutorUnavailableError(
+                f'Исполнитель ответил {response.status_code}'
+            )
+        self._breaker.record_success()
+        if response.status_code >= 400:
+            raise ExecutorError(
+                f'Исполнитель ответил {response.status_code}: {response.text}'
+            )
+        return response
+
+    async def submit(self, submission: ExecutorSubmission) -> str:
+        '''Передать запуск исполнителю'''
+        response = await self._request(
+            'POST', '/runs', content=submission.model_dump_json(),
+            headers={'Content-Type': 'application/json'},
+        )
+        return ExecutorSubmissionResult.model_validate_json(response.content).id
+
+    async def cancel(self, executor_run_id: str) -> None:
+        '''Отменить запуск на стороне исполнителя'''
+        await self._request('DELETE', f'/runs/{executor_run_id}')
+
+    async def close(self) -> None:
+        '''Закрыть пул соединений'''
+        await self._client.aclose()
@@ -0,0 +1,48 @@
+'''
+Реестр адаптеров исполнителей по executor_type
+'''
+from typing import Optional
+
+from core.config import settings
+from services.executors.base import ExecutorAdapter
+from services.executors.http import HttpExecutorAdapter
+
+
+class ExecutorRegistry:
+    '''
+    Реестр адаптеров исполнителей
+
+    Адаптеры создаются один раз на процесс и переиспользуются всеми
+    запусками своего executor_type. Запуски типов без адаптера
+    по-прежнему ведет внешняя система через API
+    '''
+
+    def __init__(self):
+        self._adapters: dict[str, ExecutorAdapter] = {}
+
+    def register(self, executor_type: str, adapter: ExecutorAdapter) -> None:
+        '''Зарегистрировать адаптер для типа исполнителя'''
+        self._adapters[executor_type] = adapter
+
+    def get(self, executor_type: str) -> Optional[ExecutorAdapter]:
+        '''Получить адаптер типа исполнителя'''
+        return self._adapters.get(executor_type)
+
+    def executor_types(self) -> list[str]:
+        '''Типы исполнителей с зарегистрированным адаптером'''
+        return list(self._adapters)
+
+    def configure(self) -> None:
+        '''Создать HTTP адаптеры по настройке EXECUTOR_URLS'''
+        for executor_type, base_url in settings.EXECUTOR_URLS.items():
+            if executor_type not in self._adapters:
+                self.register(executor_type, HttpExecutorAdapter(base_url))
+
+    async def close(self) -> None:
+        '''Закрыть все адаптеры'''
+        for adapter in self._adapters.values():
+            await adapter.close()
+        self._adapters.clear()
+
+
+executor_registry = ExecutorRegistry()
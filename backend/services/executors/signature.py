@@ -0,0 +1,17 @@
+'''
+Подпись запросов исполнителей (HMAC-SHA256)
+'''
+import hashlib
+import hmac
+
+
+def sign_executor_body(secret: str, timestamp: str, body: bytes) -> str:
+    '''
+    Подпись тела запроса исполнителя (hex, без префикса sha256=)
+
+    Подписывается строка "<timestamp>." + тело, где timestamp - время
+    отправки в секундах Unix
+    '''
+    return hmac.new(
+        secret.encode(), timestamp.encode() + b'.' + body, hashlib.sha256
+    ).hexdigest()
@@ -0,0 +1,98 @@
+'''
+Рассылка изменений индексов в памяти между процессами (LISTEN/NOTIFY)
+'''
+import asyncio
+import json
+import logging
+from typing import Callable, Optional
+
+from sqlalchemy import Select, func, select
+
+from core.config import settings
+from database.base import async_engine
+from services.background import BackgroundWorker
+
+logger = logging.getLogger(__name__)
+
+# Обработчик получает сообщение или None (индекс перезагружается целиком)
+InvalidationHandler = Callable[[Optional[dict]], None]
+
+
+def invalidation_notify(index: str, **fields) -> Select:
+    '''
+    Запрос pg_notify с сообщением для индекса
+
+    NOTIFY транзакционный: сообщение уходит при фиксации транзакции,
+    в которой выполнен запрос, и пропадает при откате
+    '''
+    return select(
+        func.pg_notify(
+            settings.INVALIDATION_CHANNEL,
+            json.dumps({'index': index, **fields}, default=str),
+        )
+    )
+
+
+class InvalidationListener(BackgroundWorker):
+    '''
+    Слушатель канала INVALIDATION_CHANNEL
+
+    Сообщение - JSON {"index": имя индекса, ...}, оно передается
+    обработчику этого индекса. После каждого (пере)подключения все
+    обработчики вызываются с None: уведомления, пришедшие без подписки,
+    потеряны, и индексы должны перезагрузиться целиком
+    '''
+
+    def __init__(self, engine=async_engine):
+        super().__init__()
+        self._engine = engine
+        self._handlers: dict[str, InvalidationHandler] = {}
+
+    def register(self, index: str, handler: InvalidationHandler) -> None:
+        '''Зарегистрировать обработчик сообщений индекса'''
+        self._handlers[index] = handler
+
+    def _on_notify(self, connection, pid, channel, payload: str) -> None:
+        '''Сообщение об изменении из любого процесса'''
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            logger.warning('Некорректное сообщение инвалидации: %.200s', payload)
+            return
+        handler = self._handlers.get(message.get('index'))
+        if handler is not None:
+            handler(message)
+
+    def _invalidate_all(self) -> None:
+        for handler in self._handlers.values():
+            handler(None)
+
+    async def _run(self) -> None:
+        '''LISTEN на канале инвалидаций с переподключением'''
+        while True:
+            try:
+                async with self._engine.connect() as listen_connection:
+                    raw_connection = await listen_connection.get_raw_connection()
+                    driver_connection = raw_connection.driver_connection
+                    await driver_connection.add_listener(
+                        settings.INVALIDATION_CHANNEL, self._on_notify
+                    )
+                    try:
+                        self._invalidate_all()
+                        while True:
+                            await asyncio.sleep(settings.INVALIDATION_RETRY_SECONDS)
+                            # Проверка, что соединение с LISTEN живо
+                            await driver_connection.execute('SELECT 1')
+                    finally:
+                        if not driver_connection.is_closed():
+                            await driver_connection.remove_listener(
+                                settings.INVALIDATION_CHANNEL, self._on_notify
+                            )
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception('Ошибка слушателя инвалидаций')
+            await asyncio.sleep(settings.INVALIDATION_RETRY_SECONDS)
+
+
+invalidation_listener = InvalidationListener()
@@ -0,0 +1,195 @@
+'''
+Ограничение частоты попыток входа (скользящее окно по email и IP)
+'''
+import ipaddress
+import logging
+import time
+from functools import lru_cache
+from typing import Optional
+
+from core.config import settings
+from crud.login_attempt import login_attempt_crud
+from database.base import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+def retry_after(previous: int, count: int, limit: int, elapsed: float, window: float) -> float:
+    '''
+    Через сколько секунд следующая попытка уложится в лимит
+
+    Оценка числа попыток за последние window секунд - счетчик текущего
+    окна плюс доля счетчика предыдущего окна, еще не вышедшая
+    из скользящего окна: previous * (1 - elapsed / window) + count.
+    Возвращает 0, если попытку можно сделать сейчас. window и limit
+    положительные (проверяется в настройках), поэтому в первой ветке
+    previous > 0, а во второй count >= limit > 0
+    '''
+    fraction = elapsed / window
+    if count + 1 <= limit:
+        if previous * (1 - fraction) + count + 1 <= limit:
+            return 0.0
+        return (1 - (limit - count - 1) / previous - fraction) * window
+    # Текущее окно исчерпано: ждать следующего, где оно станет предыдущим
+    return (1 - fraction + max(0.0, 1 - (limit - 1) / count)) * window
+
+
+@lru_cache(maxsize=8)
+def _trusted_networks(proxies: tuple[str, ...]) -> tuple:
+    '''Сети доверенных прокси из настройки TRUSTED_PROXIES'''
+    return tuple(ipaddress.ip_network(proxy, strict=False) for proxy in proxies)
+
+
+def _is_trusted(address: str, networks: tuple) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in networks)
+
+
+def resolve_client_ip(peer: Optional[str], forwarded_for: Optional[str]) -> Optional[str]:
+    '''
+    IP клиента с учетом доверенных прокси
+
+    Если соединение пришло не от доверенного прокси, X-Forwarded-For
+    игнорируется (его может подставить сам клиент). Иначе цепочка
+    разбирается справа налево до первого адреса вне доверенных прокси;
+    если доверенные все, берется самый левый
+    '''
+    networks = _trusted_networks(tuple(settings.TRUSTED_PROXIES))
+    if peer is None or not forwarded_for or not _is_trusted(peer, networks):
+        return peer
+    hops = [hop.strip() for hop in forwarded_for.split(',') if hop.strip()]
+    for hop in reversed(hops):
+        if not _is_trusted(hop, networks):
+            return hop
+    return hops[0] if hops else peer
+
+
+class SlidingWindowLimiter:
+    '''
+    Счетчики попыток по ключам в памяти процесса
+
+    На ключ хранится кортеж из трех чисел (номер окна, попыток
+    в предыдущем окне, попыток в текущем), поэтому сотни тысяч ключей
+    занимают десятки мегабайт. Записи старше двух окон ничего не
+    добавляют к оценке и удаляются проходом раз в
+    LOGIN_THROTTLE_EVICT_SECONDS. Если ключей больше
+    LOGIN_THROTTLE_MAX_KEYS, новые ключи не отслеживаются до следующей
+    очистки (их попытки по-прежнему учитываются по другим ключам)
+    '''
+
+    def __init__(self):
+        self._entries: dict[str, tuple[int, int, int]] = {}
+        self._next_evict = 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _counts(self, key: str, window: int) -> tuple[int, int]:
+        '''Попытки ключа в предыдущем и текущем окне'''
+        entry = self._entries.get(key)
+        if entry is None:
+            return 0, 0
+        entry_window, previous, count = entry
+        if entry_window == window:
+            return previous, count
+        if entry_window == window - 1:
+            return count, 0
+        return 0, 0
+
+    def _evict(self, window: int, now: float) -> None:
+        self._next_evict = now + settings.LOGIN_THROTTLE_EVICT_SECONDS
+        self._entries = {
+            key: entry
+            for key, entry in self._entries.items()
+            if entry[0] >= window - 1
+        }
+
+    def hit(self, limits: dict[str, int], now: float) -> float:
+        '''
+        Учесть попытку по всем ключам, если она укладывается в лимиты
+
+        Returns:
+            0, если попытка учтена, иначе через сколько секунд повторить
+            (отклоненная попытка не учитывается)
+        '''
+        length = settings.LOGIN_THROTTLE_WINDOW_SECONDS
+        window = int(now // length)
+        elapsed = now - window * length
+        if now >= self._next_evict:
+            self._evict(window, now)
+        counts = {key: self._counts(key, window) for key in limits}
+        wait = max(
+            retry_after(*counts[key], limit, elapsed, length)
+            for key, limit in limits.items()
+        )
+        if wait:
+            return wait
+        for key, (previous, count) in counts.items():
+            if key in self._entries or len(self._entries) < settings.LOGIN_THROTTLE_MAX_KEYS:
+                self._entries[key] = (window, previous, count + 1)
+        return 0.0
+
+    def merge(self, key: str, window: int, previous: int, count: int) -> None:
+        '''Поднять счетчики ключа до значений из общего хранилища'''
+        local_previous, local_count = self._counts(key, window)
+        if key in self._entries or len(self._entries) < settings.LOGIN_THROTTLE_MAX_KEYS:
+            self._entries[key] = (
+                window, max(previous, local_previous), max(count, local_count)
+            )
+
+
+class LoginThrottle:
+    '''
+    Ограничение попыток входа по email и по IP клиента
+
+    Проверяется до поиска пользователя и проверки пароля (bcrypt),
+    поэтому отклоненная попытка не нагружает ни БД, ни CPU.
+
+    С backend 'postgres' попытка после проверки в памяти учитывается
+    в общей таблице login_attempt_counters одним запросом. Общие
+    счетчики переносятся в память, и дальнейшие попытки ключа,
+    превысившего лимит, отклоняются этим процессом без запроса к БД.
+    В общей таблице учитываются и отклоненные попытки
+    '''
+
+    def __init__(self, session_factory=AsyncSessionLocal):
+        self._session_factory = session_factory
+        self._limiter = SlidingWindowLimiter()
+        self._next_purge = 0.0
+
+    async def check(self, email: str, ip: Optional[str]) -> float:
+        '''
+        Учесть попытку входа
+
+        Returns:
+            0, если попытка разрешена, иначе через сколько секунд повторить
+        '''
+        limits = {'email:' + email.strip().casefold(): settings.LOGIN_THROTTLE_MAX_PER_EMAIL}
+        if ip is not None:
+            limits['ip:' + ip] = settings.LOGIN_THROTTLE_MAX_PER_IP
+        now = time.time()
+        wait = self._limiter.hit(limits, now)
+        if wait or settings.LOGIN_THROTTLE_BACKEND != 'postgres':
+            return wait
+
+        length = settings.LOGIN_THROTTLE_WINDOW_SECONDS
+        window = int(now // length)
+        elapsed = now - window * length
+        async with self._session_factory() as session:
+            counts = await login_attempt_crud.hit(session, list(limits), window)
+            if now >= self._next_purge:
+                self._next_purge = now + settings.LOGIN_THROTTLE_EVICT_SECONDS
+                await login_attempt_crud.purge(session, window - 1)
+        for key, (previous, count) in counts.items():
+            self._limiter.merge(key, window, previous, count)
+        # count уже включает эту попытку
+        return max(
+            retry_after(previous, count - 1, limits[key], elapsed, length)
+            for key, (previous, count) in counts.items()
+        )
+
+
+login_throttle = LoginThrottle()
@@ -0,0 +1,164 @@
+'''
+Фоновый диспетчер outbox-событий (асинхронный)
+'''
+import asyncio
+import logging
+import random
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable
+
+from sqlalchemy import and_, delete, exists, select
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql import func
+
+from core.config import settings
+from database.base import AsyncSessionLocal
+from models.outbox import OutboxEvent
+from services.background import BackgroundWorker
+
+logger = logging.getLogger(__name__)
+
+OutboxHandler = Callable[[OutboxEvent], Awaitable[None]]
+
+
+def _pending(event_model) -> list:
+    '''Условие "событие еще не обработано и не отброшено"'''
+    return [event_model.processed_at.is_(None), event_model.failed_at.is_(None)]
+
+
+class OutboxDispatcher(BackgroundWorker):
+    '''
+    Диспетчер outbox-событий
+
+    Забирает события пачками (FOR UPDATE SKIP LOCKED, поэтому несколько
+    экземпляров API не обработают одно событие дважды) и вызывает
+    зарегистрированные обработчики. Порядок внутри агрегата сохраняется:
+    событие берется в работу, только если у его агрегата нет более ранних
+    необработанных событий. Ошибки обработчиков приводят к повтору
+    с экспоненциальной задержкой, после OUTBOX_MAX_ATTEMPTS попыток
+    событие помечается failed_at и перестает блокировать агрегат.
+
+    Без зарегистрированных обработчиков диспетчер не запускается:
+    иначе события отмечались бы обработанными, никуда не доставленные
+    '''
+
+    def __init__(self, session_factory=AsyncSessionLocal):
+        super().__init__()
+        self._session_factory = session_factory
+        self._handlers: dict[str, list[OutboxHandler]] = defaultdict(list)
+        self._last_purge = 0.0
+
+    def register(self, aggregate_type: str, handler: OutboxHandler) -> None:
+        '''Зарегистрировать обработчик событий агрегата'''
+        self._handlers[aggregate_type].append(handler)
+
+    def start(self) -> None:
+        '''Запустить диспетчер, если есть хотя бы один обработчик'''
+        if not self._handlers:
+            logger.warning('Нет обработчиков outbox-событий, диспетчер не запущен')
+            return
+        super().start()
+
+    async def _run(self) -> None:
+        '''Основной цикл диспетчера'''
+        while True:
+            try:
+                processed = await self.dispatch_batch()
+                if processed < settings.OUTBOX_BATCH_SIZE:
+                    await self._purge_processed()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception('Ошибка обработки outbox-событий')
+                processed = 0
+            if processed < settings.OUTBOX_BATCH_SIZE:
+                await asyncio.sleep(settings.OUTBOX_POLL_INTERVAL_SECONDS)
+
+    async def dispatch_batch(self) -> int:
+        '''Забрать и обработать одну пачку событий'''
+        earlier = aliased(OutboxEvent)
+        query = (
+            select(OutboxEvent)
+            .where(
+                *_pending(OutboxEvent),
+                OutboxEvent.available_at <= func.now(),
+                ~exists().where(
+                    earlier.aggregate_type == OutboxEvent.aggregate_type,
+                    earlier.aggregate_id == OutboxEvent.aggregate_id,
+                    earlier.id < OutboxEvent.id,
+                    and_(*_pending(earlier)),
+                ),
+            )
+            .order_by(OutboxEvent.id)
+            .limit(settings.OUTBOX_BATCH_SIZE)
+            .with_for_update(skip_locked=True)
+        )
+        async with self._session_factory() as session:
+            async with session.begin():
+                events = list((await session.execute(query)).scalars().all())
+                # В пачке не больше одного события на агрегат,
+                # поэтому их можно обрабатывать параллельно
+                await asyncio.gather(*(self._dispatch(event) for event in events))
+        return len(events)
+
+    async def _dispatch(self, event: OutboxEvent) -> None:
+        '''Вызвать обработчики события и отметить результат'''
+        now = datetime.now(timezone.utc)
+        try:
+            for handler in self._handlers.get(event.aggregate_type, ()):
+                await asyncio.wait_for(
+                    handler(event), settings.OUTBOX_HANDLER_TIMEOUT_SECONDS
+                )
+        except Exception as error:
+            event.attempts += 1
+            event.last_error = repr(error)
+            if event.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+                event.failed_at = now
+                logger.error(
+                    'Outbox-событие %s отброшено после %s попыток: %r',
+                    event.id, event.attempts, error
+                )
+            else:
+                event.available_at = now + timedelta(
+                    seconds=self._retry_delay(event.attempts)
+                )
+            return
+        event.processed_at = now
+
+    @staticmethod
+    def _retry_delay(attempts: int) -> float:
+        '''Экспоненциальная задержка повтора с джиттером'''
+        delay = min(
+            settings.OUTBOX_RETRY_MAX_DELAY_SECONDS,
+            settings.OUTBOX_RETRY_BASE_DELAY_SECONDS * 2 ** (attempts - 1),
+        )
+        return delay * random.uniform(0.5, 1.0)
+
+    async def _purge_processed(self) -> None:
+        '''
+        Удалить обработанные события старше OUTBOX_RETENTION_HOURS
+        и отброшенные старше OUTBOX_FAILED_RETENTION_HOURS
+        '''
+        if time.monotonic() - self._last_purge < 60:
+            return
+        self._last_purge = time.monotonic()
+        now = datetime.now(timezone.utc)
+        async with self._session_factory() as session:
+            await session.execute(
+                delete(OutboxEvent).where(
+                    OutboxEvent.processed_at
+                    < now - timedelta(hours=settings.OUTBOX_RETENTION_HOURS)
+                )
+            )
+            await session.execute(
+                delete(OutboxEvent).where(
+                    OutboxEvent.failed_at
+                    < now - timedelta(hours=settings.OUTBOX_FAILED_RETENTION_HOURS)
+                )
+            )
+            await session.commit()
+
+
+outbox_dispatcher = OutboxDispatcher()
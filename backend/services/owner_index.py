@@ -0,0 +1,290 @@
+'''
+Индекс владельцев пайплайнов (в памяти процесса)
+'''
+import asyncio
+import logging
+import time
+import uuid
+from enum import StrEnum
+from typing import Optional
+
+from sqlalchemy import any_, bindparam, event, or_, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Session, attributes
+
+from core.config import settings
+from database.annotations import GUID
+from database.base import AsyncSessionLocal
+from models.enums.outbox import OutboxEventType
+from models.outbox import OUTBOX_AGGREGATES, OutboxEvent
+from models.pipeline import Pipeline, pipeline_owners
+from models.user import User
+from services.invalidation import invalidation_listener, invalidation_notify
+from services.outbox_dispatcher import outbox_dispatcher
+
+logger = logging.getLogger(__name__)
+
+OWNER_CHANGES_KEY = 'pipeline_owner_changes'
+
+# Имя индекса в сообщениях инвалидации
+OWNER_INDEX = 'pipeline_owners'
+
+# Поля агрегатов, изменение которых меняет владельцев
+OWNER_FIELDS = {
+    OUTBOX_AGGREGATES[Pipeline.__tablename__]: 'owners',
+    OUTBOX_AGGREGATES[User.__tablename__]: 'pipelines',
+}
+
+
+class OwnerChange(StrEnum):
+    '''Изменение, применяемое к индексу после фиксации транзакции'''
+
+    ADD = 'add'
+    REMOVE = 'remove'
+    DROP_PIPELINE = 'drop_pipeline'
+    DROP_USER = 'drop_user'
+
+
+class PipelineOwnerIndex:
+    '''
+    Владельцы пайплайнов: pipeline_id -> кортеж номеров пользователей
+
+    UUID пользователей хранятся один раз, а в записях пайплайнов -
+    их порядковые номера (обычно один-два на пайплайн). Обратный
+    индекс номер пользователя -> множество пайплайнов отвечает
+    на "мои пайплайны" без обращения к pipeline_owners.
+
+    Изменения, зафиксированные в этом процессе, применяются к индексу
+    сразу после commit. Об изменениях из других процессов сообщает
+    outbox через NOTIFY (publish_owner_change), и перед следующей
+    проверкой перечитываются владельцы только затронутых пайплайнов
+    и пользователей. Полная перезагрузка - не реже чем раз
+    в OWNER_INDEX_REFRESH_SECONDS и после переподключения LISTEN
+    '''
+
+    def __init__(self, session_factory=AsyncSessionLocal):
+        self._session_factory = session_factory
+        self._user_keys: dict[uuid.UUID, int] = {}
+        self._user_ids: list[uuid.UUID] = []
+        self._owners: dict[uuid.UUID, tuple[int, ...]] = {}
+        self._pipelines: dict[int, set[uuid.UUID]] = {}
+        self._loaded_at: Optional[float] = None
+        self._dirty_pipelines: set[uuid.UUID] = set()
+        self._dirty_users: set[uuid.UUID] = set()
+        self._version = 0
+        self._stale = True
+        self._lock = asyncio.Lock()
+
+    def invalidate(self) -> None:
+        '''Пометить индекс устаревшим (перезагрузится при следующем запросе)'''
+        self._stale = True
+
+    def on_invalidation(self, message: Optional[dict]) -> None:
+        '''Сообщение об изменении владельцев (None - перезагрузить целиком)'''
+        if message is None:
+            self.invalidate()
+        elif message['aggregate'] == OUTBOX_AGGREGATES[Pipeline.__tablename__]:
+            self._dirty_pipelines.add(uuid.UUID(message['id']))
+        else:
+            self._dirty_users.add(uuid.UUID(message['id']))
+
+    def _is_fresh(self) -> bool:
+        return (
+            not self._stale
+            and self._loaded_at is not None
+            and time.monotonic() - self._loaded_at < settings.OWNER_INDEX_REFRESH_SECONDS
+        )
+
+    def _user_key(self, user_id: uuid.UUID) -> int:
+        '''Номер пользователя (назначается при первом появлении)'''
+        key = self._user_keys.get(user_id)
+        if key is None:
+            key = self._user_keys[user_id] = len(self._user_ids)
+            self._user_ids.append(user_id)
+        return key
+
+    def _add(self, pipeline_id: uuid.UUID, user_id: uuid.UUID) -> None:
+        key = self._user_key(user_id)
+        owners = self._owners.get(pipeline_id, ())
+        if key not in owners:
+            self._owners[pipeline_id] = owners + (key,)
+        self._pipelines.setdefault(key, set()).add(pipeline_id)
+
+    def _remove(self, pipeline_id: uuid.UUID, user_id: uuid.UUID) -> None:
+        key = self._user_keys.get(user_id)
+        if key is None:
+            return
+        owners = tuple(owner for owner in self._owners.get(pipeline_id, ()) if owner != key)
+        if owners:
+            self._owners[pipeline_id] = owners
+        else:
+            self._owners.pop(pipeline_id, None)
+        self._pipelines.get(key, set()).discard(pipeline_id)
+
+    async def load(self) -> None:
+        '''Перезагрузить индекс из pipeline_owners'''
+        self._stale = False
+        self._dirty_pipelines, self._dirty_users = set(), set()
+        version = self._version
+        async with self._session_factory() as session:
+            rows = (
+                await session.execute(
+                    select(pipeline_owners.c.pipeline_id, pipeline_owners.c.user_id)
+                )
+            ).all()
+        self._user_keys, self._user_ids = {}, []
+        self._owners, self._pipelines = {}, {}
+        for pipeline_id, user_id in rows:
+            self._add(pipeline_id, user_id)
+        self._loaded_at = time.monotonic()
+        if version != self._version:
+            # Изменения, зафиксированные во время чтения, могли в него не попасть
+            self._stale = True
+        logger.info('Индекс владельцев пайплайнов загружен: %s связей', len(rows))
+
+    async def reload_dirty(self) -> None:
+        '''Перечитать владельцев пайплайнов и пользователей из сообщений'''
+        pipeline_ids, user_ids = self._dirty_pipelines, self._dirty_users
+        self._dirty_pipelines, self._dirty_users = set(), set()
+        version = self._version
+        pipeline_ids_param = bindparam(
+            'pipeline_ids', list(pipeline_ids), type_=ARRAY(GUID())
+        )
+        user_ids_param = bindparam('user_ids', list(user_ids), type_=ARRAY(GUID()))
+        async with self._session_factory() as session:
+            rows = (
+                await session.execute(
+                    select(pipeline_owners.c.pipeline_id, pipeline_owners.c.user_id)
+                    .where(
+                        or_(
+                            pipeline_owners.c.pipeline_id == any_(pipeline_ids_param),
+                            pipeline_owners.c.user_id == any_(user_ids_param),
+                        )
+                    )
+                )
+            ).all()
+        if version != self._version:
+            # Изменения этого процесса, примененные во время чтения, новее
+            # прочитанного: перечитать те же ключи при следующей проверке
+            self._dirty_pipelines |= pipeline_ids
+            self._dirty_users |= user_ids
+            return
+        self.apply(
+            [(OwnerChange.DROP_PIPELINE, pipeline_id) for pipeline_id in pipeline_ids]
+            + [(OwnerChange.DROP_USER, user_id) for user_id in user_ids]
+            + [(OwnerChange.ADD, pipeline_id, user_id) for pipeline_id, user_id in rows]
+        )
+
+    async def ensure_fresh(self) -> None:
+        '''
+        Перезагрузить индекс, если он устарел, или перечитать владельцев
+        из сообщений об изменениях (одновременно - один раз)
+        '''
+        if self._is_fresh() and not (self._dirty_pipelines or self._dirty_users):
+            return
+        async with self._lock:
+            if not self._is_fresh():
+                await self.load()
+            elif self._dirty_pipelines or self._dirty_users:
+                await self.reload_dirty()
+
+    def apply(self, changes: list[tuple]) -> None:
+        '''Применить зафиксированные изменения владельцев'''
+        self._version += 1
+        for change, *ids in changes:
+            if change is OwnerChange.ADD:
+                self._add(*ids)
+            elif change is OwnerChange.REMOVE:
+                self._remove(*ids)
+            elif change is OwnerChange.DROP_PIPELINE:
+                for key in self._owners.pop(ids[0], ()):
+                    self._pipelines.get(key, set()).discard(ids[0])
+            else:
+                key = self._user_keys.get(ids[0])
+                for pipeline_id in self._pipelines.pop(key, set()):
+                    self._remove(pipeline_id, ids[0])
+
+    def is_owner(self, pipeline_id: uuid.UUID, user_id: uuid.UUID) -> bool:
+        '''Является ли пользователь владельцем пайплайна'''
+        key = self._user_keys.get(user_id)
+        return key is not None and key in self._owners.get(pipeline_id, ())
+
+    def pipelines_of(self, user_id: uuid.UUID) -> list[uuid.UUID]:
+        '''ID пайплайнов пользователя'''
+        key = self._user_keys.get(user_id)
+        return sorted(self._pipelines.get(key, ()))
+
+
+pipeline_owner_index = PipelineOwnerIndex()
+invalidation_listener.register(OWNER_INDEX, pipeline_owner_index.on_invalidation)
+
+
+async def publish_owner_change(outbox_event: OutboxEvent) -> None:
+    '''
+    Outbox: разослать всем процессам изменение владельцев пайплайна
+    или пользователя (создание, удаление, изменение связей)
+    '''
+    fields = (outbox_event.payload or {}).get('fields', ())
+    if outbox_event.event_type == OutboxEventType.CREATED and (
+        outbox_event.aggregate_type != OUTBOX_AGGREGATES[Pipeline.__tablename__]
+    ):
+        return
+    if (
+        outbox_event.event_type == OutboxEventType.UPDATED
+        and OWNER_FIELDS[outbox_event.aggregate_type] not in fields
+    ):
+        return
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            invalidation_notify(
+                OWNER_INDEX,
+                aggregate=outbox_event.aggregate_type,
+                id=outbox_event.aggregate_id,
+            )
+        )
+        await session.commit()
+
+
+for aggregate_type in OWNER_FIELDS:
+    outbox_dispatcher.register(aggregate_type, publish_owner_change)
+
+
+def record_owner_changes(session, changes: list[tuple]) -> None:
+    '''Запомнить изменения владельцев, сделанные в обход ORM (применятся после commit)'''
+    session.info.setdefault(OWNER_CHANGES_KEY, []).extend(changes)
+
+
+@event.listens_for(Session, 'after_flush')
+def track_owner_changes(session: Session, flush_context) -> None:
+    '''Собрать изменения владельцев из flush (коллекции owners/pipelines, удаления)'''
+    changes = []
+    for db_object in (*session.new, *session.dirty):
+        if isinstance(db_object, Pipeline):
+            history = attributes.get_history(db_object, 'owners', attributes.PASSIVE_NO_INITIALIZE)
+            changes += [(OwnerChange.ADD, db_object.id, user.id) for user in history.added]
+            changes += [(OwnerChange.REMOVE, db_object.id, user.id) for user in history.deleted]
+        elif isinstance(db_object, User):
+            history = attributes.get_history(db_object, 'pipelines', attributes.PASSIVE_NO_INITIALIZE)
+            changes += [(OwnerChange.ADD, pipeline.id, db_object.id) for pipeline in history.added]
+            changes += [(OwnerChange.REMOVE, pipeline.id, db_object.id) for pipeline in history.deleted]
+    for db_object in session.deleted:
+        if isinstance(db_object, Pipeline):
+            changes.append((OwnerChange.DROP_PIPELINE, db_object.id))
+        elif isinstance(db_object, User):
+            changes.append((OwnerChange.DROP_USER, db_object.id))
+    if changes:
+        record_owner_changes(session, changes)
+
+
+@event.listens_for(Session, 'after_commit')
+def apply_owner_changes(session: Session) -> None:
+    '''Применить изменения владельцев к индексу после фиксации'''
+    changes = session.info.pop(OWNER_CHANGES_KEY, None)
+    if changes:
+        pipeline_owner_index.apply(changes)
+
+
+@event.listens_for(Session, 'after_rollback')
+def forget_owner_changes(session: Session) -> None:
+    '''Забыть изменения владельцев откатившейся транзакции'''
+    session.info.pop(OWNER_CHANGES_KEY, None)
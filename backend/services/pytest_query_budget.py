@@ -0,0 +1,53 @@
+'''
+Плагин pytest: бюджет SQL запросов теста поверх count_queries
+
+Подключение: pytest -p services.pytest_query_budget или
+pytest_plugins = ['services.pytest_query_budget'] в conftest.py.
+
+Маркер ограничивает число запросов всего теста (фаза call, без
+установки и разборки фикстур):
+
+    @pytest.mark.query_budget(3)
+    async def test_get_pipelines(client): ...
+
+Фикстура query_budget - это count_queries, для бюджета на часть теста:
+
+    def test_batch(query_budget):
+        with query_budget(1):
+            ...
+
+Запросы учитываются через contextvars, поэтому асинхронный тест
+должен выполняться в том же потоке, что и pytest (как в pytest-asyncio)
+'''
+from typing import Callable
+
+import pytest
+
+from services.query_stats import count_queries
+
+MARKER = 'query_budget'
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    '''Зарегистрировать маркер query_budget'''
+    config.addinivalue_line(
+        'markers',
+        f'{MARKER}(budget): тест падает, если выполнил больше budget SQL запросов',
+    )
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item: pytest.Item):
+    '''Посчитать запросы теста с маркером query_budget'''
+    marker = item.get_closest_marker(MARKER)
+    if marker is None:
+        return (yield)
+    budget = marker.args[0] if marker.args else marker.kwargs['budget']
+    with count_queries(budget):
+        return (yield)
+
+
+@pytest.fixture
+def query_budget() -> Callable:
+    '''count_queries: бюджет SQL запросов для блока внутри теста'''
+    return count_queries
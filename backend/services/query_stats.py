@@ -0,0 +1,167 @@
+'''
+Счетчик SQL запросов запроса к API: число, время БД и повторы
+'''
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+from core.config import settings
+from database.base import async_engine
+
+logger = logging.getLogger(__name__)
+
+_IN_LIST = re.compile(r'\((?:\$\d+|%\(\w+\)s)(?:, (?:\$\d+|%\(\w+\)s))*\)')
+_SPACES = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=1024)
+def fingerprint(statement: str) -> str:
+    '''
+    Отпечаток запроса: текст без лишних пробелов, списки IN (...)
+    любой длины сведены к одному виду
+
+    Значения параметров в тексте не участвуют, поэтому одинаковые
+    запросы с разными ID дают один отпечаток
+    '''
+    return _IN_LIST.sub('(...)', _SPACES.sub(' ', statement).strip())
+
+
+class QueryStats:
+    '''Число запросов, суммарное время БД и повторы по отпечаткам'''
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints: Counter = Counter()
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        self.fingerprints[fingerprint(statement)] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        '''Отпечатки, повторенные не меньше threshold раз (по убыванию)'''
+        return [
+            (statement, count)
+            for statement, count in self.fingerprints.most_common()
+            if count >= threshold
+        ]
+
+    def server_timing(self) -> str:
+        '''Значение заголовка Server-Timing'''
+        metrics = [f'db;dur={self.duration * 1000:.1f};desc="{self.count} queries"']
+        repeated = self.repeated(settings.QUERY_N_PLUS_ONE_THRESHOLD)
+        if repeated:
+            metrics.append(f'n-plus-one;desc="{repeated[0][1]} repeats"')
+        return ', '.join(metrics)
+
+
+# Счетчики, активные в текущем контексте (запрос к API и вложенные count_queries)
+_active_stats: ContextVar[tuple[QueryStats, ...]] = ContextVar(
+    'active_query_stats', default=()
+)
+
+
+@contextmanager
+def count_queries(budget: Optional[int] = None) -> Iterator[QueryStats]:
+    '''
+    Посчитать SQL запросы внутри блока
+
+    Raises:
+        AssertionError: Если задан budget и запросов оказалось больше
+    '''
+    stats = QueryStats()
+    token = _active_stats.set((*_active_stats.get(), stats))
+    try:
+        yield stats
+    finally:
+        _active_stats.reset(token)
+    if budget is not None and stats.count > budget:
+        raise AssertionError(
+            f'Выполнено {stats.count} SQL запросов при бюджете {budget}: '
+            f'{stats.fingerprints.most_common(3)}'
+        )
+
+
+@event.listens_for(async_engine.sync_engine, 'before_cursor_execute')
+def start_query_timer(conn, cursor, statement, parameters, context, executemany) -> None:
+    '''Запомнить время начала запроса, если его есть кому посчитать'''
+    if _active_stats.get():
+        context.query_stats_start = time.perf_counter()
+
+
+@event.listens_for(async_engine.sync_engine, 'after_cursor_execute')
+def record_query(conn, cursor, statement, parameters, context, executemany) -> None:
+    '''Учесть выполненный запрос во всех активных счетчиках'''
+    active = _active_stats.get()
+    start = getattr(context, 'query_stats_start', None)
+    if not active or start is None:
+        return
+    duration = time.perf_counter() - start
+    for stats in active:
+        stats.record(statement, duration)
+
+
+class QueryStatsMiddleware:
+    '''
+    ASGI middleware: считает SQL запросы каждого HTTP запроса
+
+    Число запросов и время БД отдаются в заголовке Server-Timing
+    (учитываются запросы до начала ответа) и пишутся в лог по шаблону
+    маршрута. Если один отпечаток повторился не меньше
+    QUERY_N_PLUS_ONE_THRESHOLD раз, в лог пишется предупреждение о N+1
+    '''
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not settings.QUERY_STATS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _active_stats.set((*_active_stats.get(), stats))
+
+        async def send_with_server_timing(message):
+            if message['type'] == 'http.response.start':
+                MutableHeaders(scope=message).append(
+                    'Server-Timing', stats.server_timing()
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_server_timing)
+        finally:
+            _active_stats.reset(token)
+            self._report(scope, stats)
+
+    @staticmethod
+    def _report(scope, stats: QueryStats) -> None:
+        '''Записать статистику запроса в лог'''
+        route = getattr(scope.get('route'), 'path', scope['path'])
+        extra = {
+            'method': scope['method'],
+            'route': route,
+            'db_queries': stats.count,
+            'db_time_ms': round(stats.duration * 1000, 1),
+        }
+        for statement, count in stats.repeated(settings.QUERY_N_PLUS_ONE_THRESHOLD):
+            logger.warning(
+                'Возможный N+1 в %s %s: запрос выполнен %s раз: %.200s',
+                scope['method'], route, count, statement,
+                extra={**extra, 'repeats': count, 'fingerprint': statement},
+            )
+        logger.debug(
+            '%s %s: SQL запросов %s, время БД %.1f мс',
+            scope['method'], route, stats.count, stats.duration * 1000,
+            extra=extra,
+        )
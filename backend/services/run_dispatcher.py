@@ -0,0 +1,153 @@
+'''
+Диспетчер запусков пайплайнов (асинхронный)
+'''
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from core.config import settings
+from crud.pipeline_run import pipeline_run_crud
+from database.base import AsyncSessionLocal
+from services.background import BackgroundWorker
+from services.executors import ExecutorError, executor_registry
+
+logger = logging.getLogger(__name__)
+
+
+class RunDispatcher(BackgroundWorker):
+    '''
+    Диспетчер запусков
+
+    Периодически выбирает ожидающие запуски, у которых есть свободные
+    слоты, и допускает их к исполнению по одному в короткой транзакции.
+    Запуски, не уместившиеся в лимиты параллельности, остаются в PENDING
+    и допускаются в порядке создания по мере освобождения слотов.
+
+    Допущенные запуски типов с зарегистрированным адаптером передаются
+    исполнителю вне транзакций, параллельно по всей пачке, а их
+    executor_run_id сохраняется одной транзакцией. Запуски, которые
+    после допуска так и не были переданы (процесс упал между фиксацией
+    и передачей), раз в RUN_REAP_INTERVAL_SECONDS завершаются
+    с освобождением слотов
+    '''
+
+    def __init__(self, session_factory=AsyncSessionLocal, registry=executor_registry):
+        super().__init__()
+        self._session_factory = session_factory
+        self._registry = registry
+
+    async def _run(self) -> None:
+        '''Основной цикл диспетчера'''
+        reaped_at = time.monotonic()
+        while True:
+            try:
+                admitted = await self.dispatch_batch()
+                if time.monotonic() - reaped_at >= settings.RUN_REAP_INTERVAL_SECONDS:
+                    reaped_at = time.monotonic()
+                    await self.reap_unsubmitted()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception('Ошибка диспетчеризации запусков')
+                admitted = 0
+            if admitted < settings.RUN_DISPATCH_BATCH_SIZE:
+                await asyncio.sleep(settings.RUN_DISPATCH_INTERVAL_SECONDS)
+
+    async def dispatch_batch(self) -> int:
+        '''Допустить к исполнению одну пачку ожидающих запусков'''
+        async with self._session_factory() as session:
+            run_ids = await pipeline_run_crud.get_dispatch_candidates(
+                session, settings.RUN_DISPATCH_BATCH_SIZE
+            )
+            await session.rollback()
+            admitted = []
+            for run_id in run_ids:
+                db_run = await pipeline_run_crud.admit(session, run_id)
+                if db_run is None:
+                    await session.rollback()
+                    continue
+                await session.commit()
+                admitted.append(run_id)
+            await self._submit(session, admitted)
+        return len(admitted)
+
+    async def reap_unsubmitted(self) -> int:
+        '''Освободить слоты запусков, допущенных, но не переданных исполнителю'''
+        submitted_before = datetime.now(timezone.utc) - timedelta(
+            seconds=settings.RUN_SUBMIT_TIMEOUT_SECONDS
+        )
+        async with self._session_factory() as session:
+            reaped = await pipeline_run_crud.fail_unsubmitted(
+                session, self._registry.executor_types(), submitted_before
+            )
+        if reaped:
+            logger.warning(
+                'Завершено запусков, не переданных исполнителю: %s', reaped
+            )
+        return reaped
+
+    async def _submit(self, session, run_ids: list[uuid.UUID]) -> None:
+        '''Передать допущенные запуски исполнителям'''
+        submissions = [
+            (self._registry.get(executor_type), submission)
+            for executor_type, submission in await pipeline_run_crud.get_submissions(
+                session, run_ids
+            )
+        ]
+        submissions = [
+            (adapter, submission)
+            for adapter, submission in submissions
+            if adapter is not None
+        ]
+        await session.rollback()
+        if not submissions:
+            return
+        results = await asyncio.gather(
+            *(adapter.submit(submission) for adapter, submission in submissions),
+            return_exceptions=True,
+        )
+        executor_run_ids = {}
+        failures = {}
+        for (_, submission), result in zip(submissions, results):
+            if isinstance(result, ExecutorError):
+                logger.warning(
+                    'Исполнитель не принял запуск %s: %s', submission.run_id, result
+                )
+                failures[submission.run_id] = result.failure_reason
+            elif isinstance(result, BaseException):
+                logger.error(
+                    'Ошибка передачи запуска %s исполнителю',
+                    submission.run_id,
+                    exc_info=result,
+                )
+                failures[submission.run_id] = ExecutorError.failure_reason
+            else:
+                executor_run_ids[submission.run_id] = result
+        await pipeline_run_crud.record_submissions(
+            session, executor_run_ids, failures
+        )
+
+    async def cancel(self, executor_type: str, executor_run_id: str) -> bool:
+        '''
+        Отменить переданный запуск на стороне исполнителя
+
+        Ошибка исполнителя только логируется: запуск уже завершен
+        в сервисе, а поздние уведомления о нем отклоняются проверкой
+        перехода статуса. False, если адаптера нет или отмена не удалась
+        '''
+        adapter = self._registry.get(executor_type)
+        if adapter is None:
+            return False
+        try:
+            await adapter.cancel(executor_run_id)
+        except ExecutorError as error:
+            logger.warning(
+                'Исполнитель не отменил запуск %s: %s', executor_run_id, error
+            )
+            return False
+        return True
+
+
+run_dispatcher = RunDispatcher()
@@ -0,0 +1,228 @@
+'''
+Хранилище логов запусков: append-only сегменты на локальном диске
+'''
+import asyncio
+import bisect
+import fcntl
+import os
+import uuid
+from collections import defaultdict
+from typing import AsyncIterator, Optional
+
+from core.config import settings
+
+# Длина имени сегмента: смещение его первого байта, дополненное нулями
+SEGMENT_NAME_DIGITS = 20
+SEGMENT_SUFFIX = '.log'
+LOCK_FILE = '.lock'
+
+
+class RunLogStore:
+    '''
+    Хранилище логов запусков
+
+    Лог запуска - каталог с сегментами не больше RUN_LOG_SEGMENT_BYTES,
+    имя сегмента - смещение его первого байта в логе. Имена сегментов и
+    служат индексом: нужный сегмент для смещения ищется бинарным поиском.
+
+    Записи копятся RUN_LOG_FLUSH_INTERVAL_MS миллисекунд и пишутся
+    пачкой с одним fsync на лог (group commit); вызывающий ждет
+    фиксации и получает смещения своей записи. Запись в лог защищена
+    файловой блокировкой, поэтому несколько процессов API не перепутают
+    смещения. Чтение идет кусками не больше RUN_LOG_READ_CHUNK_BYTES,
+    поэтому память на читателя постоянна
+    '''
+
+    def __init__(self, root: Optional[str] = None):
+        self._root = root or settings.RUN_LOGS_DIR
+        self._pending: dict[uuid.UUID, list[tuple[bytes, asyncio.Future]]] = (
+            defaultdict(list)
+        )
+        self._flush_timer: Optional[asyncio.TimerHandle] = None
+        self._flush_tasks: set[asyncio.Task] = set()
+        # События о новых записях для читателей этого процесса
+        self._followers: dict[uuid.UUID, set[asyncio.Event]] = defaultdict(set)
+
+    def _run_dir(self, run_id: uuid.UUID) -> str:
+        '''Каталог лога запуска'''
+        return os.path.join(self._root, run_id.hex[:2], run_id.hex)
+
+    def _segments(self, run_dir: str) -> list[int]:
+        '''Смещения начала сегментов лога по возрастанию'''
+        try:
+            names = os.listdir(run_dir)
+        except FileNotFoundError:
+            return []
+        return sorted(
+            int(name[:-len(SEGMENT_SUFFIX)])
+            for name in names
+            if name.endswith(SEGMENT_SUFFIX)
+        )
+
+    def _segment_path(self, run_dir: str, base_offset: int) -> str:
+        '''Путь к сегменту лога'''
+        return os.path.join(
+            run_dir, f'{base_offset:0{SEGMENT_NAME_DIGITS}d}{SEGMENT_SUFFIX}'
+        )
+
+    def _size(self, run_dir: str, segments: list[int]) -> int:
+        '''Размер лога в байтах'''
+        if not segments:
+            return 0
+        return segments[-1] + os.path.getsize(
+            self._segment_path(run_dir, segments[-1])
+        )
+
+    async def append(self, run_id: uuid.UUID, data: bytes) -> tuple[int, int]:
+        '''Дописать данные в лог, вернуть (смещение начала, смещение конца)'''
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        self._pending[run_id].append((data, waiter))
+        if self._flush_timer is None:
+            self._flush_timer = loop.call_later(
+                settings.RUN_LOG_FLUSH_INTERVAL_MS / 1000, self._start_flush
+            )
+        return await waiter
+
+    def _start_flush(self) -> None:
+        '''Забрать накопленные записи и записать их в фоне'''
+        self._flush_timer = None
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, defaultdict(list)
+        task = asyncio.create_task(self._flush(pending))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _flush(
+        self,
+        pending: dict[uuid.UUID, list[tuple[bytes, asyncio.Future]]],
+    ) -> None:
+        '''Записать накопленные записи, по одному fsync на лог'''
+        for run_id, entries in pending.items():
+            try:
+                start = await asyncio.to_thread(
+                    self._write, run_id, [data for data, _ in entries]
+                )
+            except Exception as error:
+                for _, waiter in entries:
+                    if not waiter.done():
+                        waiter.set_exception(error)
+                continue
+            for data, waiter in entries:
+                if not waiter.done():
+                    waiter.set_result((start, start + len(data)))
+                start += len(data)
+            for event in self._followers.get(run_id, ()):
+                event.set()
+
+    def _write(self, run_id: uuid.UUID, chunks: list[bytes]) -> int:
+        '''Записать куски в конец лога под файловой блокировкой'''
+        run_dir = self._run_dir(run_id)
+        os.makedirs(run_dir, exist_ok=True)
+        with open(os.path.join(run_dir, LOCK_FILE), 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            segments = self._segments(run_dir)
+            start = self._size(run_dir, segments)
+            offset = start
+            base_offset = segments[-1] if segments else 0
+            segment = open(self._segment_path(run_dir, base_offset), 'ab')
+            try:
+                for data in chunks:
+                    if (
+                        offset > base_offset
+                        and offset - base_offset + len(data) > settings.RUN_LOG_SEGMENT_BYTES
+                    ):
+                        segment.flush()
+                        os.fsync(segment.fileno())
+                        segment.close()
+                        base_offset = offset
+                        segment = open(self._segment_path(run_dir, base_offset), 'ab')
+                    segment.write(data)
+                    offset += len(data)
+                segment.flush()
+                os.fsync(segment.fileno())
+            finally:
+                segment.close()
+        return start
+
+    def _read(self, run_id: uuid.UUID, offset: int, limit: int) -> tuple[bytes, int, int]:
+        '''Прочитать до limit байт с offset (отрицательный - от конца)'''
+        run_dir = self._run_dir(run_id)
+        segments = self._segments(run_dir)
+        size = self._size(run_dir, segments)
+        if offset < 0:
+            offset = max(0, size + offset)
+        offset = min(offset, size)
+        chunks = []
+        position = offset
+        index = bisect.bisect_right(segments, position) - 1
+        while limit > 0 and position < size and index < len(segments):
+            with open(self._segment_path(run_dir, segments[index]), 'rb') as segment:
+                segment.seek(position - segments[index])
+                data = segment.read(limit)
+            chunks.append(data)
+            position += len(data)
+            limit -= len(data)
+            index += 1
+        return b''.join(chunks), offset, size
+
+    async def read(
+        self,
+        run_id: uuid.UUID,
+        offset: int = 0,
+        limit: int = settings.RUN_LOG_READ_CHUNK_BYTES,
+    ) -> tuple[bytes, int, int]:
+        '''Прочитать кусок лога, вернуть (данные, смещение начала, размер лога)'''
+        return await asyncio.to_thread(self._read, run_id, offset, limit)
+
+    async def follow(
+        self,
+        run_id: uuid.UUID,
+        offset: int,
+        is_finished,
+    ) -> AsyncIterator[bytes]:
+        '''
+        Читать лог с offset по мере записи
+
+        Когда новых данных нет, ждет записи в этом процессе или
+        RUN_LOG_FOLLOW_POLL_SECONDS (запись могла прийти в другой процесс).
+        Заканчивается, когда запуск завершен (is_finished) и лог дочитан
+        '''
+        event = asyncio.Event()
+        self._followers[run_id].add(event)
+        try:
+            while True:
+                event.clear()
+                data, start, _ = await self.read(run_id, offset)
+                if not data and await is_finished():
+                    # Запись могла прийти между чтением и проверкой статуса
+                    data, start, _ = await self.read(run_id, offset)
+                    if not data:
+                        return
+                if data:
+                    offset = start + len(data)
+                    yield data
+                    continue
+                offset = start
+                try:
+                    await asyncio.wait_for(
+                        event.wait(), settings.RUN_LOG_FOLLOW_POLL_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._followers[run_id].discard(event)
+            if not self._followers[run_id]:
+                del self._followers[run_id]
+
+    async def close(self) -> None:
+        '''Записать оставшиеся записи при остановке приложения'''
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+        self._start_flush()
+        if self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks, return_exceptions=True)
+
+
+run_log_store = RunLogStore()
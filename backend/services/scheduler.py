@@ -0,0 +1,162 @@
+'''
+Планировщик запусков пайплайнов по расписанию (асинхронный)
+'''
+import asyncio
+import heapq
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import func, select
+
+from core.config import settings
+from crud.pipeline_schedule import pipeline_schedule_crud
+from database.base import AsyncSessionLocal, async_engine
+from services.background import BackgroundWorker
+
+logger = logging.getLogger(__name__)
+
+# Ключ advisory lock для выбора узла-лидера планировщика
+SCHEDULER_LOCK_KEY = 731_204_001
+
+# Запас при досинхронизации по updated_at (транзакция могла начаться раньше)
+SYNC_OVERLAP = timedelta(minutes=1)
+
+
+class RunScheduler(BackgroundWorker):
+    '''
+    Планировщик запусков по расписанию
+
+    Расписания планирует только один узел - тот, кто держит Postgres
+    advisory lock. Лидер хранит ближайшие срабатывания в min-куче
+    и спит до ближайшего из них, поэтому стоимость такта не зависит от
+    общего числа расписаний. Устаревшие элементы кучи отбрасываются
+    лениво, изменения расписаний подтягиваются по updated_at.
+    После простоя просроченные расписания срабатывают сразу
+    '''
+
+    def __init__(self, session_factory=AsyncSessionLocal, engine=async_engine):
+        super().__init__()
+        self._session_factory = session_factory
+        self._engine = engine
+        self._heap: list[tuple[datetime, uuid.UUID]] = []
+        self._next_run_at: dict[uuid.UUID, datetime] = {}
+        self._synced_at: Optional[datetime] = None
+        self._wakeup = asyncio.Event()
+
+    def notify(self) -> None:
+        '''Сообщить об изменении расписаний на этом узле'''
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        '''Ожидание лидерства и планирование'''
+        while True:
+            try:
+                async with self._engine.connect() as lock_connection:
+                    is_leader = (
+                        await lock_connection.execute(
+                            select(func.pg_try_advisory_lock(SCHEDULER_LOCK_KEY))
+                        )
+                    ).scalar()
+                    await lock_connection.commit()
+                    if is_leader:
+                        logger.info('Узел стал лидером планировщика')
+                        try:
+                            await self._lead(lock_connection)
+                        finally:
+                            await lock_connection.execute(
+                                select(func.pg_advisory_unlock(SCHEDULER_LOCK_KEY))
+                            )
+                            await lock_connection.commit()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception('Ошибка планировщика запусков')
+            await asyncio.sleep(settings.SCHEDULER_LEADER_RETRY_SECONDS)
+
+    async def _lead(self, lock_connection) -> None:
+        '''Цикл планирования на узле-лидере'''
+        self._heap.clear()
+        self._next_run_at.clear()
+        self._synced_at = None
+        await self._sync()
+        synced = time.monotonic()
+        while True:
+            await self._fire_due()
+            timeout = settings.SCHEDULER_SYNC_INTERVAL_SECONDS
+            if self._heap:
+                until_due = (
+                    self._heap[0][0] - datetime.now(timezone.utc)
+                ).total_seconds()
+                timeout = max(0.0, min(timeout, until_due))
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            if (
+                self._wakeup.is_set()
+                or time.monotonic() - synced >= settings.SCHEDULER_SYNC_INTERVAL_SECONDS
+            ):
+                self._wakeup.clear()
+                # Проверка, что соединение с блокировкой лидера живо
+                await lock_connection.execute(select(1))
+                await lock_connection.commit()
+                await self._sync()
+                synced = time.monotonic()
+
+    def _schedule(self, schedule_id: uuid.UUID, next_run_at: datetime) -> None:
+        '''Поставить срабатывание расписания в кучу'''
+        if self._next_run_at.get(schedule_id) == next_run_at:
+            return
+        self._next_run_at[schedule_id] = next_run_at
+        heapq.heappush(self._heap, (next_run_at, schedule_id))
+
+    async def _sync(self) -> None:
+        '''Загрузить расписания, измененные с прошлой синхронизации'''
+        async with self._session_factory() as session:
+            since = self._synced_at - SYNC_OVERLAP if self._synced_at else None
+            rows = await pipeline_schedule_crud.get_changed_since(session, since)
+        for schedule_id, cron, is_active, next_run_at, updated_at in rows:
+            if is_active:
+                self._schedule(schedule_id, next_run_at)
+            else:
+                self._next_run_at.pop(schedule_id, None)
+            if self._synced_at is None or updated_at > self._synced_at:
+                self._synced_at = updated_at
+        logger.debug('Синхронизировано расписаний: %s', len(rows))
+
+    async def _fire_due(self) -> None:
+        '''Создать запуски для всех наступивших срабатываний'''
+        now = datetime.now(timezone.utc)
+        while self._heap and self._heap[0][0] <= now:
+            due = []
+            while (
+                self._heap
+                and self._heap[0][0] <= now
+                and len(due) < settings.SCHEDULER_FIRE_BATCH_SIZE
+            ):
+                next_run_at, schedule_id = heapq.heappop(self._heap)
+                # Ленивое удаление устаревших элементов кучи
+                if self._next_run_at.get(schedule_id) == next_run_at:
+                    del self._next_run_at[schedule_id]
+                    due.append((schedule_id, next_run_at))
+            if not due:
+                continue
+            async with self._session_factory() as session:
+                scheduled = []
+                for schedule_id, next_run_at in due:
+                    scheduled.append((
+                        schedule_id,
+                        await pipeline_schedule_crud.fire(
+                            session, schedule_id, next_run_at, now
+                        ),
+                    ))
+                await session.commit()
+            for schedule_id, next_run_at in scheduled:
+                if next_run_at is not None:
+                    self._schedule(schedule_id, next_run_at)
+
+
+run_scheduler = RunScheduler()
@@ -0,0 +1,199 @@
+'''
+Индекс подсказок тегов по префиксу имени (в памяти процесса)
+'''
+import asyncio
+import heapq
+import logging
+import time
+from bisect import bisect_left
+from typing import Optional
+
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from database.base import AsyncSessionLocal
+from models.enums.tag import TagType
+from models.tag import Tag, TagFacetCounter
+from services.invalidation import invalidation_listener, invalidation_notify
+
+logger = logging.getLogger(__name__)
+
+# Ключ массива со всеми тегами (без фильтра по типу)
+ALL_TYPES = None
+
+# Имя индекса в сообщениях канала инвалидаций
+TAG_SUGGEST_INDEX = 'tag_suggest'
+
+# Префиксы не длиннее этого ранжируются заранее при перестроении индекса
+SHORT_PREFIX_LENGTH = 2
+
+
+def _rank(tags, limit: int) -> list[dict]:
+    '''limit самых используемых тегов (при равенстве - по имени)'''
+    return heapq.nsmallest(
+        limit, tags, key=lambda tag: (-tag['usage_count'], tag['name'])
+    )
+
+
+class TagSuggestIndex:
+    '''
+    Отсортированные массивы имен тегов (отдельно по каждому TagType)
+
+    Кандидаты с префиксом лежат в массиве подряд, начало диапазона
+    ищется bisect по имени в casefold, конец - по префиксу с символом
+    U+10FFFF. Из диапазона берутся limit самых используемых тегов
+    (число связей из tag_facet_counters). Для коротких префиксов,
+    под которые попадает большая часть массива, лучшие теги ранжируются
+    заранее при перестроении.
+
+    Индекс перестраивается целиком и подменяется одним присваиванием.
+    Транзакция, изменившая теги, отправляет уведомление в канал
+    инвалидаций (services.invalidation), и индекс помечается устаревшим
+    во всех процессах. Счетчики использования подхватываются не позже
+    чем через TAG_SUGGEST_REFRESH_SECONDS
+    '''
+
+    def __init__(self, session_factory=AsyncSessionLocal):
+        self._session_factory = session_factory
+        self._arrays: dict[Optional[TagType], tuple[list[str], list[dict]]] = {}
+        self._short_prefixes: dict[tuple[Optional[TagType], str], list[dict]] = {}
+        self._loaded_at: Optional[float] = None
+        self._stale = True
+        self._lock = asyncio.Lock()
+
+    def invalidate(self) -> None:
+        '''Пометить индекс устаревшим (перестроится при следующем запросе)'''
+        self._stale = True
+
+    def _is_fresh(self) -> bool:
+        return (
+            not self._stale
+            and self._loaded_at is not None
+            and time.monotonic() - self._loaded_at < settings.TAG_SUGGEST_REFRESH_SECONDS
+        )
+
+    async def load(self) -> None:
+        '''Перестроить индекс по таблицам tags и tag_facet_counters'''
+        self._stale = False
+        async with self._session_factory() as session:
+            rows = (
+                await session.execute(
+                    select(
+                        Tag.id,
+                        Tag.name,
+                        Tag.type,
+                        func.coalesce(func.sum(TagFacetCounter.count), 0)
+                        .label('usage_count'),
+                    )
+                    .outerjoin(TagFacetCounter, TagFacetCounter.tag_id == Tag.id)
+                    .group_by(Tag.id)
+                )
+            ).all()
+        # Сборка массивов занимает сотни миллисекунд на десятках тысяч
+        # тегов, поэтому выполняется в потоке, не блокируя event loop
+        self._arrays, self._short_prefixes = await asyncio.to_thread(
+            self._build, rows
+        )
+        self._loaded_at = time.monotonic()
+        logger.info('Индекс подсказок тегов перестроен: %s тегов', len(rows))
+
+    @staticmethod
+    def _build(rows) -> tuple[dict, dict]:
+        '''Собрать отсортированные массивы и лучшие теги коротких префиксов'''
+        grouped: dict[Optional[TagType], list[tuple[str, dict]]] = {ALL_TYPES: []}
+        for row in rows:
+            entry = (
+                row.name.casefold(),
+                {
+                    'id': row.id,
+                    'name': row.name,
+                    'type': row.type,
+                    'usage_count': row.usage_count,
+                },
+            )
+            grouped[ALL_TYPES].append(entry)
+            grouped.setdefault(row.type, []).append(entry)
+        arrays = {}
+        short_prefixes = {}
+        for tag_type, entries in grouped.items():
+            entries.sort(key=lambda entry: entry[0])
+            arrays[tag_type] = (
+                [key for key, _ in entries],
+                [tag for _, tag in entries],
+            )
+            by_prefix: dict[str, list[dict]] = {}
+            for key, tag in entries:
+                for length in range(min(len(key), SHORT_PREFIX_LENGTH) + 1):
+                    by_prefix.setdefault(key[:length], []).append(tag)
+            for prefix, tags in by_prefix.items():
+                short_prefixes[(tag_type, prefix)] = _rank(
+                    tags, settings.TAG_SUGGEST_MAX_LIMIT
+                )
+        return arrays, short_prefixes
+
+    async def ensure_fresh(self) -> None:
+        '''Перестроить индекс, если он устарел (одновременно - один раз)'''
+        if self._is_fresh():
+            return
+        async with self._lock:
+            if not self._is_fresh():
+                await self.load()
+
+    def suggest(
+        self,
+        prefix: str,
+        tag_type: Optional[TagType] = None,
+        limit: int = 10,
+    ) -> list[dict]:
+        '''Теги с именем, начинающимся на prefix (без учета регистра), по убыванию использования'''
+        prefix = prefix.casefold()
+        if len(prefix) <= SHORT_PREFIX_LENGTH:
+            return self._short_prefixes.get((tag_type, prefix), [])[:limit]
+        array = self._arrays.get(tag_type)
+        if array is None:
+            return []
+        keys, tags = array
+        start = bisect_left(keys, prefix)
+        end = bisect_left(keys, prefix + '\U0010ffff', start)
+        return _rank(tags[start:end], limit)
+
+
+tag_suggest_index = TagSuggestIndex()
+
+
+invalidation_listener.register(
+    TAG_SUGGEST_INDEX, lambda message: tag_suggest_index.invalidate()
+)
+
+
+@event.listens_for(Session, 'after_flush')
+def notify_tag_writes(session: Session, flush_context) -> None:
+    '''
+    Уведомить все процессы об изменении тегов
+
+    NOTIFY выполняется в транзакции изменения (один раз на транзакцию)
+    и доставляется только при ее фиксации
+    '''
+    if session.info.get('tags_notified'):
+        return
+    if any(
+        isinstance(db_object, Tag)
+        for objects in (session.new, session.dirty, session.deleted)
+        for db_object in objects
+    ):
+        session.connection().execute(invalidation_notify(TAG_SUGGEST_INDEX))
+        session.info['tags_notified'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def invalidate_tag_suggest_index(session: Session) -> None:
+    '''Сбросить индекс этого процесса сразу, не дожидаясь уведомления'''
+    if session.info.pop('tags_notified', False):
+        tag_suggest_index.invalidate()
+
+
+@event.listens_for(Session, 'after_rollback')
+def forget_tag_writes(session: Session) -> None:
+    '''Забыть об изменениях тегов откатившейся транзакции'''
+    session.info.pop('tags_notified', None)
@@ -0,0 +1,173 @@
+'''
+Список отозванных токенов с фильтром Блума в памяти (асинхронный)
+'''
+import asyncio
+import hashlib
+import logging
+import math
+import time
+from typing import Iterable, Optional
+
+from core.config import settings
+from crud.revoked_token import revoked_token_crud
+from database.base import AsyncSessionLocal, async_engine
+from services.background import BackgroundWorker
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    '''
+    Фильтр Блума для строк
+
+    Позиции битов получаются двойным хешированием (h1 + i * h2) из
+    одного дайджеста blake2b, размер и число хешей подбираются
+    по емкости и допустимой доле ложных срабатываний
+    '''
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(capacity, 1)
+        self._size = max(
+            8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self._hash_count = max(1, round(self._size / capacity * math.log(2)))
+        self._bits = bytearray((self._size + 7) // 8)
+
+    def _positions(self, value: str) -> Iterable[int]:
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return (
+            (first + index * second) % self._size
+            for index in range(self._hash_count)
+        )
+
+    def add(self, value: str) -> None:
+        for position in self._positions(value):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(value)
+        )
+
+
+class TokenRevocationList(BackgroundWorker):
+    '''
+    Проверка отзыва токенов
+
+    Токен, jti которого нет в фильтре Блума, точно не отозван, и
+    проверка обходится без запроса к БД. Только при попадании в фильтр
+    (отозванный токен или ложное срабатывание) отзыв проверяется по
+    таблице revoked_tokens.
+
+    Фоновая задача держит отдельное соединение с LISTEN на канале
+    TOKEN_REVOCATION_CHANNEL и добавляет в фильтр jti из уведомлений,
+    а раз в TOKEN_REVOCATION_REBUILD_SECONDS удаляет истекшие записи
+    и перестраивает фильтр. Пока фильтр не построен или соединение
+    с LISTEN потеряно, каждая проверка идет в БД
+    '''
+
+    def __init__(self, session_factory=AsyncSessionLocal, engine=async_engine):
+        super().__init__()
+        self._session_factory = session_factory
+        self._engine = engine
+        self._bloom: Optional[BloomFilter] = None
+        # jti, отозванные во время перестроения фильтра
+        self._pending: Optional[set[str]] = None
+
+    def _add(self, jti: str) -> None:
+        '''Добавить jti в текущий фильтр и в перестраиваемый'''
+        if self._bloom is not None:
+            self._bloom.add(jti)
+        if self._pending is not None:
+            self._pending.add(jti)
+
+    def _on_notify(self, connection, pid, channel, payload: str) -> None:
+        '''Уведомление об отзыве токена в любом процессе'''
+        self._add(payload)
+
+    async def is_revoked(self, jti: str) -> bool:
+        '''Отозван ли токен'''
+        bloom = self._bloom
+        if bloom is not None and jti not in bloom:
+            return False
+        async with self._session_factory() as session:
+            return await revoked_token_crud.is_revoked(session, jti)
+
+    async def revoke(self, jti: str, user_id, expires_at) -> None:
+        '''Отозвать токен'''
+        # До прихода собственного NOTIFY токен уже должен отсекаться
+        self._add(jti)
+        async with self._session_factory() as session:
+            await revoked_token_crud.revoke(session, jti, user_id, expires_at)
+
+    async def _rebuild(self) -> None:
+        '''
+        Удалить истекшие записи и перестроить фильтр
+
+        Отзывы, пришедшие после начала чтения таблицы, копятся
+        в _pending и добавляются в новый фильтр перед подменой (без
+        await между ними), иначе они остались бы только в старом
+        '''
+        self._pending = set()
+        try:
+            async with self._session_factory() as session:
+                purged = await revoked_token_crud.purge_expired(session)
+                jtis = await revoked_token_crud.get_active_jtis(session)
+            bloom = BloomFilter(
+                max(settings.TOKEN_REVOCATION_BLOOM_CAPACITY, 2 * len(jtis)),
+                settings.TOKEN_REVOCATION_BLOOM_ERROR_RATE,
+            )
+            for jti in jtis:
+                bloom.add(jti)
+            for jti in self._pending:
+                bloom.add(jti)
+            self._bloom = bloom
+        finally:
+            self._pending = None
+        logger.info(
+            'Фильтр отозванных токенов перестроен: %s токенов, удалено истекших: %s',
+            len(jtis), purged,
+        )
+
+    async def _run(self) -> None:
+        '''LISTEN на канале отзыва и периодическое перестроение фильтра'''
+        while True:
+            try:
+                async with self._engine.connect() as listen_connection:
+                    raw_connection = await listen_connection.get_raw_connection()
+                    driver_connection = raw_connection.driver_connection
+                    await driver_connection.add_listener(
+                        settings.TOKEN_REVOCATION_CHANNEL, self._on_notify
+                    )
+                    try:
+                        # Подписка раньше чтения таблицы: отзыв между ними
+                        # попадет в фильтр через уведомление
+                        await self._rebuild()
+                        rebuilt = time.monotonic()
+                        while True:
+                            await asyncio.sleep(settings.TOKEN_REVOCATION_RETRY_SECONDS)
+                            # Проверка, что соединение с LISTEN живо
+                            await driver_connection.execute('SELECT 1')
+                            if (
+                                time.monotonic() - rebuilt
+                                >= settings.TOKEN_REVOCATION_REBUILD_SECONDS
+                            ):
+                                await self._rebuild()
+                                rebuilt = time.monotonic()
+                    finally:
+                        self._bloom = None
+                        if not driver_connection.is_closed():
+                            await driver_connection.remove_listener(
+                                settings.TOKEN_REVOCATION_CHANNEL, self._on_notify
+                            )
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception('Ошибка слушателя отзыва токенов')
+            await asyncio.sleep(settings.TOKEN_REVOCATION_RETRY_SECONDS)
+
+
+token_revocation_list = TokenRevocationList()
@@ -0,0 +1,177 @@
+'''
+Импорт пользователей из CSV/JSON с параллельным хешированием паролей
+'''
+import asyncio
+import csv
+import io
+import json
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from core.security import hash_passwords
+from crud.user import user_crud
+from models.enums.user import UserImportFormat
+from schemas.user import UserCreate, UserImportFailure, UserImportResult
+
+logger = logging.getLogger(__name__)
+
+
+def parse_user_rows(content: bytes, file_format: UserImportFormat) -> list[dict]:
+    '''
+    Разобрать файл импорта в список строк
+
+    CSV - с заголовком (email,password[,role][,is_active]), пустые
+    значения считаются незаданными. JSON - массив объектов с теми же
+    полями
+
+    Raises:
+        ValueError: Если файл не разбирается в список строк
+    '''
+    text = content.decode('utf-8-sig')
+    if file_format is UserImportFormat.CSV:
+        return [
+            {field: value for field, value in row.items() if field and value}
+            for row in csv.DictReader(io.StringIO(text))
+        ]
+    rows = json.loads(text)
+    if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+        raise ValueError('JSON файл импорта должен содержать массив объектов')
+    return rows
+
+
+class PasswordHasher:
+    '''
+    Пул процессов для хеширования паролей
+
+    bcrypt занимает CPU на сотни миллисекунд на пароль и не отпускает
+    GIL надолго, поэтому пачка паролей делится на части по числу
+    процессов пула. Пул создается при первом импорте
+    '''
+
+    def __init__(self):
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._workers = 0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._workers = settings.USER_IMPORT_HASH_WORKERS or os.cpu_count() or 1
+            # spawn: fork процесса с запущенным event loop и потоками небезопасен
+            self._pool = ProcessPoolExecutor(
+                max_workers=self._workers,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return self._pool
+
+    async def hash(self, passwords: list[str]) -> list[str]:
+        '''Захешировать пароли параллельно в процессах пула'''
+        pool = self._get_pool()
+        loop = asyncio.get_running_loop()
+        size = -(-len(passwords) // self._workers)
+        parts = await asyncio.gather(*(
+            loop.run_in_executor(pool, hash_passwords, passwords[start:start + size])
+            for start in range(0, len(passwords), size)
+        ))
+        return [password_hash for part in parts for password_hash in part]
+
+    def close(self) -> None:
+        '''Остановить процессы пула'''
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+
+password_hasher = PasswordHasher()
+
+
+async def import_users(session: AsyncSession, rows: list[dict]) -> UserImportResult:
+    '''
+    Создать пользователей по строкам импорта
+
+    Строки проверяются схемой UserCreate, повторы email внутри файла
+    и уже занятые email (без учета регистра, одним запросом) попадают
+    в failed с номером строки (с 1). Остальные строки вставляются
+    пачками по USER_IMPORT_CHUNK_SIZE: пока вставляется одна пачка,
+    пароли следующей хешируются в пуле процессов
+    '''
+    result = UserImportResult(requested=len(rows))
+    valid: list[tuple[int, UserCreate]] = []
+    seen: dict[str, int] = {}
+    for number, row in enumerate(rows, start=1):
+        try:
+            user = UserCreate.model_validate(row)
+        except ValidationError as exc:
+            error = exc.errors()[0]
+            field = '.'.join(str(part) for part in error['loc'])
+            result.failed.append(UserImportFailure(
+                row=number,
+                email=row.get('email') if isinstance(row.get('email'), str) else None,
+                error=f'{field}: {error["msg"]}',
+            ))
+            continue
+        email = user.email.lower()
+        if email in seen:
+            result.failed.append(UserImportFailure(
+                row=number,
+                email=user.email,
+                error=f'Email повторяется в файле (строка {seen[email]})',
+            ))
+            continue
+        seen[email] = number
+        valid.append((number, user))
+
+    existing = await user_crud.get_existing_emails(session, list(seen))
+    for number, user in valid:
+        if user.email.lower() in existing:
+            result.failed.append(UserImportFailure(
+                row=number,
+                email=user.email,
+                error=f'Пользователь с email {user.email} уже есть',
+            ))
+    valid = [(number, user) for number, user in valid if user.email.lower() not in existing]
+
+    chunk_size = settings.USER_IMPORT_CHUNK_SIZE
+    chunks = [valid[start:start + chunk_size] for start in range(0, len(valid), chunk_size)]
+    hashing = None
+    if chunks:
+        hashing = asyncio.ensure_future(
+            password_hasher.hash([user.password for _, user in chunks[0]])
+        )
+    try:
+        for index, chunk in enumerate(chunks):
+            password_hashes = await hashing
+            if index + 1 < len(chunks):
+                hashing = asyncio.ensure_future(
+                    password_hasher.hash([user.password for _, user in chunks[index + 1]])
+                )
+            created = await user_crud.bulk_insert(session, [
+                {
+                    **user.model_dump(exclude={'password'}),
+                    'password_hash': password_hash,
+                }
+                for (_, user), password_hash in zip(chunk, password_hashes)
+            ])
+            result.created += len(created)
+            for number, user in chunk:
+                if user.email not in created:
+                    result.failed.append(UserImportFailure(
+                        row=number,
+                        email=user.email,
+                        error=f'Пользователь с email {user.email} уже есть',
+                    ))
+    finally:
+        if hashing is not None and not hashing.done():
+            hashing.cancel()
+
+    result.failed.sort(key=lambda failure: failure.row)
+    logger.info(
+        'Импорт пользователей: строк %s, создано %s, ошибок %s',
+        result.requested, result.created, len(result.failed),
+    )
+    return result
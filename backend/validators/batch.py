@@ -0,0 +1,23 @@
+'''
+Валидаторы для пакетного чтения
+'''
+import uuid
+
+from fastapi import HTTPException, status
+
+from core.config import settings
+
+
+def validate_batch_ids(ids: list[uuid.UUID]) -> list[uuid.UUID]:
+    '''Валидация списка ID для пакетного чтения'''
+    if not ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Список ID не должен быть пустым'
+        )
+    if len(ids) > settings.BATCH_READ_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f'Можно запросить не более {settings.BATCH_READ_MAX_IDS} ID за раз'
+        )
+    return ids
@@ -0,0 +1,25 @@
+'''
+Валидаторы для ленты изменений
+'''
+from typing import Optional
+
+from fastapi import HTTPException, status
+
+
+def encode_change_cursor(xact_id: int, id: int) -> str:
+    '''Сформировать курсор ленты изменений'''
+    return f'{xact_id}-{id}'
+
+
+def validate_change_cursor(cursor: Optional[str]) -> Optional[tuple[int, int]]:
+    '''Валидация курсора ленты изменений'''
+    if not cursor:
+        return None
+    try:
+        xact_id, id = cursor.split('-')
+        return int(xact_id), int(id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f'Некорректный курсор = {cursor}'
+        )
@@ -0,0 +1,63 @@
+'''
+Валидаторы для уведомлений исполнителей
+'''
+import hmac
+import time
+
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+
+from core.config import settings
+from schemas.executor import ExecutorCallback
+from services.executors.signature import sign_executor_body
+
+
+def validate_executor_signature(
+    executor_type: str,
+    body: bytes,
+    signature: str,
+    timestamp: str,
+) -> None:
+    '''
+    Валидация HMAC-SHA256 подписи запроса исполнителя (sha256=<hex>)
+
+    Подписывается строка "<timestamp>." + тело, где timestamp - время
+    отправки в секундах Unix. Запрос с меткой времени дальше
+    EXECUTOR_CALLBACK_MAX_SKEW_SECONDS от часов сервера отклоняется,
+    поэтому перехваченный запрос нельзя повторить позже
+    '''
+    secret = settings.EXECUTOR_CALLBACK_SECRETS.get(executor_type)
+    if secret is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f'Тип исполнителя = {executor_type} не принимает подписанные запросы'
+        )
+    try:
+        sent_at = int(timestamp)
+    except ValueError:
+        sent_at = None
+    if (
+        sent_at is None
+        or abs(time.time() - sent_at) > settings.EXECUTOR_CALLBACK_MAX_SKEW_SECONDS
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail='Метка времени подписи отсутствует или устарела'
+        )
+    expected = sign_executor_body(secret, timestamp, body)
+    if not hmac.compare_digest(signature.removeprefix('sha256='), expected):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail='Неверная подпись запроса'
+        )
+
+
+def validate_callback_body(body: bytes) -> ExecutorCallback:
+    '''Валидация тела уведомления'''
+    try:
+        return ExecutorCallback.model_validate_json(body)
+    except ValidationError as error:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=error.errors(include_url=False)
+        )
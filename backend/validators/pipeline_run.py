@@ -0,0 +1,159 @@
+'''
+Валидаторы для PipelineRun
+'''
+import uuid
+
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.dependencies import can_access_pipeline
+from core.config import settings
+from crud.pipeline_run import pipeline_run_crud
+from models.pipeline_run import (PIPELINE_RUN_TRANSITIONS, PipelineRun,
+                                 PipelineRunStatus)
+from models.run_param_value import RUN_PARAM_NAME_MAX_LENGTH
+from models.user import User
+from schemas.pipeline_run import PipelineRunUpdate
+
+
+async def validate_pipeline_run_id(
+    pipeline_run_id: uuid.UUID,
+    session: AsyncSession
+) -> PipelineRun:
+    '''Валидация ID PipelineRun'''
+    pipeline_run = await pipeline_run_crud.get_by_id(session, pipeline_run_id)
+    if not pipeline_run:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f'PipelineRun с ID = {pipeline_run_id} не найден'
+        )
+    return pipeline_run
+
+
+async def validate_pipeline_run_access(
+    pipeline_run_id: uuid.UUID,
+    current_user: User,
+    session: AsyncSession
+) -> PipelineRun:
+    '''
+    Валидация ID PipelineRun и доступа к пайплайну запуска
+
+    Запуск чужого пайплайна не отличается от несуществующего (404)
+    '''
+    pipeline_run = await validate_pipeline_run_id(pipeline_run_id, session)
+    if not await can_access_pipeline(pipeline_run.pipeline_id, current_user, session):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f'PipelineRun с ID = {pipeline_run_id} не найден'
+        )
+    return pipeline_run
+
+
+def validate_status_transition(
+    pipeline_run: PipelineRun,
+    new_status: PipelineRunStatus,
+) -> None:
+    '''Валидация перехода запуска в новый статус'''
+    if new_status is pipeline_run.status:
+        return
+    if new_status not in PIPELINE_RUN_TRANSITIONS[pipeline_run.status]:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=(
+                f'Недопустимый переход статуса: '
+                f'{pipeline_run.status.value} -> {new_status.value}'
+            )
+        )
+
+
+def validate_manual_status(
+    pipeline_run: PipelineRun,
+    new_status: PipelineRunStatus,
+) -> None:
+    '''
+    Валидация статуса, выставляемого через API
+
+    В RUNNING ожидающий запуск переводит только диспетчер: он занимает
+    слоты параллельности, которые освобождаются при завершении запуска
+    '''
+    if (
+        pipeline_run.status is PipelineRunStatus.PENDING
+        and new_status is PipelineRunStatus.RUNNING
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail='Ожидающий запуск переводит в RUNNING только диспетчер'
+        )
+
+
+def validate_failure_reason(update_schema: PipelineRunUpdate) -> None:
+    '''Валидация причины неуспеха (указывается только при переходе в FAILED)'''
+    if (
+        update_schema.failure_reason is not None
+        and update_schema.status is not PipelineRunStatus.FAILED
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Причина неуспеха указывается только для статуса FAILED'
+        )
+
+
+def validate_log_chunk(data: bytes) -> None:
+    '''Валидация размера записи в лог запуска'''
+    if not data:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Пустая запись в лог'
+        )
+    if len(data) > settings.RUN_LOG_MAX_APPEND_BYTES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=(
+                f'Запись в лог больше {settings.RUN_LOG_MAX_APPEND_BYTES} байт'
+            )
+        )
+
+
+PARAM_FILTER_PREFIX = 'param.'
+
+
+def validate_param_filters(query_params) -> dict[str, str]:
+    '''
+    Валидация фильтров по параметрам запуска вида param.<имя>=<значение>
+
+    Имя и число фильтров ограничены так же, как параметры при создании
+    запуска (PipelineRunCreate.params)
+    '''
+    params = {}
+    for key, value in query_params.multi_items():
+        if not key.startswith(PARAM_FILTER_PREFIX):
+            continue
+        name = key[len(PARAM_FILTER_PREFIX):]
+        if not name:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail='Не указано имя параметра в фильтре param.<имя>'
+            )
+        if len(name) > RUN_PARAM_NAME_MAX_LENGTH:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=(
+                    'Имя параметра в фильтре длиннее '
+                    f'{RUN_PARAM_NAME_MAX_LENGTH} символов'
+                )
+            )
+        if params.get(name, value) != value:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f'Параметр {name} указан в фильтре с разными значениями'
+            )
+        params[name] = value
+        if len(params) > settings.RUN_PARAMS_MAX_COUNT:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=(
+                    'В запросе может быть не больше '
+                    f'{settings.RUN_PARAMS_MAX_COUNT} фильтров по параметрам'
+                )
+            )
+    return params
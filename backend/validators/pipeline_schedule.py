@@ -0,0 +1,73 @@
+'''
+Валидаторы для PipelineSchedule
+'''
+import uuid
+
+from croniter import croniter
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.dependencies import can_access_pipeline
+from crud.pipeline_schedule import pipeline_schedule_crud
+from models.pipeline_schedule import PipelineSchedule
+from models.pipeline_version import PipelineVersion
+from models.user import User
+
+
+async def validate_pipeline_schedule_id(
+    pipeline_schedule_id: uuid.UUID,
+    session: AsyncSession
+) -> PipelineSchedule:
+    '''Валидация ID PipelineSchedule'''
+    pipeline_schedule = await pipeline_schedule_crud.get_by_id(
+        session, pipeline_schedule_id
+    )
+    if not pipeline_schedule:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f'PipelineSchedule с ID = {pipeline_schedule_id} не найден'
+        )
+    return pipeline_schedule
+
+
+async def validate_pipeline_schedule_access(
+    pipeline_schedule_id: uuid.UUID,
+    current_user: User,
+    session: AsyncSession
+) -> PipelineSchedule:
+    '''Валидация ID PipelineSchedule и доступа к его пайплайну (иначе 404)'''
+    pipeline_schedule = await validate_pipeline_schedule_id(
+        pipeline_schedule_id, session
+    )
+    if not await can_access_pipeline(
+        pipeline_schedule.pipeline_id, current_user, session
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f'PipelineSchedule с ID = {pipeline_schedule_id} не найден'
+        )
+    return pipeline_schedule
+
+
+def validate_cron(cron: str) -> None:
+    '''Валидация cron-выражения'''
+    if not croniter.is_valid(cron):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f'Некорректное cron-выражение = {cron}'
+        )
+
+
+def validate_schedule_version(
+    pipeline_version: PipelineVersion,
+    pipeline_id: uuid.UUID,
+) -> None:
+    '''Валидация версии расписания: версия должна принадлежать пайплайну расписания'''
+    if pipeline_version.pipeline_id != pipeline_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=(
+                f'PipelineVersion с ID = {pipeline_version.id} '
+                f'не относится к пайплайну с ID = {pipeline_id}'
+            )
+        )
@@ -1,10 +1,13 @@
 import uuid
+from typing import Optional
 
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from api.dependencies import can_access_pipeline
 from crud.pipeline_version import pipeline_version_crud
 from models.pipeline_version import PipelineVersion
+from models.user import User
 
 
 async def validate_pipeline_version_id(
@@ -21,3 +24,35 @@ async def validate_pipeline_version_id(
             detail=f'PipelineVersion с ID = {pipeline_version_id} не найден'
         )
     return pipeline_version
+
+
+def validate_pipeline_version_visible(
+    pipeline_version: PipelineVersion,
+    visible_ids: Optional[list[uuid.UUID]],
+) -> PipelineVersion:
+    '''Проверка, что пайплайн версии доступен пользователю (иначе 404)'''
+    if visible_ids is not None and pipeline_version.pipeline_id not in visible_ids:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f'PipelineVersion с ID = {pipeline_version.id} не найден'
+        )
+    return pipeline_version
+
+
+async def validate_pipeline_version_access(
+    pipeline_version_id: uuid.UUID,
+    current_user: User,
+    session: AsyncSession
+) -> PipelineVersion:
+    '''Валидация ID PipelineVersion и доступа к ее пайплайну (иначе 404)'''
+    pipeline_version = await validate_pipeline_version_id(
+        pipeline_version_id, session
+    )
+    if not await can_access_pipeline(
+        pipeline_version.pipeline_id, current_user, session
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f'PipelineVersion с ID = {pipeline_version_id} не найден'
+        )
+    return pipeline_version
@@ -0,0 +1,97 @@
+'''
+Валидаторы для поиска по JSONB schema
+'''
+import re
+from typing import Type
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from crud.schema_search import get_estimated_rows, schema_index_name
+from database.explain import get_plan, plan_uses_index
+from models.base import BaseModel
+from schemas.schema_search import SchemaSearchRequest
+
+# Разрешенное подмножество JSONPath: ключи, индексы и [*], фильтры
+# со сравнениями и логикой. Рекурсивный обход (.**), методы
+# (.size(), .type(), .keyvalue(), .datetime() и т.д.: ключ, за которым
+# идет скобка), like_regex и арифметика запрещены
+JSONPATH_TOKEN = re.compile(r'''
+    \s+
+    | \$ | @
+    | \.[A-Za-z_][A-Za-z0-9_]*(?![A-Za-z0-9_]|\s*\()
+    | \."(?:[^"\\]|\\.)*"
+    | \[\*\] | \[\d+\]
+    | \? | \( | \)
+    | == | != | <= | >= | < | >
+    | && | \|\| | !
+    | "(?:[^"\\]|\\.)*"
+    | -?\d+(?:\.\d+)?
+    | true\b | false\b | null\b
+''', re.VERBOSE)
+
+
+def validate_jsonpath(path: str) -> None:
+    '''Валидация JSONPath по разрешенному подмножеству'''
+    if len(path) > settings.SCHEMA_SEARCH_MAX_PATH_LENGTH or not path.startswith('$'):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=(
+                'JSONPath должен начинаться с $ и быть не длиннее '
+                f'{settings.SCHEMA_SEARCH_MAX_PATH_LENGTH} символов'
+            )
+        )
+    position = 0
+    while position < len(path):
+        match = JSONPATH_TOKEN.match(path, position)
+        if match is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f'Недопустимая конструкция JSONPath в позиции {position}'
+            )
+        position = match.end()
+
+
+def validate_schema_search_request(search_data: SchemaSearchRequest) -> None:
+    '''Валидация фильтра поиска: ровно один из contains и path'''
+    if (search_data.contains is None) == (search_data.path is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Нужно указать ровно один фильтр: contains или path'
+        )
+    if search_data.path is not None:
+        validate_jsonpath(search_data.path)
+
+
+async def validate_schema_search_plan(
+    session: AsyncSession,
+    query: Select,
+    model: Type[BaseModel],
+) -> None:
+    '''
+    Валидация плана поиска
+
+    Фильтр отклоняется, если на большой таблице планировщик не
+    использует GIN индекс по schema, то есть будет перебирать строки
+    (Seq Scan или обход по другому индексу с фильтрацией). Таблица
+    без статистики считается большой. query - запрос только с
+    фильтром: с ORDER BY id и LIMIT планировщик может предпочесть
+    обход первичного ключа даже для фильтра, который индекс покрывает
+    '''
+    plan = await get_plan(session, query)
+    if plan_uses_index(plan, schema_index_name(model)):
+        return
+    estimated_rows = await get_estimated_rows(session, model.__tablename__)
+    if (
+        estimated_rows is None
+        or estimated_rows > settings.SCHEMA_SEARCH_SEQ_SCAN_MAX_ROWS
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=(
+                'Фильтр не может использовать индекс и потребует полного '
+                'чтения таблицы; уточните фильтр'
+            )
+        )
@@ -1,8 +1,16 @@
+import uuid
+from typing import Optional
+
 from fastapi import HTTPException, status
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from crud.tag import tag_crud
-from models.tag import Tag
+from core.config import settings
+from crud.tag import TAGGED_MODELS, tag_crud, tag_link_crud
+from models.enums.tag import TagEntityType, TagFilterMode
+from models.tag import Tag, TagLink
+from schemas.tag import TagFilter, TagLinksBulkRequest
+from validators.pipeline import validate_pipeline_id
 
 async def validate_tag_id(tag_id: int, session: AsyncSession) -> Tag:
     '''Валидация ID тега'''
@@ -13,3 +21,108 @@ async def validate_tag_id(tag_id: int, session: AsyncSession) -> Tag:
             status_code=status.HTTP_400_BAD_REQUEST, detail='ID тега должно быть больше 0'
         )
     return tag
+
+
+def validate_tag_filter(
+    tags: Optional[str],
+    tag_mode: TagFilterMode,
+) -> Optional[TagFilter]:
+    '''Валидация фильтра по тегам вида tags=a,b'''
+
+    if tags is None:
+        return None
+    names = list(dict.fromkeys(
+        name.strip() for name in tags.split(',') if name.strip()
+    ))
+    if not names:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Не указаны имена тегов в фильтре tags'
+        )
+    if len(names) > settings.TAG_FILTER_MAX_TAGS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f'В фильтре tags может быть не больше {settings.TAG_FILTER_MAX_TAGS} тегов'
+        )
+    return TagFilter(names=names, mode=tag_mode)
+
+
+async def validate_tagged_entity(
+    entity_type: TagEntityType,
+    entity_id: uuid.UUID,
+    session: AsyncSession,
+) -> None:
+    '''Валидация существования сущности, к которой привязывается тег'''
+
+    model = TAGGED_MODELS[entity_type]
+    exists = (
+        await session.execute(select(model.id).where(model.id == entity_id))
+    ).scalar_one_or_none()
+    if exists is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f'Сущность {entity_type} с ID {entity_id} не найдена'
+        )
+
+
+async def validate_tag_link(
+    tag_id: int,
+    entity_type: TagEntityType,
+    entity_id: uuid.UUID,
+    session: AsyncSession,
+) -> TagLink:
+    '''Валидация существования связи тега с сущностью'''
+
+    db_link = await tag_link_crud.get_link(session, tag_id, entity_type, entity_id)
+    if not db_link:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='Тег не привязан к этой сущности'
+        )
+    return db_link
+
+
+async def validate_tag_link_unique(
+    tag_id: int,
+    entity_type: TagEntityType,
+    entity_id: uuid.UUID,
+    session: AsyncSession,
+) -> None:
+    '''Валидация отсутствия связи тега с сущностью'''
+
+    if await tag_link_crud.get_link(session, tag_id, entity_type, entity_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Тег уже привязан к этой сущности'
+        )
+
+
+async def validate_tag_links_bulk_request(
+    bulk_request: TagLinksBulkRequest,
+    session: AsyncSession,
+) -> None:
+    '''Валидация запроса пакетной привязки (отвязки) тега'''
+
+    if (bulk_request.entity_ids is None) == (bulk_request.pipeline_id is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Нужно указать ровно одно из полей entity_ids и pipeline_id'
+        )
+    if bulk_request.entity_ids is not None:
+        if not bulk_request.entity_ids:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail='Список entity_ids не должен быть пустым'
+            )
+        if len(bulk_request.entity_ids) > settings.TAG_BULK_MAX_IDS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f'Можно передать не более {settings.TAG_BULK_MAX_IDS} ID за раз'
+            )
+        return
+    if bulk_request.entity_type is TagEntityType.PIPELINE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='pipeline_id можно указать только для версий и запусков пайплайна'
+        )
+    await validate_pipeline_id(bulk_request.pipeline_id, session)
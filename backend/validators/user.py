@@ -1,15 +1,25 @@
 '''
 Валидаторы для User
 '''
+import base64
+import binascii
+import csv
+import math
 import uuid
+from typing import Optional
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, UploadFile, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.config import settings
 from core.security import verify_password
+from crud.loaders import LoaderProfile
 from crud.user import user_crud
 from database.base import get_async_session
+from models.enums.user import UserImportFormat
 from models.user import User
+from services.login_throttle import login_throttle, resolve_client_ip
+from services.user_import import parse_user_rows
 
 
 async def validate_user_id(
@@ -25,11 +35,44 @@ async def validate_user_id(
     return user
 
 
+async def validate_login_rate(
+    request: Request, email: str
+):
+    '''Валидация частоты попыток входа (до поиска пользователя и проверки пароля)'''
+    if not settings.LOGIN_THROTTLE_ENABLED:
+        return
+    client_ip = resolve_client_ip(
+        request.client.host if request.client else None,
+        request.headers.get('X-Forwarded-For'),
+    )
+    retry_after = await login_throttle.check(email, client_ip)
+    if retry_after:
+        seconds = math.ceil(retry_after)
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f'Слишком много попыток входа, повторите через {seconds} с',
+            headers={'Retry-After': str(seconds)},
+        )
+
+
+def validate_user_search_query(q: str) -> str:
+    '''Валидация строки поиска пользователей'''
+    q = q.strip()
+    if len(q) < settings.USER_SEARCH_MIN_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f'Строка поиска должна содержать не менее {settings.USER_SEARCH_MIN_LENGTH} символов'
+        )
+    return q
+
+
 async def validate_user_email(
-    email: str, session: AsyncSession
+    email: str,
+    session: AsyncSession,
+    profile: LoaderProfile = LoaderProfile.DETAIL,
 ):
     '''Валидация email пользователя'''
-    user = await user_crud.get_by_email(session, email)
+    user = await user_crud.get_by_email(session, email, profile)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -55,3 +98,48 @@ async def validate_password(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail='Неверный пароль'
         )
+
+
+async def validate_user_import_file(
+    file: UploadFile
+) -> list[dict]:
+    '''Валидация файла импорта пользователей (формат по расширению .csv/.json)'''
+    extension = (file.filename or '').rsplit('.', 1)[-1].lower()
+    try:
+        file_format = UserImportFormat(extension)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Файл импорта должен иметь расширение .csv или .json'
+        )
+    try:
+        rows = parse_user_rows(await file.read(), file_format)
+    except (ValueError, UnicodeDecodeError, csv.Error) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f'Не удалось разобрать файл импорта: {exc}'
+        )
+    if len(rows) > settings.USER_IMPORT_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f'Слишком много строк в файле импорта: {len(rows)} > {settings.USER_IMPORT_MAX_ROWS}'
+        )
+    return rows
+
+
+def encode_user_cursor(email: str) -> str:
+    '''Сформировать курсор списка пользователей (по email последнего на странице)'''
+    return base64.urlsafe_b64encode(email.encode()).decode()
+
+
+def validate_user_cursor(cursor: Optional[str]) -> Optional[str]:
+    '''Валидация курсора списка пользователей'''
+    if not cursor:
+        return None
+    try:
+        return base64.urlsafe_b64decode(cursor.encode()).decode()
+    except (binascii.Error, UnicodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f'Некорректный курсор = {cursor}'
+        )